@@ -6,6 +6,7 @@
 import requests
 import json
 import os
+import sys
 
 # Set the model and API key
 model = "gemini-2.0-flash"
@@ -17,7 +18,9 @@ url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:streamGe
 params = {"alt": "sse", "key": api_key}
 payload = {"contents": [{"parts": [{"text": prompt}]}]}
 
-# Make the streaming request and process the response
+# Make the streaming request and process the response. This reads each
+# "data: " line as a whole event, which is enough for the API's own stream; see
+# the incremental SSE decoding example for events that span several lines.
 with requests.post(url, json=payload, params=params, stream=True) as r:
     for line in r.iter_lines():
         if line and line.startswith(b"data: ") and not line.endswith(b"[DONE]"):
@@ -26,5 +29,5 @@ with requests.post(url, json=payload, params=params, stream=True) as r:
                 if "candidates" in data and data["candidates"]:
                     text = data["candidates"][0]["content"]["parts"][0].get("text", "")
                     print(text, end="")
-            except:
-                pass
+            except json.JSONDecodeError as e:
+                print(f"\nSkipping an event that isn't valid JSON: {e}", file=sys.stderr)
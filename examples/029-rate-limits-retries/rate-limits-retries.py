@@ -1,42 +1,275 @@
 # Rate limits and retries
-# This example demonstrates generating text with the Gemini API, handling rate limiting errors, and using exponential backoff for retries.
+# This example demonstrates a retry layer for the Gemini API. Failed requests are retried with exponential backoff
+# and full jitter, the server's own retry hints are honoured, and a retry budget stops retries from multiplying
+# the load during an outage. Optional hedged requests send a backup copy of slow requests to cut tail latency.
 
-import google.generativeai as genai
-import google.ai.generativelanguage as glm
-import time
+# Import the necessary libraries
+import json
 import os
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from google import genai
+from google.genai import errors
+
+# Rate limiting (429) and transient server errors are worth retrying.
+# Anything else, such as a bad request or a blocked prompt, will fail again.
+RETRYABLE_CODES = (429, 500, 503, 504)
+
+
+# A retry budget caps retries at a fraction of normal traffic. Every successful
+# request deposits `ratio` tokens and every retry spends one, so when most
+# requests are failing the budget quickly runs dry and errors are returned
+# straight away instead of being retried into an overloaded service.
+class RetryBudget:
+    def __init__(self, ratio=0.1, max_tokens=10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.lock = threading.Lock()
+
+    def deposit(self):
+        with self.lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self):
+        with self.lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+# When the API is rate limiting you, it says how long to wait: either in a
+# Retry-After header or in a RetryInfo entry in the error details.
+def retry_hint(error):
+    """Return the server's suggested delay in seconds, or None."""
+    headers = getattr(error.response, "headers", None) or {}
+    if headers.get("retry-after", "").isdigit():
+        return float(headers["retry-after"])
+    details = error.details.get("error", {}) if isinstance(error.details, dict) else {}
+    for detail in details.get("details", []):
+        if detail.get("@type", "").endswith("RetryInfo"):
+            match = re.fullmatch(r"([\d.]+)s", detail.get("retryDelay", ""))
+            if match:
+                return float(match.group(1))
+    return None
+
+
+# Call `send` until it succeeds, retrying retryable errors. Each delay is drawn
+# uniformly between zero and the exponential backoff cap ("full jitter"), so
+# clients that failed together don't all retry together. A server hint sets
+# the minimum wait.
+def call_with_retries(send, budget, max_attempts=5, base_delay=1.0, max_delay=60.0):
+    for attempt in range(max_attempts):
+        try:
+            result = send()
+        except errors.APIError as e:
+            if e.code not in RETRYABLE_CODES or attempt == max_attempts - 1:
+                raise
+            if not budget.withdraw():
+                raise  # Out of retry budget: fail fast
+            delay = random.uniform(0, min(max_delay, base_delay * 2**attempt))
+            time.sleep(max(delay, retry_hint(e) or 0))
+        else:
+            budget.deposit()
+            return result
+
+
+# Hedging needs to know what "slow" means. The tracker keeps the latencies of
+# recent requests and reports a percentile of them.
+class LatencyTracker:
+    def __init__(self, size=500):
+        self.latencies = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.latencies.append(seconds)
+
+    def percentile(self, p):
+        with self.lock:
+            if len(self.latencies) < 20:
+                return None  # Not enough data yet
+            ordered = sorted(self.latencies)
+        return ordered[int(p / 100 * (len(ordered) - 1))]
+
+
+# A hedged call sends the request, and if it hasn't finished by the p95 latency,
+# sends a second copy and returns whichever finishes first. Only about 5% of
+# requests are hedged, so the extra load is small, but a single slow request no
+# longer sets the response time. Hedges also spend the retry budget, and nothing
+# is hedged until the tracker has seen enough requests to know what slow means.
+class Hedger:
+    def __init__(self, budget, percentile=95, max_workers=32):
+        self.budget = budget
+        self.percentile = percentile
+        self.tracker = LatencyTracker()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.hedges_sent = 0
+
+    def timed(self, send):
+        started = time.perf_counter()
+        result = send()
+        self.tracker.record(time.perf_counter() - started)
+        return result
+
+    def call(self, send):
+        delay = self.tracker.percentile(self.percentile)
+        if delay is None:
+            return self.timed(send)
+        futures = {self.executor.submit(self.timed, send)}
+        done, _ = wait(futures, timeout=delay)
+        if not done and self.budget.withdraw():
+            self.hedges_sent += 1
+            futures.add(self.executor.submit(self.timed, send))
+        while True:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None or not futures:
+                    return future.result()  # The slower copy's result is discarded
+
+
+# Put it together: a generate call with retries, and optionally hedging.
+def generate(client, model, prompt, budget, hedger=None, **retry_options):
+    def send():
+        return client.models.generate_content(model=model, contents=prompt)
+
+    if hedger:
+        return call_with_retries(lambda: hedger.call(send), budget, **retry_options)
+    return call_with_retries(send, budget, **retry_options)
+
+
+# Share one budget (and one hedger) across all the requests your application
+# makes, so they reflect the health of the service as a whole.
+def main():
+    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    budget = RetryBudget()
+    hedger = Hedger(budget)
+    prompt = "Tell me a funny story about a cat trying to catch a laser pointer."
+    try:
+        response = generate(client, "gemini-2.0-flash", prompt, budget, hedger)
+        print(response.text)
+    except errors.APIError as e:
+        print(f"An error occurred: {e}")
+    finally:
+        hedger.executor.shutdown(wait=False)
+
+
+# For the benchmark, a local server stands in for the Gemini API. Most requests
+# take 50 ms, but a few take a full second, and some are rejected with 429 and a
+# RetryInfo hint to wait 200 ms. With `outage=True`, every request fails with 503.
+# The server counts every request it receives, including retries and hedges.
+MOCK_FAST = 0.05
+MOCK_SLOW = 1.0
+MOCK_SLOW_RATE = 0.03
+MOCK_THROTTLE_RATE = 0.05
+MOCK_RESPONSE = json.dumps(
+    {
+        "candidates": [
+            {"content": {"role": "model", "parts": [{"text": "Pounce!"}]}}
+        ],
+        "usageMetadata": {"promptTokenCount": 16, "candidatesTokenCount": 2},
+    }
+).encode()
+
+
+MOCK_UNAVAILABLE = json.dumps(
+    {"error": {"code": 503, "message": "The model is overloaded.", "status": "UNAVAILABLE"}}
+).encode()
+MOCK_EXHAUSTED = json.dumps(
+    {
+        "error": {
+            "code": 429,
+            "message": "Resource has been exhausted (e.g. check quota).",
+            "status": "RESOURCE_EXHAUSTED",
+            "details": [
+                {"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "0.2s"}
+            ],
+        }
+    }
+).encode()
+
+
+def mock_api(handler):
+    roll = random.random()
+    if handler.settings.get("outage"):
+        handler.send_json(MOCK_UNAVAILABLE, 503)
+    elif roll < MOCK_THROTTLE_RATE:
+        handler.send_json(MOCK_EXHAUSTED, 429)
+    else:
+        slow = roll > 1 - MOCK_SLOW_RATE
+        time.sleep(MOCK_SLOW if slow else MOCK_FAST)
+        handler.send_json(MOCK_RESPONSE)
+
+
+# Send a batch through the retry layer from 8 threads and time each request.
+def run(client, prompts, budget, hedger=None):
+    def timed_generate(prompt):
+        started = time.perf_counter()
+        try:
+            generate(client, "gemini-2.0-flash", prompt, budget, hedger, base_delay=0.1)
+            return time.perf_counter() - started
+        except errors.APIError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(timed_generate, prompts))
+    return sorted(r for r in results if r is not None)
+
 
+def report(label, latencies, total, sent):
+    line = f"{label:<16} {len(latencies):3d}/{total} ok  {sent:4d} sent"
+    if latencies:
+        p95 = latencies[int(0.95 * (len(latencies) - 1))] * 1000
+        p99 = latencies[int(0.99 * (len(latencies) - 1))] * 1000
+        p50 = statistics.median(latencies) * 1000
+        line += f"  p50 {p50:5.0f} ms  p95 {p95:5.0f} ms  p99 {p99:5.0f} ms"
+    print(line)
 
-# Configure the retry strategy
-def configure_retries(base_delay=1, max_delay=60, max_retries=5):
-    """Configures exponential backoff retry strategy."""
-    return genai.retry.RetryConfig(
-        initial_delay=base_delay,
-        max_delay=max_delay,
-        max_retries=max_retries,
-        retry_on_status_codes=[glm.Code.RESOURCE_EXHAUSTED.value],
-    )
 
+# First, a healthy but noisy service: retries recover the throttled requests
+# and hedging trims the tail. Then an outage: without a budget every request
+# is tried five times, with one the retries stop once the budget is spent.
+def benchmark(num_prompts=400):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools" / "mock_gemini"))
+    from mock_gemini import mock_client, requests_received, start_mock_server
 
-# Set the retry configuration
-retry_config = configure_retries()
+    prompts = [f"Tell me cat fact number {i}." for i in range(num_prompts)]
 
-# Initialize the Gemini client with your API key
-client = genai.Client(
-    api_key=os.environ.get("GEMINI_API_KEY", "YOUR_API_KEY"), retry_config=retry_config
-)
+    for label, hedge in (("retries", False), ("retries + hedge", True)):
+        server, port = start_mock_server(mock_api)
+        # The SDK only retries on its own when given `retry_options`, so every
+        # attempt the server sees comes from our retry layer
+        client = mock_client(port)
+        budget = RetryBudget()
+        hedger = Hedger(budget) if hedge else None
+        latencies = run(client, prompts, budget, hedger)
+        report(label, latencies, num_prompts, requests_received(port))
+        server.terminate()
 
-# Select the model
-model = "gemini-2.0-flash"
+    print("During an outage:")
+    for label, budget in (
+        ("no budget", RetryBudget(max_tokens=float("inf"))),
+        ("retry budget", RetryBudget()),
+    ):
+        server, port = start_mock_server(mock_api, outage=True)
+        client = mock_client(port)
+        latencies = run(client, prompts[:100], budget)
+        report(label, latencies, 100, requests_received(port))
+        server.terminate()
 
-# Construct the prompt
-prompt = "Tell me a funny story about a cat trying to catch a laser pointer."
 
-#
-# Attempt text generation with retry logic
-#
-try:
-    response = client.models.generate_content(model=model, contents=prompt)
-    print(response.text)
-except genai.errors.APIError as e:
-    print(f"An error occurred: {e}")
+# Run against the real API, or pass --benchmark to try the retry layer offline.
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark()
+    else:
+        main()
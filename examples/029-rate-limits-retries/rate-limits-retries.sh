@@ -1,8 +1,8 @@
 # First, install the Google Generative AI library
-$ pip install google-genai backoff
+$ pip install google-genai
 
 # Then run the program with Python
-$ python text_generation_with_retry.py
+$ python rate-limits-retries.py
 Bartholomew Buttersworth the Third, a cat of considerable fluff and even more considerable ego, considered himself a master predator. His domain, the living room, was usually ruled with a sleepy, regal disdain.
 Until the Red Dot appeared.
 It materialized silently on the beige carpet, an insolent crimson speck challenging his authority. Bartholomew's eyes, previously half-closed slits of judgment, snapped wide open. His tail gave an involuntary *thwack* against the armchair.
@@ -17,3 +17,11 @@ Bartholomew froze. Victory? He stared at the dot. The dot stared back (metaphori
 The dot vanished.
 Bartholomew looked at his paw. He looked around the room, eyes wide with betrayal. Where did it go? Was it *inside* his paw? He bit his paw gently, then shook his head, utterly bewildered.
 Finally, defeated and slightly dizzy, Bartholomew stalked over to his food bowl, pretending the entire embarrassing episode had never happened. The Red Dot, however, remained an unsolved mystery, a tiny, mocking ghost in his otherwise perfect predatory world.
+
+# Try the retry layer against a local mock endpoint with throttling, slow requests and an outage (no API key needed). Hedging sends a few extra requests and cuts p99 by two thirds; the retry budget turns 500 requests into 110 during the outage.
+$ python rate-limits-retries.py --benchmark
+retries          400/400 ok   429 sent  p50   100 ms  p95   314 ms  p99  1044 ms
+retries + hedge  400/400 ok   434 sent  p50   102 ms  p95   191 ms  p99   346 ms
+During an outage:
+no budget          0/100 ok   500 sent
+retry budget       0/100 ok   110 sent
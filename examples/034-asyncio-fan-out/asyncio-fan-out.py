@@ -0,0 +1,162 @@
+# Asyncio fan-out
+# This example shows how to send a large batch of prompts concurrently with the async client (`client.aio`).
+# A fixed pool of workers caps how many requests are in flight, results are streamed back in the order they
+# complete, and every request is timed. A benchmark against a local mock endpoint compares it with a thread pool.
+
+# Import the necessary libraries
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from google import genai
+
+
+# Each finished request is reported with its position in the input, the
+# response text (or the error it raised) and how long it took.
+@dataclass
+class FanOutResult:
+    index: int
+    prompt: str
+    text: str | None
+    error: Exception | None
+    seconds: float
+
+
+# The fan-out engine. `max_in_flight` workers take prompts from the input one
+# at a time and call the API, so only that many tasks ever exist and the input
+# can be a lazy iterable of any length. Results go through a bounded queue and
+# are handed back as soon as they finish, so one slow request never holds up
+# the rest, and a consumer that falls behind pauses the workers. Errors are
+# returned alongside successes instead of cancelling the whole batch. If the
+# consumer stops early, the workers are cancelled when the generator is
+# closed; wrap it in `contextlib.aclosing` to close it straight away.
+async def fan_out(client, model, prompts, max_in_flight=16):
+    """Yield a FanOutResult for every prompt, in completion order."""
+    prompts = enumerate(prompts)
+    results = asyncio.Queue(maxsize=max_in_flight)
+
+    async def timed_request(index, prompt):
+        started = time.perf_counter()
+        try:
+            response = await client.aio.models.generate_content(
+                model=model, contents=prompt
+            )
+            text, error = response.text, None
+        except Exception as e:
+            text, error = None, e
+        return FanOutResult(index, prompt, text, error, time.perf_counter() - started)
+
+    async def worker():
+        for index, prompt in prompts:
+            await results.put(await timed_request(index, prompt))
+        await results.put(None)  # This worker has run out of prompts
+
+    workers = [asyncio.create_task(worker()) for _ in range(max_in_flight)]
+    try:
+        running = len(workers)
+        while running:
+            result = await results.get()
+            if result is None:
+                running -= 1
+            else:
+                yield result
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+# Fan out a batch of cat prompts to Gemini and print each answer as it arrives.
+# The index tells you which prompt an answer belongs to.
+async def main():
+    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    breeds = ["Siamese", "Persian", "Maine Coon", "Sphynx", "Bengal", "Ragdoll"]
+    prompts = [f"In one sentence, what makes the {breed} cat special?" for breed in breeds]
+
+    started = time.perf_counter()
+    async for result in fan_out(client, "gemini-2.0-flash-lite", prompts, max_in_flight=4):
+        if result.error:
+            print(f"[{result.index}] failed after {result.seconds:.2f}s: {result.error}")
+        else:
+            print(f"[{result.index}] {result.seconds:.2f}s {result.text.strip()}")
+    print(f"{len(prompts)} prompts in {time.perf_counter() - started:.2f}s")
+
+
+# For the benchmark, a small local server stands in for the Gemini API. It
+# answers every generateContent call with the same response after a fixed delay,
+# so throughput only depends on how many requests the client keeps in flight.
+MOCK_LATENCY = 0.1
+MOCK_RESPONSE = json.dumps(
+    {
+        "candidates": [
+            {"content": {"role": "model", "parts": [{"text": "Cats sleep a lot."}]}}
+        ],
+        "usageMetadata": {"promptTokenCount": 6, "candidatesTokenCount": 5},
+    }
+).encode()
+
+
+def mock_api(handler):
+    time.sleep(MOCK_LATENCY)
+    handler.send_json(MOCK_RESPONSE)
+
+
+# The thread pool baseline, as in the concurrent requests example, scaled up to the same batch.
+def run_thread_pool(client, model, prompts, workers):
+    def timed_request(prompt):
+        started = time.perf_counter()
+        client.models.generate_content(model=model, contents=prompt)
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(timed_request, prompts))
+
+
+async def run_fan_out(client, model, prompts, max_in_flight):
+    return [r.seconds async for r in fan_out(client, model, prompts, max_in_flight)]
+
+
+def report(label, latencies, elapsed):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p95 = latencies[int(0.95 * (len(latencies) - 1))] * 1000
+    throughput = len(latencies) / elapsed
+    print(f"{label:<14} {throughput:7.1f} req/s   p50 {p50:6.1f} ms   p95 {p95:6.1f} ms")
+
+
+# Send the same batch through both engines at several concurrency levels.
+# Each run gets a fresh client so connection pools start out empty.
+def benchmark(num_prompts=400, model="gemini-2.0-flash-lite"):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools" / "mock_gemini"))
+    from mock_gemini import mock_client, start_mock_server
+
+    server, port = start_mock_server(mock_api)
+    prompts = [f"Tell me cat fact number {i}." for i in range(num_prompts)]
+    print(f"{num_prompts} requests, {MOCK_LATENCY * 1000:.0f} ms simulated latency")
+
+    for concurrency in (8, 32, 64):
+        started = time.perf_counter()
+        latencies = run_thread_pool(mock_client(port), model, prompts, concurrency)
+        report(f"threads x{concurrency}", latencies, time.perf_counter() - started)
+
+        started = time.perf_counter()
+        latencies = asyncio.run(
+            run_fan_out(mock_client(port), model, prompts, concurrency)
+        )
+        report(f"asyncio x{concurrency}", latencies, time.perf_counter() - started)
+
+    server.terminate()
+
+
+# Run against the real API, or pass --benchmark to compare the engines offline.
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark()
+    else:
+        asyncio.run(main())
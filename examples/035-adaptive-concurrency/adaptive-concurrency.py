@@ -0,0 +1,236 @@
+# Adaptive concurrency (AIMD)
+# This example shows how to find the right number of requests to keep in flight without hand-tuning worker counts.
+# An AIMD (additive increase, multiplicative decrease) limiter slowly raises the limit while requests succeed quickly
+# and halves it whenever the API answers 429 RESOURCE_EXHAUSTED or 503 UNAVAILABLE, the same way TCP finds
+# the capacity of a network link. A benchmark against a local mock endpoint compares it with fixed worker counts.
+
+# Import the necessary libraries
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from google import genai
+from google.genai import errors
+
+# The status codes that mean "slow down" rather than "this request is broken".
+OVERLOAD_CODES = (429, 503)
+
+
+# The limiter. Every successful request adds `1 / limit` to the limit, so it
+# grows by about one slot per round trip. A 429 or 503, or a request that takes
+# much longer than the fastest one seen so far, multiplies the limit by `backoff`.
+# Requests sent before the last cut can't cut it again, so a burst of errors from
+# one overloaded round trip only halves the limit once.
+class AIMDLimiter:
+    def __init__(
+        self,
+        initial_limit=4,
+        min_limit=1,
+        max_limit=256,
+        backoff=0.5,
+        latency_tolerance=3.0,
+        window=5.0,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.window = window
+        self.in_flight = 0
+        self.throttled = 0
+        self.min_latency = None
+        self._last_decrease = 0.0
+        self._completions = deque()
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        """Wait for a free slot and return the time the request started."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return time.monotonic()
+
+    async def release(self, started, overloaded=False, adjust=True):
+        """Free a slot and, if `adjust`, adjust the limit from how the request went."""
+        now = time.monotonic()
+        latency = now - started
+        async with self._condition:
+            self.in_flight -= 1
+            if adjust and overloaded:
+                self.throttled += 1
+                self._decrease(started, now)
+            elif adjust:
+                self._completions.append(now)
+                if self.min_latency is None or latency < self.min_latency:
+                    self.min_latency = latency
+                if latency > self.min_latency * self.latency_tolerance:
+                    self._decrease(started, now)
+                else:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    def _decrease(self, started, now):
+        if started < self._last_decrease:
+            return
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        self._last_decrease = now
+
+    def metrics(self):
+        """Return the current limit and the throughput over the last window."""
+        cutoff = time.monotonic() - self.window
+        while self._completions and self._completions[0] < cutoff:
+            self._completions.popleft()
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "throughput": len(self._completions) / self.window,
+            "throttled": self.throttled,
+        }
+
+
+# Send one request through the limiter. Overload errors are reported to the
+# limiter and the request goes back into the queue after a short pause;
+# any other error is raised to the caller as usual. The slot is released
+# however the request ends, but only an answer or an API error adjusts the
+# limit: a dropped connection or a cancelled task says nothing about load.
+async def generate(client, limiter, model, prompt, retry_delay=1.0):
+    while True:
+        started = await limiter.acquire()
+        adjust = overloaded = False
+        try:
+            response = await client.aio.models.generate_content(
+                model=model, contents=prompt
+            )
+        except errors.APIError as e:
+            adjust, overloaded = True, e.code in OVERLOAD_CODES
+            if not overloaded:
+                raise
+        else:
+            adjust = True
+            return response.text
+        finally:
+            await limiter.release(started, overloaded=overloaded, adjust=adjust)
+        await asyncio.sleep(retry_delay)
+
+
+# Print the limiter's metrics every `interval` seconds while the batch runs.
+async def report_metrics(limiter, interval):
+    started = time.monotonic()
+    while True:
+        await asyncio.sleep(interval)
+        m = limiter.metrics()
+        print(
+            f"{time.monotonic() - started:5.1f}s  limit {m['limit']:3d}  "
+            f"in flight {m['in_flight']:3d}  {m['throughput']:6.1f} req/s  "
+            f"throttled {m['throttled']}"
+        )
+
+
+async def run_batch(client, limiter, model, prompts, interval=1.0, retry_delay=1.0):
+    reporter = asyncio.create_task(report_metrics(limiter, interval))
+    try:
+        return await asyncio.gather(
+            *(generate(client, limiter, model, p, retry_delay) for p in prompts)
+        )
+    finally:
+        reporter.cancel()
+
+
+# Run a batch of cat prompts against Gemini, starting with a limit of 2.
+# The limit climbs while the API keeps up and backs off when quota runs out.
+async def main():
+    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    prompts = [f"Give me cat name idea number {i}, just the name." for i in range(200)]
+    limiter = AIMDLimiter(initial_limit=2)
+
+    started = time.perf_counter()
+    names = await run_batch(client, limiter, "gemini-2.0-flash-lite", prompts)
+    elapsed = time.perf_counter() - started
+    print(f"{len(names)} names in {elapsed:.1f}s, e.g. {', '.join(n.strip() for n in names[:3])}")
+
+
+# For the benchmark, a local server stands in for the Gemini API. It can only
+# work on `MOCK_CAPACITY` requests at once and answers any extra ones with the
+# same 429 RESOURCE_EXHAUSTED error the real API returns when quota runs out.
+MOCK_LATENCY = 0.25
+MOCK_CAPACITY = 16
+MOCK_RESPONSE = json.dumps(
+    {
+        "candidates": [
+            {"content": {"role": "model", "parts": [{"text": "Whiskers"}]}}
+        ],
+        "usageMetadata": {"promptTokenCount": 12, "candidatesTokenCount": 2},
+    }
+).encode()
+MOCK_EXHAUSTED = json.dumps(
+    {
+        "error": {
+            "code": 429,
+            "message": "Resource has been exhausted (e.g. check quota).",
+            "status": "RESOURCE_EXHAUSTED",
+        }
+    }
+).encode()
+
+
+MOCK_LOCK = threading.Lock()
+mock_active = 0
+
+
+def mock_api(handler):
+    global mock_active
+    with MOCK_LOCK:
+        accepted = mock_active < MOCK_CAPACITY
+        if accepted:
+            mock_active += 1
+    if accepted:
+        time.sleep(MOCK_LATENCY)
+        with MOCK_LOCK:
+            mock_active -= 1
+        handler.send_json(MOCK_RESPONSE)
+    else:
+        handler.send_json(MOCK_EXHAUSTED, 429)
+
+
+# Run the same batch with fixed limits that are too low and too high, then with
+# the adaptive limiter. A fixed limit is just an AIMD limiter that never moves.
+async def benchmark(num_prompts=1000, model="gemini-2.0-flash-lite"):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools" / "mock_gemini"))
+    from mock_gemini import mock_client, start_mock_server
+
+    server, port = start_mock_server(mock_api)
+    client = mock_client(port)
+    prompts = [f"Give me cat name idea number {i}." for i in range(num_prompts)]
+    print(f"{num_prompts} requests, server capacity {MOCK_CAPACITY} in flight")
+
+    for label, limiter, interval in (
+        ("fixed x4", AIMDLimiter(4, min_limit=4, max_limit=4), None),
+        ("fixed x64", AIMDLimiter(64, min_limit=64, max_limit=64), None),
+        ("adaptive", AIMDLimiter(initial_limit=4), 2.0),
+    ):
+        started = time.perf_counter()
+        await run_batch(
+            client, limiter, model, prompts,
+            interval=interval or 3600, retry_delay=MOCK_LATENCY,
+        )
+        elapsed = time.perf_counter() - started
+        print(
+            f"{label:<10} {num_prompts / elapsed:6.1f} req/s  "
+            f"{limiter.throttled:5d} throttled  final limit {int(limiter.limit)}"
+        )
+
+    server.terminate()
+
+
+# Run against the real API, or pass --benchmark to try the limiter offline.
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        asyncio.run(benchmark())
+    else:
+        asyncio.run(main())
@@ -0,0 +1,35 @@
+# First, install the Google Generative AI library
+$ pip install google-genai
+
+# Run a batch against the Gemini API. The limit climbs from 2 until the per-minute quota pushes back with 429s.
+$ python adaptive-concurrency.py
+  1.0s  limit   3  in flight   3     1.0 req/s  throttled 0
+  2.0s  limit   5  in flight   5     2.6 req/s  throttled 0
+  3.0s  limit   7  in flight   7     4.8 req/s  throttled 0
+  4.0s  limit   9  in flight   9     7.4 req/s  throttled 0
+  5.0s  limit  11  in flight  11    10.2 req/s  throttled 0
+  6.0s  limit  13  in flight  13    13.4 req/s  throttled 0
+  7.0s  limit  14  in flight  14    17.0 req/s  throttled 0
+  8.0s  limit   7  in flight   6    18.6 req/s  throttled 3
+  9.0s  limit   9  in flight   9    17.8 req/s  throttled 3
+ 10.0s  limit  11  in flight  11    18.2 req/s  throttled 3
+ 11.0s  limit  12  in flight  12    19.4 req/s  throttled 3
+200 names in 11.6s, e.g. Whiskers McFluff, Professor Pounce, Mochi
+# Compare fixed limits with the adaptive limiter against a local mock endpoint that accepts 16 requests at once (no API key needed). A fixed limit of 64 is only slightly faster because it brute-forces the server with thousands of rejected requests, while the adaptive limit saws between 8 and 16.
+$ python adaptive-concurrency.py --benchmark
+1000 requests, server capacity 16 in flight
+fixed x4     13.2 req/s      0 throttled  final limit 4
+fixed x64    46.3 req/s   3755 throttled  final limit 64
+  2.0s  limit   8  in flight   8     5.8 req/s  throttled 0
+  4.0s  limit  14  in flight  14    20.4 req/s  throttled 0
+  6.0s  limit  12  in flight  12    35.2 req/s  throttled 1
+  8.0s  limit  10  in flight  10    41.6 req/s  throttled 2
+ 10.0s  limit  16  in flight  16    42.6 req/s  throttled 2
+ 12.0s  limit  14  in flight  14    42.6 req/s  throttled 3
+ 14.0s  limit  12  in flight  12    40.8 req/s  throttled 4
+ 16.0s  limit   9  in flight   9    42.6 req/s  throttled 5
+ 18.0s  limit  16  in flight  16    42.8 req/s  throttled 5
+ 20.0s  limit  14  in flight  14    44.2 req/s  throttled 6
+ 22.0s  limit  12  in flight  12    43.6 req/s  throttled 7
+ 24.1s  limit  10  in flight   9    44.8 req/s  throttled 8
+adaptive     39.9 req/s      8 throttled  final limit 13
@@ -0,0 +1,254 @@
+# Client-side rate limiting
+# This example shows how to stay inside a model's requests-per-minute (RPM) and tokens-per-minute (TPM) quota
+# before the API has to reject anything. Each request is charged against two token buckets, using an estimate
+# of its input tokens that is corrected from `usage_metadata` once the response arrives. The buckets live in a
+# lock-protected file, so every worker process on the machine shares the same quota.
+
+# Import the necessary libraries
+import fcntl
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from google import genai
+from google.genai import errors, types
+
+
+# The quota for one model, as listed on the rate limits page for your tier.
+@dataclass
+class Quota:
+    rpm: int
+    tpm: int
+
+
+# A rough, deliberately high estimate of a prompt's input tokens. English text
+# averages about four characters per token; dividing by three leaves headroom,
+# and the difference is handed back once the real count is known.
+def estimate_tokens(text):
+    return len(text) // 3 + 1
+
+
+# The limiter keeps a requests bucket and a tokens bucket per model. Both refill
+# continuously at their per-minute rate and hold at most one minute's worth.
+# All state is read and written under an exclusive `flock`, so separate
+# processes (or separate scripts) using the same file share one quota.
+# `fcntl` is available on Linux and macOS.
+class SharedRateLimiter:
+    def __init__(self, path, quotas, period=60.0):
+        self.path = Path(path)
+        self.quotas = quotas
+        self.period = period
+
+    @contextmanager
+    def _buckets(self, model):
+        """Lock the state file and yield the refilled buckets for a model."""
+        with open(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600), "r+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                state = json.loads(f.read() or "{}")
+                quota = self.quotas[model]
+                now = time.time()
+                bucket = state.setdefault(
+                    model, {"requests": quota.rpm, "tokens": quota.tpm, "updated": now}
+                )
+                elapsed = max(0.0, now - bucket["updated"])
+                bucket["requests"] = min(
+                    quota.rpm, bucket["requests"] + elapsed * quota.rpm / self.period
+                )
+                bucket["tokens"] = min(
+                    quota.tpm, bucket["tokens"] + elapsed * quota.tpm / self.period
+                )
+                bucket["updated"] = now
+                yield bucket
+                f.seek(0)
+                f.truncate()
+                json.dump(state, f)
+                f.flush()  # Write before another process can take the lock
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def acquire(self, model, tokens):
+        """Block until one request and `tokens` input tokens fit in the quota."""
+        quota = self.quotas[model]
+        tokens = min(tokens, quota.tpm)  # An oversized prompt waits for a full bucket
+        while True:
+            with self._buckets(model) as bucket:
+                if bucket["requests"] >= 1 and bucket["tokens"] >= tokens:
+                    bucket["requests"] -= 1
+                    bucket["tokens"] -= tokens
+                    return tokens
+                wait = max(
+                    (1 - bucket["requests"]) * self.period / quota.rpm,
+                    (tokens - bucket["tokens"]) * self.period / quota.tpm,
+                )
+            time.sleep(wait)
+
+    def reconcile(self, model, charged, actual):
+        """Correct a request's token charge once the real count is known."""
+        with self._buckets(model) as bucket:
+            bucket["tokens"] = min(
+                self.quotas[model].tpm, bucket["tokens"] + charged - actual
+            )
+
+
+# Wrap `generate_content` with the limiter: pre-charge the estimate, send the
+# request, then settle up with the prompt token count the API reports. When a
+# response has no count, the estimate stands.
+def generate(client, limiter, model, prompt):
+    charged = limiter.acquire(model, estimate_tokens(prompt))
+    try:
+        response = client.models.generate_content(model=model, contents=prompt)
+    except errors.APIError:
+        limiter.reconcile(model, charged, 0)
+        raise
+    usage = response.usage_metadata
+    if usage and usage.prompt_token_count is not None:
+        limiter.reconcile(model, charged, usage.prompt_token_count)
+    return response
+
+
+# Each worker process builds its own client and works through its share of
+# the prompts. The limiter is just a file path and quotas, so it is cheap to
+# send to a child process.
+def worker(limiter, model, prompts, base_url=None):
+    http_options = types.HttpOptions(base_url=base_url) if base_url else None
+    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY", "mock"), http_options=http_options)
+    ok = throttled = 0
+    for prompt in prompts:
+        try:
+            if limiter:
+                generate(client, limiter, model, prompt)
+            else:
+                client.models.generate_content(model=model, contents=prompt)
+            ok += 1
+        except errors.APIError as e:
+            if e.code != 429:
+                raise
+            throttled += 1
+    return ok, throttled
+
+
+def run_workers(limiter, model, prompts, processes, base_url=None):
+    shares = [prompts[i::processes] for i in range(processes)]
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.starmap(
+            worker, [(limiter, model, share, base_url) for share in shares]
+        )
+    return sum(ok for ok, _ in results), sum(t for _, t in results)
+
+
+# Four processes share the free-tier quota for Gemini 2.0 Flash-Lite. The
+# first 30 requests go straight out; after that, the workers are paced at one
+# request every two seconds between them instead of collecting 429s.
+def main():
+    model = "gemini-2.0-flash-lite"
+    limiter = SharedRateLimiter(
+        Path(tempfile.gettempdir()) / "gemini-quota.json",
+        {model: Quota(rpm=30, tpm=1_000_000)},
+    )
+    prompts = [f"Give me a one-line fact about cat number {i}." for i in range(40)]
+
+    started = time.perf_counter()
+    ok, throttled = run_workers(limiter, model, prompts, processes=4)
+    elapsed = time.perf_counter() - started
+    print(f"{ok} requests in {elapsed:.1f}s, {throttled} rejected with 429")
+
+
+# For the benchmark, a local server enforces a quota with the same bucket rules
+# as the real API and answers 429 RESOURCE_EXHAUSTED when a request doesn't
+# fit. It counts four characters per token. To keep the run short, a "minute"
+# lasts `MOCK_PERIOD` seconds on both sides.
+MOCK_PERIOD = 5.0
+MOCK_QUOTA = Quota(rpm=100, tpm=3000)
+MOCK_EXHAUSTED = json.dumps(
+    {
+        "error": {
+            "code": 429,
+            "message": "Resource has been exhausted (e.g. check quota).",
+            "status": "RESOURCE_EXHAUSTED",
+        }
+    }
+).encode()
+
+
+MOCK_LOCK = threading.Lock()
+mock_bucket = None
+
+
+def mock_take(tokens):
+    global mock_bucket
+    with MOCK_LOCK:
+        now = time.time()
+        bucket = mock_bucket or [MOCK_QUOTA.rpm, MOCK_QUOTA.tpm, now]
+        elapsed = now - bucket[2]
+        requests = min(MOCK_QUOTA.rpm, bucket[0] + elapsed * MOCK_QUOTA.rpm / MOCK_PERIOD)
+        available = min(MOCK_QUOTA.tpm, bucket[1] + elapsed * MOCK_QUOTA.tpm / MOCK_PERIOD)
+        accepted = requests >= 1 and available >= tokens
+        if accepted:
+            requests, available = requests - 1, available - tokens
+        mock_bucket = [requests, available, now]
+        return accepted
+
+
+def mock_api(handler):
+    tokens = len(handler.json()["contents"][0]["parts"][0]["text"]) // 4 + 1
+    if not mock_take(tokens):
+        handler.send_json(MOCK_EXHAUSTED, 429)
+        return
+    handler.send_json(
+        {
+            "candidates": [
+                {"content": {"role": "model", "parts": [{"text": "Cats purr."}]}}
+            ],
+            "usageMetadata": {"promptTokenCount": tokens, "candidatesTokenCount": 3},
+        }
+    )
+
+
+# Send the same prompts from four processes, first with no limiter (rejected
+# requests are simply dropped) and then sharing one limiter. The limiter is set
+# 5% under the server's quota to leave headroom for timing differences between
+# the two clocks. Each run gets a fresh server so both start with a full quota.
+def benchmark(num_prompts=400, processes=4, model="gemini-2.0-flash-lite"):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools" / "mock_gemini"))
+    from mock_gemini import mock_base_url, start_mock_server
+
+    prompts = [
+        f"Tell me cat fact number {i}." + " Keep it short and friendly." * (i % 5)
+        for i in range(num_prompts)
+    ]
+    print(
+        f"{num_prompts} requests from {processes} processes, quota {MOCK_QUOTA.rpm} "
+        f"requests and {MOCK_QUOTA.tpm} tokens per {MOCK_PERIOD:.0f}s"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        quota = Quota(rpm=int(MOCK_QUOTA.rpm * 0.95), tpm=int(MOCK_QUOTA.tpm * 0.95))
+        limiter = SharedRateLimiter(Path(tmp) / "quota.json", {model: quota}, period=MOCK_PERIOD)
+        for label, run_limiter in (("no limiter", None), ("shared", limiter)):
+            server, port = start_mock_server(mock_api)
+            started = time.perf_counter()
+            ok, throttled = run_workers(run_limiter, model, prompts, processes, mock_base_url(port))
+            elapsed = time.perf_counter() - started
+            server.terminate()
+            print(
+                f"{label:<11} {ok:4d} accepted  {throttled:4d} rejected with 429  "
+                f"{elapsed:5.1f}s  {ok / elapsed:5.1f} req/s"
+            )
+
+
+# Run against the real API, or pass --benchmark to try the limiter offline.
+# The main guard lets the worker processes start on every platform.
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark()
+    else:
+        main()
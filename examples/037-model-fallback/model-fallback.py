@@ -0,0 +1,268 @@
+# Model fallback with circuit breakers
+# This example shows how to keep latency bounded when a model slows down or starts failing. A circuit breaker
+# tracks each model's recent latency and error rate against a service level objective (SLO). When a model breaches
+# it, the circuit opens and requests go to a fallback model instead. After a cooldown, a few probe requests
+# test the primary model again and close the circuit once it has recovered.
+
+# Import the necessary libraries
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+from google import genai
+from google.genai import errors, types
+
+
+# The SLO for a model: the given percentile of its latency must stay under
+# `latency` seconds and its error rate under `error_rate`.
+@dataclass
+class SLO:
+    latency: float
+    percentile: int = 95
+    error_rate: float = 0.05
+
+
+# A circuit breaker for one model. While closed, it records every request in a
+# rolling time window and opens as soon as the window breaches the SLO. While
+# open, it rejects requests until `cooldown` seconds have passed. Then it goes
+# half-open and lets one probe request through at a time: a fast success closes
+# the circuit, anything else opens it again.
+class CircuitBreaker:
+    def __init__(self, slo, window=10.0, min_requests=10, cooldown=5.0):
+        self.slo = slo
+        self.window = window
+        self.min_requests = min_requests
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.probing = False
+        self.samples = deque()  # (time, latency, ok)
+        self.transitions = []
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """Return True if a request may be sent to this model now."""
+        with self.lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+                self._move_to("half-open")
+            if self.state == "closed":
+                return True
+            if self.state == "half-open" and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def record(self, latency, ok):
+        """Record the outcome of a request that `allow` let through.
+
+        `ok` is None when the outcome says nothing about the model, such as a
+        rejected bad request: it ends a probe without counting either way.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if self.state == "half-open":
+                self.probing = False
+                if ok is None:
+                    return
+                if ok and latency <= self.slo.latency:
+                    self.samples.clear()
+                    self._move_to("closed")
+                else:
+                    self._open(now)
+                return
+            if ok is None:
+                return
+            self.samples.append((now, latency, ok))
+            while self.samples[0][0] < now - self.window:
+                self.samples.popleft()
+            if self.state == "closed" and self._breached():
+                self._open(now)
+
+    def _breached(self):
+        if len(self.samples) < self.min_requests:
+            return False
+        latencies = sorted(latency for _, latency, _ in self.samples)
+        errors_seen = sum(1 for _, _, ok in self.samples if not ok)
+        slow = latencies[int(self.slo.percentile / 100 * (len(latencies) - 1))]
+        return (
+            slow > self.slo.latency
+            or errors_seen / len(self.samples) > self.slo.error_rate
+        )
+
+    def _open(self, now):
+        self.opened_at = now
+        self._move_to("open")
+
+    def _move_to(self, state):
+        self.state = state
+        self.transitions.append((time.monotonic(), state))
+
+
+# Client errors that mean the request itself is wrong, so every model would
+# reject it. These are raised to the caller rather than counted against the
+# model. Rate limiting (429) is not among them: another model may have quota.
+CLIENT_ERRORS = (400, 401, 403, 404)
+
+
+# The router tries each model in order of preference and skips any whose
+# circuit is open. A timeout, connection failure or server error counts
+# against the model and the same request moves on to the next one. The
+# outcome is recorded however the request ends, so a probe is never left
+# open. The last model has no breaker, so there is always somewhere to send a
+# request.
+class ModelRouter:
+    def __init__(self, client, models, slo, **breaker_options):
+        self.client = client
+        self.models = models
+        self.breakers = {m: CircuitBreaker(slo, **breaker_options) for m in models[:-1]}
+        self.served = Counter()
+
+    def generate_content(self, contents):
+        """Return (model, response) from the first model that answers."""
+        for model in self.models:
+            breaker = self.breakers.get(model)
+            if breaker and not breaker.allow():
+                continue
+            started = time.perf_counter()
+            ok = False
+            try:
+                response = self.client.models.generate_content(
+                    model=model, contents=contents
+                )
+                ok = True
+            except (errors.APIError, httpx.TransportError) as e:
+                if isinstance(e, errors.APIError) and e.code in CLIENT_ERRORS:
+                    ok = None
+                    raise
+                if not breaker:
+                    raise
+                continue
+            finally:
+                if breaker:
+                    breaker.record(time.perf_counter() - started, ok)
+            self.served[model] += 1
+            return model, response
+
+
+# Route requests to Gemini 2.0 Flash, falling back to Flash-Lite when Flash
+# breaches a 95th percentile latency of 5 seconds. The client timeout stops a
+# stuck request from waiting longer than twice that.
+def main():
+    client = genai.Client(
+        api_key=os.getenv("GEMINI_API_KEY"),
+        http_options=types.HttpOptions(timeout=10_000),
+    )
+    router = ModelRouter(client, ["gemini-2.0-flash", "gemini-2.0-flash-lite"], SLO(latency=5.0))
+    for breed in ["Siamese", "Persian", "Maine Coon"]:
+        model, response = router.generate_content(
+            f"In one sentence, describe the {breed} cat."
+        )
+        print(f"{model}: {response.text.strip()}")
+
+
+# For the benchmark, a local server stands in for the Gemini API. The primary
+# model normally answers in 100 ms, but from 3 to 9 seconds after start-up it
+# takes 3 seconds, like a regional slowdown. The fallback model
+# always answers in 50 ms.
+PRIMARY = "gemini-2.0-flash"
+FALLBACK = "gemini-2.0-flash-lite"
+MOCK_SLOWDOWN = (3.0, 9.0)
+MOCK_RESPONSE = json.dumps(
+    {
+        "candidates": [
+            {"content": {"role": "model", "parts": [{"text": "A cat."}]}}
+        ],
+        "usageMetadata": {"promptTokenCount": 10, "candidatesTokenCount": 3},
+    }
+).encode()
+
+
+def mock_api(handler):
+    elapsed = time.monotonic() - handler.settings["started"]
+    if f"/{PRIMARY}:" not in handler.path:
+        time.sleep(0.05)
+    elif MOCK_SLOWDOWN[0] <= elapsed < MOCK_SLOWDOWN[1]:
+        time.sleep(3.0)
+    else:
+        time.sleep(0.1)
+    handler.send_json(MOCK_RESPONSE)
+
+
+# Send requests from 8 threads for `duration` seconds and time each one.
+# Timed-out requests are counted as failures, and their time still counts
+# towards the latency percentiles: that is how long the caller waited.
+def run(send, duration):
+    deadline = time.monotonic() + duration
+    latencies, failures = [], 0
+
+    def loop(worker):
+        nonlocal failures
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                send(f"Describe cat number {worker}.")
+            except (errors.APIError, httpx.TransportError):
+                failures += 1
+            latencies.append(time.perf_counter() - started)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(loop, range(8)))
+    return sorted(latencies), failures
+
+
+def report(label, latencies, failures):
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(0.99 * (len(latencies) - 1))] * 1000
+    print(
+        f"{label:<13} {len(latencies) - failures:5d} ok  {failures:4d} timed out  "
+        f"p50 {p50:5.0f} ms  p99 {p99:5.0f} ms"
+    )
+
+
+# Run through the slowdown twice: once calling the primary model directly and
+# once through the router with a 500 ms p95 SLO. Then show when the circuit
+# opened, probed and closed, relative to the start of the run.
+def benchmark(duration=14.0):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools" / "mock_gemini"))
+    from mock_gemini import mock_client, start_mock_server
+
+    print(f"{PRIMARY} slows down from {MOCK_SLOWDOWN[0]:.0f}s to {MOCK_SLOWDOWN[1]:.0f}s")
+
+    # Every request gets a 1 second timeout
+    server, port = start_mock_server(mock_api, started=time.monotonic())
+    client = mock_client(port, timeout=1000)
+    latencies, failures = run(
+        lambda prompt: client.models.generate_content(model=PRIMARY, contents=prompt),
+        duration,
+    )
+    report("primary only", latencies, failures)
+    server.terminate()
+
+    server, port = start_mock_server(mock_api, started=time.monotonic())
+    router = ModelRouter(
+        mock_client(port, timeout=1000), [PRIMARY, FALLBACK], SLO(latency=0.5), window=2.0, cooldown=2.0
+    )
+    started = time.monotonic()
+    latencies, failures = run(router.generate_content, duration)
+    report("with fallback", latencies, failures)
+    server.terminate()
+
+    print(", ".join(f"{model} {count}" for model, count in router.served.items()))
+    for at, state in router.breakers[PRIMARY].transitions:
+        print(f"{at - started:5.1f}s  circuit {state}")
+
+
+# Run against the real API, or pass --benchmark to try the router offline.
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark()
+    else:
+        main()
@@ -0,0 +1,20 @@
+# First, install the Google Generative AI library
+$ pip install google-genai
+
+# Run the router against the Gemini API. While Gemini 2.0 Flash is within its SLO, it serves every request.
+$ python model-fallback.py
+gemini-2.0-flash: The Siamese is a sleek, vocal cat with striking blue almond-shaped eyes and a pale coat with darker points.
+gemini-2.0-flash: The Persian is a gentle, quiet cat known for its long, flowing coat and sweet, flat-faced expression.
+gemini-2.0-flash: The Maine Coon is a large, sociable cat with a shaggy coat, tufted ears and a bushy tail.
+
+# Send traffic through a simulated slowdown of the primary model using a local mock endpoint (no API key needed). The circuit opens one timeout after the slowdown starts, a failed probe keeps it open, and it closes again as soon as the primary recovers.
+$ python model-fallback.py --benchmark
+gemini-2.0-flash slows down from 3s to 9s
+primary only    430 ok    48 timed out  p50   149 ms  p99  1014 ms
+with fallback   824 ok     0 timed out  p50   144 ms  p99   184 ms
+gemini-2.0-flash 422, gemini-2.0-flash-lite 402
+  4.0s  circuit open
+  6.0s  circuit half-open
+  7.0s  circuit open
+  9.0s  circuit half-open
+  9.1s  circuit closed
@@ -0,0 +1,263 @@
+# Batch jobs from JSONL
+# This example shows a pipeline for large offline workloads. It reads requests from a JSONL file, splits them into
+# chunks and submits each chunk as a Gemini batch job, which is cheaper than interactive requests and doesn't count
+# against your per-minute rate limits. Jobs are polled with backoff, each finished chunk is checkpointed to disk,
+# and an interrupted run picks up where it stopped. Results are written back in input order.
+
+# Import the necessary libraries
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from google import genai
+from google.genai import errors
+
+# Batch job states after which a job will not change any more.
+FINISHED_STATES = {
+    "JOB_STATE_SUCCEEDED",
+    "JOB_STATE_PARTIALLY_SUCCEEDED",
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED",
+}
+
+
+# Submit a chunk as a batch job with inlined requests, and check on it later.
+# `poll` returns None while the job is still running and one result per request,
+# in order, once it has finished. It raises LookupError for a job that no longer
+# exists, and RuntimeError for one that failed, was cancelled or expired.
+class GeminiBatches:
+    def __init__(self, client):
+        self.client = client
+
+    def submit(self, model, chunk):
+        job = self.client.batches.create(
+            model=model,
+            src=[record["request"] for record in chunk],
+            config={"display_name": f"cats-{uuid.uuid4().hex[:8]}"},
+        )
+        return job.name
+
+    def poll(self, name):
+        try:
+            job = self.client.batches.get(name=name)
+        except errors.ClientError as e:
+            if e.code in (403, 404):
+                raise LookupError(name) from e  # Deleted, or from another project
+            raise
+        if job.state.name not in FINISHED_STATES:
+            return None
+        if job.state.name not in ("JOB_STATE_SUCCEEDED", "JOB_STATE_PARTIALLY_SUCCEEDED"):
+            raise RuntimeError(f"Batch job {name} ended in {job.state.name}")
+        return [
+            {
+                "text": r.response.text if r.response else None,
+                "error": str(r.error) if r.error else None,
+            }
+            for r in job.dest.inlined_responses
+        ]
+
+
+# A local stand-in with the same interface, for trying the pipeline without
+# the batch API. Each "job" runs its requests on a shared thread pool. Jobs only
+# live as long as the process, so `poll` raises LookupError for a job from an
+# earlier run and the pipeline submits that chunk again.
+class LocalBatches:
+    def __init__(self, client, workers=8):
+        self.client = client
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.jobs = {}
+
+    def submit(self, model, chunk):
+        name = f"local/{uuid.uuid4().hex[:8]}"
+        self.jobs[name] = [
+            self.executor.submit(self.run_request, model, record["request"])
+            for record in chunk
+        ]
+        return name
+
+    def run_request(self, model, request):
+        try:
+            response = self.client.models.generate_content(model=model, **request)
+            return {"text": response.text, "error": None}
+        except errors.APIError as e:
+            return {"text": None, "error": str(e)}
+
+    def poll(self, name):
+        if name not in self.jobs:
+            raise LookupError(name)
+        if not all(future.done() for future in self.jobs[name]):
+            return None
+        return [future.result() for future in self.jobs.pop(name)]
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_jsonl(path, records):
+    # Write to a temporary file and rename it, so a crash never leaves half a file
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    os.replace(tmp, path)
+
+
+# The pipeline. Up to `max_active` chunks are in flight at once. The names of
+# submitted jobs are saved to `jobs.json` in the checkpoint directory, and each
+# finished chunk is saved as its own JSONL file, so a restarted run skips
+# finished chunks and goes back to polling jobs that are still running. Chunks
+# are numbered, so a checkpoint is only valid for the chunk size it was made
+# with. A job that is gone is submitted again; a job that failed is recorded as
+# a failed result for every request in its chunk, rather than retried forever.
+# Polling starts every `min_poll` seconds and doubles up to `max_poll` while
+# nothing finishes, so a long job costs only a handful of status calls.
+def run_pipeline(
+    backend,
+    model,
+    input_path,
+    output_path,
+    chunk_size=100,
+    max_active=4,
+    min_poll=1.0,
+    max_poll=60.0,
+):
+    records = read_jsonl(input_path)
+    chunks = [records[i : i + chunk_size] for i in range(0, len(records), chunk_size)]
+    checkpoint = Path(f"{output_path}.checkpoint")
+    checkpoint.mkdir(exist_ok=True)
+    jobs_path = checkpoint / "jobs.json"
+    saved = json.loads(jobs_path.read_text()) if jobs_path.exists() else {}
+    if saved.get("chunk_size", chunk_size) != chunk_size:
+        raise ValueError(
+            f"{checkpoint} was made with a chunk size of {saved['chunk_size']}, "
+            f"not {chunk_size}: run with the same chunk size, or delete it to start again"
+        )
+    jobs = saved.get("jobs", {})
+
+    def save_jobs():
+        jobs_path.write_text(json.dumps({"chunk_size": chunk_size, "jobs": jobs}))
+
+    def chunk_path(i):
+        return checkpoint / f"chunk-{i:05d}.jsonl"
+
+    waiting = [i for i in range(len(chunks)) if not chunk_path(i).exists()]
+    active = {i: jobs[str(i)] for i in waiting if str(i) in jobs}
+    waiting = [i for i in waiting if i not in active]
+    print(
+        f"{len(records)} requests in {len(chunks)} chunks: "
+        f"{len(chunks) - len(waiting) - len(active)} done, {len(active)} submitted earlier"
+    )
+
+    delay = min_poll
+    while waiting or active:
+        while waiting and len(active) < max_active:
+            i = waiting.pop(0)
+            active[i] = jobs[str(i)] = backend.submit(model, chunks[i])
+            save_jobs()
+        time.sleep(delay)
+
+        finished = 0
+        for i, name in list(active.items()):
+            try:
+                results = backend.poll(name)
+            except LookupError:
+                del active[i]
+                waiting = sorted(waiting + [i])  # The job is gone: submit the chunk again
+                continue
+            except RuntimeError as e:
+                results = [{"text": None, "error": str(e)}] * len(chunks[i])
+            if results is None:
+                continue
+            # strict: a job that returns the wrong number of results is an
+            # error, not a reason to drop or misalign the rest of the chunk
+            write_jsonl(
+                chunk_path(i),
+                [
+                    {"key": r["key"], **result}
+                    for r, result in zip(chunks[i], results, strict=True)
+                ],
+            )
+            del active[i]
+            finished += 1
+            print(f"chunk {i + 1}/{len(chunks)} done ({name})")
+        delay = min_poll if finished else min(delay * 2, max_poll)
+
+    results = [row for i in range(len(chunks)) for row in read_jsonl(chunk_path(i))]
+    write_jsonl(Path(output_path), results)
+    failed = sum(1 for row in results if row["error"])
+    print(f"Wrote {len(results)} results to {output_path} ({failed} failed)")
+
+
+# Each input line has a unique key and a request in the same shape as the
+# arguments to `generate_content`. This writes a sample file to try it out.
+def write_sample_requests(path, count=500):
+    write_jsonl(
+        Path(path),
+        [
+            {
+                "key": f"cat-{i:04d}",
+                "request": {"contents": f"Write a haiku about cat number {i}."},
+            }
+            for i in range(count)
+        ],
+    )
+    print(f"Wrote {count} sample requests to {path}")
+
+
+# With --offline, the local stand-in sends the requests to a mock server that
+# answers every generateContent call after 200 ms.
+MOCK_RESPONSE = {
+    "candidates": [{"content": {"role": "model", "parts": [{"text": "Soft paws on the sill"}]}}],
+    "usageMetadata": {"promptTokenCount": 11, "candidatesTokenCount": 6},
+}
+
+
+def mock_api(handler):
+    time.sleep(0.2)
+    handler.send_json(MOCK_RESPONSE)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run a JSONL file of requests as batch jobs")
+    parser.add_argument("--input", default="cat-requests.jsonl")
+    parser.add_argument("--output", default="cat-results.jsonl")
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--offline", action="store_true", help="Use a local stand-in and mock server")
+    return parser.parse_args()
+
+
+# Batch jobs usually finish within minutes but can take up to 24 hours, so the
+# real API is polled at most once a minute. The offline run polls every second.
+def main():
+    args = parse_args()
+    if not os.path.exists(args.input):
+        write_sample_requests(args.input)
+
+    model = "gemini-2.0-flash-lite"
+    server, max_poll = None, 60.0
+    if args.offline:
+        sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools" / "mock_gemini"))
+        from mock_gemini import mock_client, start_mock_server
+
+        server, port = start_mock_server(mock_api)
+        backend, max_poll = LocalBatches(mock_client(port)), 1.0
+    else:
+        backend = GeminiBatches(genai.Client(api_key=os.getenv("GEMINI_API_KEY")))
+    try:
+        run_pipeline(backend, model, args.input, args.output, args.chunk_size, max_poll=max_poll)
+    except ValueError as e:
+        sys.exit(f"Error: {e}")  # Such as a checkpoint made with another chunk size
+    finally:
+        if server:
+            server.terminate()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# First, install the Google Generative AI library
+$ pip install google-genai
+
+# Submit 500 sample requests as five batch jobs. Polling backs off to once a minute while the jobs run.
+$ python batch-jobs.py
+Wrote 500 sample requests to cat-requests.jsonl
+500 requests in 5 chunks: 0 done, 0 submitted earlier
+chunk 2/5 done (batches/8kq3x7v2n1pd5m0c4t6w)
+chunk 1/5 done (batches/2rf9b0h6s4yj1e8a7u3q)
+chunk 3/5 done (batches/5nz1c8m4w2kx7g0p9v6d)
+chunk 4/5 done (batches/0tb6e3q9l5ra2h8y1s4f)
+chunk 5/5 done (batches/7wd4k1p8f0uc3n6j2x9m)
+Wrote 500 results to cat-results.jsonl (0 failed)
+
+# Try the pipeline offline with the local stand-in and a mock server (no API key needed), stopping it after 6 seconds.
+$ timeout 6 python batch-jobs.py --offline --chunk-size 50 --output offline-results.jsonl
+500 requests in 10 chunks: 0 done, 0 submitted earlier
+chunk 1/10 done (local/e780d837)
+chunk 2/10 done (local/3edf0623)
+
+# Run it again: finished chunks are skipped, and the four local jobs that died with the first run are submitted again.
+$ python batch-jobs.py --offline --chunk-size 50 --output offline-results.jsonl
+500 requests in 10 chunks: 2 done, 4 submitted earlier
+chunk 3/10 done (local/7578f3c7)
+chunk 4/10 done (local/3bafb819)
+chunk 5/10 done (local/0c7b4f35)
+chunk 6/10 done (local/92876b66)
+chunk 7/10 done (local/9720709c)
+chunk 8/10 done (local/7839655f)
+chunk 9/10 done (local/94699172)
+chunk 10/10 done (local/e48a5c14)
+Wrote 500 results to offline-results.jsonl (0 failed)
+
+# Chunks are numbered, so a checkpoint can't be resumed with a different chunk size. The script stops with an error instead.
+$ python batch-jobs.py --offline --chunk-size 100 --output offline-results.jsonl
+Error: offline-results.jsonl.checkpoint was made with a chunk size of 50, not 100: run with the same chunk size, or delete it to start again
@@ -0,0 +1,231 @@
+# Request coalescing
+# This example shows how to stop a busy service from sending the same request to Gemini several times at once.
+# Identical `generate_content` and `embed_content` calls are reduced to a key, and while one of them is in flight,
+# every duplicate waits for its result instead of making its own call ("single flight"). Nothing is stored once the
+# call finishes, so this saves quota and latency without the staleness of a cache. It works from threads and asyncio.
+
+# Import the necessary libraries
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from google import genai
+from google.genai import types
+
+
+# Reduce a call to a stable key. SDK types are converted to plain JSON and
+# dictionaries are sorted, so the same request always gives the same key
+# however its config was built.
+def canonical(value):
+    if hasattr(value, "model_dump"):
+        return canonical(value.model_dump(mode="json", exclude_none=True))
+    if isinstance(value, dict):
+        return {k: canonical(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [canonical(v) for v in value]
+    return value
+
+
+def request_key(method, **kwargs):
+    payload = json.dumps([method, canonical(kwargs)], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# The thread version. The first caller for a key (the leader) makes the call
+# and publishes the outcome on a Future; callers that arrive while it is in
+# flight wait on the same Future. Errors are shared too, so a failure isn't
+# retried by every waiter at once.
+class SingleFlight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.sent = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.calls[key] = Future()
+                self.sent += 1
+            else:
+                self.coalesced += 1
+        if leader:
+            try:
+                future.set_result(fn())
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self.lock:
+                    del self.calls[key]
+        return future.result()
+
+
+# The asyncio version. The leader's call runs as a task, and every caller
+# awaits it through `asyncio.shield`, so one caller being cancelled doesn't
+# cancel the call for everyone else.
+class AsyncSingleFlight:
+    def __init__(self):
+        self.calls = {}
+        self.sent = 0
+        self.coalesced = 0
+
+    async def do(self, key, coroutine_fn):
+        task = self.calls.get(key)
+        if task is None:
+            task = self.calls[key] = asyncio.ensure_future(coroutine_fn())
+            task.add_done_callback(lambda _: self.calls.pop(key, None))
+            self.sent += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+
+# Wrap a client so its generate and embed calls go through single flight.
+# Coalesced callers share one response object, so treat responses as read-only.
+class CoalescingModels:
+    def __init__(self, client):
+        self.client = client
+        self.flight = SingleFlight()
+        self.async_flight = AsyncSingleFlight()
+
+    def generate_content(self, **kwargs):
+        return self.flight.do(
+            request_key("generate_content", **kwargs),
+            lambda: self.client.models.generate_content(**kwargs),
+        )
+
+    def embed_content(self, **kwargs):
+        return self.flight.do(
+            request_key("embed_content", **kwargs),
+            lambda: self.client.models.embed_content(**kwargs),
+        )
+
+    async def generate_content_async(self, **kwargs):
+        return await self.async_flight.do(
+            request_key("generate_content", **kwargs),
+            lambda: self.client.aio.models.generate_content(**kwargs),
+        )
+
+    async def embed_content_async(self, **kwargs):
+        return await self.async_flight.do(
+            request_key("embed_content", **kwargs),
+            lambda: self.client.aio.models.embed_content(**kwargs),
+        )
+
+
+# Twelve threads ask the same two questions at the same moment, as happens
+# when a popular page is loaded by many users at once. Only two requests are
+# sent to Gemini.
+def main():
+    models = CoalescingModels(genai.Client(api_key=os.getenv("GEMINI_API_KEY")))
+    questions = ["Why do cats purr?", "Why do cats knead blankets?"] * 6
+
+    def ask(question):
+        response = models.generate_content(model="gemini-2.0-flash-lite", contents=question)
+        return question, response.text.strip()
+
+    with ThreadPoolExecutor(max_workers=len(questions)) as executor:
+        answers = dict(executor.map(ask, questions))
+    for question, answer in answers.items():
+        print(f"{question}\n{answer}")
+    print(f"{len(questions)} calls, {models.flight.sent} requests sent")
+
+
+# For the benchmark, a local server stands in for the Gemini API, answering
+# generateContent after 200 ms and embedding requests after 50 ms. It counts
+# the requests it receives, so the benchmark can tell how many were sent.
+MOCK_GENERATE = {
+    "candidates": [{"content": {"role": "model", "parts": [{"text": "To say hello."}]}}],
+    "usageMetadata": {"promptTokenCount": 6, "candidatesTokenCount": 4},
+}
+MOCK_EMBED = {"embeddings": [{"values": [0.1, 0.2, 0.3]}]}
+
+
+def mock_api(handler):
+    embed = "mbedContent" in handler.path
+    time.sleep(0.05 if embed else 0.2)
+    handler.send_json(MOCK_EMBED if embed else MOCK_GENERATE)
+
+
+# A burst of calls where most are duplicates: 200 generate calls over 10
+# distinct prompts and 200 embed calls over 20 distinct texts, all in flight
+# together. Each is run from 32 threads and then as asyncio tasks.
+def burst(num_calls=200):
+    config = types.GenerateContentConfig(temperature=0)
+    prompts = [f"Why does cat {i % 10} purr?" for i in range(num_calls)]
+    texts = [f"cat {i % 20}" for i in range(num_calls)]
+    generate = [dict(model="gemini-2.0-flash-lite", contents=p, config=config) for p in prompts]
+    embed = [dict(model="text-embedding-004", contents=t) for t in texts]
+    return generate, embed
+
+
+def run_threads(client, models, generate, embed):
+    def call(kind_and_args):
+        kind, kwargs = kind_and_args
+        target = models if models else client.models
+        return getattr(target, kind)(**kwargs)
+
+    calls = [("generate_content", a) for a in generate] + [("embed_content", a) for a in embed]
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        list(executor.map(call, calls))
+
+
+async def run_async(client, models, generate, embed):
+    if models:
+        await asyncio.gather(
+            *(models.generate_content_async(**a) for a in generate),
+            *(models.embed_content_async(**a) for a in embed),
+        )
+    else:
+        await asyncio.gather(
+            *(client.aio.models.generate_content(**a) for a in generate),
+            *(client.aio.models.embed_content(**a) for a in embed),
+        )
+
+
+def benchmark():
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools" / "mock_gemini"))
+    from mock_gemini import mock_client, requests_received, start_mock_server
+
+    server, port = start_mock_server(mock_api)
+    generate, embed = burst()
+    keys = {request_key("generate_content", **a) for a in generate}
+    keys |= {request_key("embed_content", **a) for a in embed}
+    print(f"{len(generate) + len(embed)} calls, {len(keys)} distinct")
+
+    for label, coalesce, use_asyncio in (
+        ("threads", False, False),
+        ("threads", True, False),
+        ("asyncio", False, True),
+        ("asyncio", True, True),
+    ):
+        client = mock_client(port)
+        models = CoalescingModels(client) if coalesce else None
+        before = requests_received(port)
+        started = time.perf_counter()
+        if use_asyncio:
+            asyncio.run(run_async(client, models, generate, embed))
+        else:
+            run_threads(client, models, generate, embed)
+        elapsed = time.perf_counter() - started
+        sent = requests_received(port) - before
+        name = f"{label} {'coalesced' if coalesce else 'direct'}"
+        print(f"{name:<18} {sent:4d} requests sent  {elapsed:5.2f}s")
+
+    server.terminate()
+
+
+# Run against the real API, or pass --benchmark to try coalescing offline.
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark()
+    else:
+        main()
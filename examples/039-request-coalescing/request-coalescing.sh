@@ -0,0 +1,18 @@
+# First, install the Google Generative AI library
+$ pip install google-genai
+
+# Send twelve concurrent calls made up of two distinct questions. Each answer is fetched once and shared.
+$ python request-coalescing.py
+Why do cats purr?
+Cats purr mainly to communicate contentment, but also to soothe themselves when stressed or hurt, and the vibrations may even help heal bones and tissue.
+Why do cats knead blankets?
+Kneading is a comforting habit left over from kittenhood, when kittens knead their mother to stimulate milk flow; it also marks the blanket with scent glands in their paws.
+12 calls, 2 requests sent
+
+# Fire a burst of 400 calls over 30 distinct requests at a local mock endpoint (no API key needed). With 32 threads, only the duplicates that overlap in time share a call, since nothing is kept after it finishes; as asyncio tasks, all 400 are in flight together and collapse to 30 requests.
+$ python request-coalescing.py --benchmark
+400 calls, 30 distinct
+threads direct      400 requests sent   2.35s
+threads coalesced   120 requests sent   1.49s
+asyncio direct      400 requests sent   8.18s
+asyncio coalesced    30 requests sent   0.35s
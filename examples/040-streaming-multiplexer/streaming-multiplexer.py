@@ -0,0 +1,203 @@
+# Multiplexed streaming
+# This example shows how to run many streaming generations at once with the async client and measure how each
+# one feels to its user. Every stream feeds its own consumer through a small bounded queue, so a slow consumer
+# slows down only its own stream (backpressure) instead of buffering without limit. For each stream, the
+# time to first token (TTFT), the gaps between chunks and the total duration are recorded.
+
+# Import the necessary libraries
+import asyncio
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from google import genai
+
+
+# The timings for one stream, in seconds from when the request was made, and
+# the exception that ended it if it failed.
+@dataclass
+class StreamStats:
+    stream_id: int
+    ttft: float | None = None
+    gaps: list = field(default_factory=list)
+    total: float = 0.0
+    chunks: int = 0
+    characters: int = 0
+    error: Exception | None = None
+
+
+# The producer side of one stream. Each chunk is timed as it arrives and put
+# on the stream's queue; when the queue is full, `put` waits, so the stream
+# is only read as fast as its consumer can keep up. `None` marks the end of a
+# stream that finished.
+async def produce(client, model, prompt, queue, stats):
+    started = time.perf_counter()
+    last = started
+    try:
+        async for chunk in await client.aio.models.generate_content_stream(
+            model=model, contents=prompt
+        ):
+            now = time.perf_counter()
+            if stats.ttft is None:
+                stats.ttft = now - started
+            else:
+                stats.gaps.append(now - last)
+            last = now
+            stats.chunks += 1
+            stats.characters += len(chunk.text or "")
+            await queue.put(chunk.text or "")
+    finally:
+        stats.total = time.perf_counter() - started
+    await queue.put(None)
+
+
+# The multiplexer. Up to `max_streams` streams run at once. Each stream gets
+# its own queue and its own consumer task, made by calling
+# `make_consumer(stream_id, queue)`. If the stream or its consumer fails, the
+# other side is cancelled rather than left waiting on the queue, and the error
+# is recorded on the stream's stats so the other streams carry on.
+async def multiplex(client, model, prompts, make_consumer, max_streams=8, queue_size=4):
+    semaphore = asyncio.Semaphore(max_streams)
+    all_stats = [StreamStats(i) for i in range(len(prompts))]
+
+    async def run_stream(i, prompt):
+        async with semaphore:
+            queue = asyncio.Queue(maxsize=queue_size)
+            producer = asyncio.create_task(produce(client, model, prompt, queue, all_stats[i]))
+            consumer = asyncio.create_task(make_consumer(i, queue))
+            try:
+                await asyncio.gather(producer, consumer)
+            except Exception as e:
+                all_stats[i].error = e
+            finally:
+                # If either side failed, stop the other instead of leaving it blocked
+                producer.cancel()
+                consumer.cancel()
+                await asyncio.gather(producer, consumer, return_exceptions=True)
+
+    await asyncio.gather(*(run_stream(i, p) for i, p in enumerate(prompts)))
+    return all_stats
+
+
+# Summarize the streams: TTFT and total duration percentiles across streams,
+# and inter-chunk gaps across every chunk of every stream. Only streams that
+# completed are timed; failed streams are counted by error, and streams that
+# ended before their first chunk have no TTFT and are counted separately.
+def summarize(all_stats):
+    def percentiles(values):
+        if not values:
+            return "no values"
+        values = sorted(values)
+        p95 = values[int(0.95 * (len(values) - 1))]
+        return f"p50 {statistics.median(values) * 1000:5.0f} ms  p95 {p95 * 1000:5.0f} ms"
+
+    completed = [s for s in all_stats if s.error is None]
+    failed = Counter(type(s.error).__name__ for s in all_stats if s.error is not None)
+    gaps = [gap for stats in completed for gap in stats.gaps]
+    ttfts = [s.ttft for s in completed if s.ttft is not None]
+    if failed:
+        errors = ", ".join(f"{name} ({count})" for name, count in failed.most_common())
+        failures = f"{sum(failed.values())} of {len(all_stats)} streams"
+        print(f"  failed                {failures}: {errors}")
+    print(f"  time to first token   {percentiles(ttfts)}")
+    if len(ttfts) < len(completed):
+        print(f"  no first token        {len(completed) - len(ttfts)} of {len(completed)} streams")
+    print(f"  gap between chunks    {percentiles(gaps)}")
+    print(f"  total per stream      {percentiles([s.total for s in completed])}")
+
+
+# A consumer that prints each stream's text once it is complete, so the
+# concurrent streams don't interleave on the terminal.
+def printing_consumer(prompts):
+    async def consume(stream_id, queue):
+        parts = []
+        while (text := await queue.get()) is not None:
+            parts.append(text)
+        print(f"[{stream_id}] {prompts[stream_id]}\n{''.join(parts).strip()}")
+
+    return consume
+
+
+# Stream four cat poems at once and report the latency of each stream.
+async def main():
+    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    topics = ["a kitten's first snow", "a cat on a warm laptop", "a cat at the vet", "a cat burglar"]
+    prompts = [f"Write a four-line poem about {topic}." for topic in topics]
+
+    all_stats = await multiplex(client, "gemini-2.0-flash", prompts, printing_consumer(prompts))
+    for s in all_stats:
+        if s.error is not None:
+            print(f"stream {s.stream_id}: failed after {s.total * 1000:.0f} ms: {s.error}")
+            continue
+        first = f"{s.ttft * 1000:.0f} ms" if s.ttft is not None else "never"
+        print(
+            f"stream {s.stream_id}: first token {first}, "
+            f"{s.chunks} chunks, done in {s.total * 1000:.0f} ms"
+        )
+
+
+# For the benchmark, a local server stands in for the Gemini API. Each stream
+# sends its first chunk after 300 ms and then one chunk every 50 ms, as
+# server-sent events.
+MOCK_FIRST_CHUNK = 0.3
+MOCK_CHUNK_INTERVAL = 0.05
+MOCK_CHUNKS = 10
+
+
+def mock_api(handler):
+    handler.start_events()
+    time.sleep(MOCK_FIRST_CHUNK)
+    for i in range(MOCK_CHUNKS):
+        if i:
+            time.sleep(MOCK_CHUNK_INTERVAL)
+        content = {"role": "model", "parts": [{"text": f"Purr number {i}. "}]}
+        handler.send_event({"candidates": [{"content": content}]})
+
+
+# Consumers for the benchmark: one that keeps up, and one that takes 100 ms
+# per chunk, twice as long as the server takes to send it.
+async def fast_consumer(stream_id, queue):
+    while await queue.get() is not None:
+        pass
+
+
+async def slow_consumer(stream_id, queue):
+    while await queue.get() is not None:
+        await asyncio.sleep(0.1)
+
+
+# Run 64 streams one at a time, then 32 at a time with each kind of consumer.
+# With the slow consumer, the queues fill up and the streams are read at the
+# consumer's pace, which shows up as longer gaps between chunks.
+async def benchmark(num_streams=64, model="gemini-2.0-flash"):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools" / "mock_gemini"))
+    from mock_gemini import mock_client, start_mock_server
+
+    server, port = start_mock_server(mock_api, streaming=True)
+    client = mock_client(port)
+    prompts = [f"Tell me cat story number {i}." for i in range(num_streams)]
+
+    for label, consumer, max_streams in (
+        ("one at a time", fast_consumer, 1),
+        ("32 at a time", fast_consumer, 32),
+        ("32 at a time, slow consumer", slow_consumer, 32),
+    ):
+        started = time.perf_counter()
+        all_stats = await multiplex(client, model, prompts, consumer, max_streams)
+        elapsed = time.perf_counter() - started
+        print(f"{label}: {num_streams} streams in {elapsed:.2f}s")
+        summarize(all_stats)
+
+    server.terminate()
+
+
+# Run against the real API, or pass --benchmark to try the multiplexer offline.
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        asyncio.run(benchmark())
+    else:
+        asyncio.run(main())
@@ -0,0 +1,44 @@
+# First, install the Google Generative AI library
+$ pip install google-genai
+
+# Stream four poems at once. Each stream's text is printed once it is complete, followed by its timings.
+$ python streaming-multiplexer.py
+[2] Write a four-line poem about a cat at the vet.
+A carrier creaks, a mournful cry,
+The cold steel table, a stranger's eye.
+One brave little yowl, then a treat and a pat,
+And home comes a very offended cat.
+[0] Write a four-line poem about a kitten's first snow.
+She pats the white with a careful paw,
+Then leaps back, stunned by what she saw.
+The cold, soft world begins to fall,
+And she chases flakes across it all.
+[1] Write a four-line poem about a cat on a warm laptop.
+The screen glows bright, the keys are warm,
+A perfect bed, a purring form.
+Your work can wait, the deadline too,
+This laptop's hers, and so are you.
+[3] Write a four-line poem about a cat burglar.
+On velvet paws through moonlit halls,
+She scales the shelves and skirts the walls.
+No jewels she takes, no gold, no hat,
+Just one stolen sock, the cunning cat.
+stream 0: first token 412 ms, 3 chunks, done in 698 ms
+stream 1: first token 398 ms, 3 chunks, done in 702 ms
+stream 2: first token 405 ms, 2 chunks, done in 611 ms
+stream 3: first token 430 ms, 3 chunks, done in 741 ms
+
+# Compare running streams one at a time with running them concurrently, against a local mock endpoint (no API key needed). Concurrency barely changes how each stream feels, while a slow consumer stretches the gaps between chunks to its own pace.
+$ python streaming-multiplexer.py --benchmark
+one at a time: 64 streams in 48.66s
+  time to first token   p50   305 ms  p95   307 ms
+  gap between chunks    p50    50 ms  p95    51 ms
+  total per stream      p50   759 ms  p95   762 ms
+32 at a time: 64 streams in 1.69s
+  time to first token   p50   354 ms  p95   359 ms
+  gap between chunks    p50    50 ms  p95    58 ms
+  total per stream      p50   825 ms  p95   844 ms
+32 at a time, slow consumer: 64 streams in 2.89s
+  time to first token   p50   365 ms  p95   386 ms
+  gap between chunks    p50    50 ms  p95   100 ms
+  total per stream      p50   933 ms  p95   970 ms
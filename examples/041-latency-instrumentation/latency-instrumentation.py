@@ -0,0 +1,326 @@
+# Latency instrumentation
+# This example shows how to see where the time goes in Gemini API calls. A wrapper around `generate_content`
+# and `generate_content_stream` records a span for every call: time to first byte (TTFB), time to first token
+# (TTFT), total duration, chunks, bytes received and the token counts from `usage_metadata`. Spans feed
+# sliding-window p50/p95/p99 histograms and can be exported as JSONL or in the Prometheus text format.
+
+# Import the necessary libraries
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import httpx
+from google import genai
+from google.genai import types
+
+
+# One call's measurements. `started_at` is the wall-clock time the call began,
+# in seconds since the epoch, so exported spans line up with other runs and
+# with server logs. The other times are in seconds from the start of the call,
+# measured with the monotonic `perf_counter`.
+@dataclass
+class Span:
+    name: str
+    model: str
+    started_at: float = field(default_factory=time.time)
+    ttfb: float | None = None
+    ttft: float | None = None
+    duration: float | None = None
+    chunks: int = 0
+    bytes_received: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    thinking_tokens: int = 0
+    error: str | None = None
+
+    def __post_init__(self):
+        self._started = time.perf_counter()  # Not a field, so it isn't exported
+
+    def elapsed(self):
+        return time.perf_counter() - self._started
+
+
+# The span for the call in progress. A context variable keeps concurrent calls
+# in different threads apart.
+current_span = contextvars.ContextVar("current_span", default=None)
+
+
+# The SDK sends requests through httpx, so an httpx transport sees the moment
+# the response headers arrive (TTFB) and every byte of the body. The body is
+# wrapped so bytes are counted as the SDK reads them, for streams too.
+class CountingStream(httpx.SyncByteStream):
+    def __init__(self, stream, span):
+        self.stream = stream
+        self.span = span
+
+    def __iter__(self):
+        for chunk in self.stream:
+            self.span.bytes_received += len(chunk)
+            yield chunk
+
+    def close(self):
+        self.stream.close()
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    def handle_request(self, request):
+        span = current_span.get()
+        response = super().handle_request(request)
+        if span is not None:
+            span.ttfb = span.elapsed()
+            response.stream = CountingStream(response.stream, span)
+        return response
+
+
+# Percentiles over a sliding time window, kept separately for each set of
+# labels (here the method and model). Old samples are dropped as new ones
+# arrive, so the numbers always describe the last `window` seconds.
+class SlidingHistogram:
+    def __init__(self, window=300.0):
+        self.window = window
+        self.samples = defaultdict(deque)  # labels -> (time, value)
+        self.sum = defaultdict(float)  # Running totals for Prometheus
+        self.count = defaultdict(int)
+
+    def observe(self, labels, value):
+        now = time.monotonic()
+        samples = self.samples[labels]
+        samples.append((now, value))
+        while samples[0][0] < now - self.window:
+            samples.popleft()
+        self.sum[labels] += value
+        self.count[labels] += 1
+
+    def percentiles(self, labels, quantiles=(0.5, 0.95, 0.99)):
+        values = sorted(value for _, value in self.samples[labels])
+        if not values:
+            return {}
+        return {q: values[int(q * (len(values) - 1))] for q in quantiles}
+
+
+# The instrumentation. Give the client its `http_options()`, then call through
+# `generate_content` and `generate_content_stream` here instead of on the client.
+# Each finished span is added to the histograms and passed to every exporter.
+class Instrumentation:
+    LATENCIES = ("ttfb", "ttft", "duration")
+    TOKENS = ("prompt_tokens", "cached_tokens", "output_tokens", "thinking_tokens")
+
+    def __init__(self, window=300.0, exporters=()):
+        self.histograms = {name: SlidingHistogram(window) for name in self.LATENCIES}
+        self.tokens = defaultdict(int)  # (model, kind) -> total
+        self.errors = defaultdict(int)
+        self.exporters = list(exporters)
+        self.lock = threading.Lock()
+
+    def http_options(self, **kwargs):
+        return types.HttpOptions(client_args={"transport": InstrumentedTransport()}, **kwargs)
+
+    def generate_content(self, client, model, **kwargs):
+        span = Span("generate_content", model)
+        token = current_span.set(span)
+        try:
+            response = client.models.generate_content(model=model, **kwargs)
+            span.chunks = 1
+            span.ttft = span.elapsed()
+            self.record_usage(span, response)
+            return response
+        except Exception as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            current_span.reset(token)
+            self.finish(span)
+
+    def generate_content_stream(self, client, model, **kwargs):
+        span = Span("generate_content_stream", model)
+        chunks = client.models.generate_content_stream(model=model, **kwargs)
+        try:
+            while True:
+                # The span is current only while the SDK reads the stream, not
+                # while the caller handles a chunk, so other requests the caller
+                # makes in between aren't counted in it
+                token = current_span.set(span)
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    break
+                finally:
+                    current_span.reset(token)
+                if span.ttft is None and chunk.text:
+                    span.ttft = span.elapsed()
+                span.chunks += 1
+                self.record_usage(span, chunk)  # The last chunk has the final counts
+                yield chunk
+        except Exception as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            self.finish(span)
+
+    def record_usage(self, span, response):
+        usage = response.usage_metadata
+        if usage:
+            span.prompt_tokens = usage.prompt_token_count or 0
+            span.cached_tokens = usage.cached_content_token_count or 0
+            span.output_tokens = usage.candidates_token_count or 0
+            span.thinking_tokens = usage.thoughts_token_count or 0
+
+    def finish(self, span):
+        span.duration = span.elapsed()
+        with self.lock:
+            for name in self.LATENCIES:
+                if getattr(span, name) is not None:
+                    self.histograms[name].observe((span.name, span.model), getattr(span, name))
+            for kind in self.TOKENS:
+                self.tokens[span.model, kind] += getattr(span, kind)
+            if span.error:
+                self.errors[span.model] += 1
+        for exporter in self.exporters:
+            exporter(span)
+
+    def prometheus_text(self):
+        """Render the metrics in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for name, histogram in self.histograms.items():
+                metric = f"gemini_{name}_seconds"
+                lines += [f"# HELP {metric} Gemini API call {name}.", f"# TYPE {metric} summary"]
+                for method, model in histogram.samples:
+                    labels = f'method="{method}",model="{model}"'
+                    for q, value in histogram.percentiles((method, model)).items():
+                        lines.append(f'{metric}{{{labels},quantile="{q}"}} {value:.6f}')
+                    lines.append(f"{metric}_sum{{{labels}}} {histogram.sum[method, model]:.6f}")
+                    lines.append(f"{metric}_count{{{labels}}} {histogram.count[method, model]}")
+            lines += ["# HELP gemini_tokens_total Tokens by kind.", "# TYPE gemini_tokens_total counter"]
+            for (model, kind), total in self.tokens.items():
+                lines.append(f'gemini_tokens_total{{model="{model}",kind="{kind[:-7]}"}} {total}')
+            lines += ["# HELP gemini_errors_total Failed calls.", "# TYPE gemini_errors_total counter"]
+            for model, total in self.errors.items():
+                lines.append(f'gemini_errors_total{{model="{model}"}} {total}')
+        return "\n".join(lines) + "\n"
+
+
+# Append each span to a JSONL file as one JSON object per line.
+class JsonlExporter:
+    def __init__(self, path):
+        self.file = open(path, "a")
+        self.lock = threading.Lock()
+
+    def __call__(self, span):
+        with self.lock:
+            self.file.write(json.dumps(asdict(span)) + "\n")
+            self.file.flush()
+
+
+def print_span(span):
+    def ms(seconds):
+        return "     -" if seconds is None else f"{seconds * 1000:6.0f}"
+
+    print(
+        f"{span.name:<24} ttfb {ms(span.ttfb)} ms  ttft {ms(span.ttft)} ms  "
+        f"total {ms(span.duration)} ms  {span.chunks:2d} chunks  "
+        f"{span.bytes_received:6d} bytes  {span.prompt_tokens} in / {span.output_tokens} out"
+    )
+
+
+# Make one plain call and one streaming call, printing each span and writing
+# them to spans.jsonl, then print the metrics as Prometheus would scrape them.
+def main():
+    instrumentation = Instrumentation(exporters=[print_span, JsonlExporter("spans.jsonl")])
+    client = genai.Client(
+        api_key=os.getenv("GEMINI_API_KEY"), http_options=instrumentation.http_options()
+    )
+    model = "gemini-2.0-flash"
+    instrumentation.generate_content(client, model, contents="Name three famous cats.")
+    for _ in instrumentation.generate_content_stream(
+        client, model, contents="Write a short poem about a cat."
+    ):
+        pass
+    print(instrumentation.prometheus_text(), end="")
+
+
+# For the benchmark, a local server stands in for the Gemini API. Plain calls
+# answer after 150 ms. Streams send their headers at once, the first chunk after
+# 200 ms and four more 20 ms apart, so TTFB and TTFT come apart. The "instant"
+# model answers at once.
+def mock_chunk(text, usage=None):
+    chunk = {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+    if usage:
+        chunk["usageMetadata"] = usage
+    return chunk
+
+
+MOCK_USAGE = {"promptTokenCount": 8, "candidatesTokenCount": 20, "totalTokenCount": 28}
+
+
+def mock_api(handler):
+    if ":streamGenerateContent" in handler.path:
+        handler.start_events()
+        time.sleep(0.2)
+        for i in range(5):
+            handler.send_event(mock_chunk("Meow. " * 4, MOCK_USAGE if i == 4 else None))
+            time.sleep(0.02)
+    else:
+        time.sleep(0 if "/models/instant:" in handler.path else 0.15)
+        handler.send_json(mock_chunk("Garfield, Tom and Grumpy Cat.", MOCK_USAGE))
+
+
+# Make 40 calls of each kind against the mock server, then print one span of
+# each kind, the percentiles and the start of the Prometheus output. Finally,
+# time calls to the instant model with and without the instrumentation to
+# measure what it costs per call.
+def benchmark(calls=40, model="gemini-2.0-flash"):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools" / "mock_gemini"))
+    from mock_gemini import mock_base_url, mock_client, start_mock_server
+
+    server, port = start_mock_server(mock_api, streaming=True)
+    spans = []
+    instrumentation = Instrumentation(exporters=[spans.append])
+    client = genai.Client(
+        api_key="mock", http_options=instrumentation.http_options(base_url=mock_base_url(port))
+    )
+    plain = mock_client(port)
+
+    for _ in range(calls):
+        instrumentation.generate_content(client, model, contents="Name three cats.")
+        for _ in instrumentation.generate_content_stream(client, model, contents="Poem"):
+            pass
+    print_span(spans[0])
+    print_span(spans[1])
+    for name, histogram in instrumentation.histograms.items():
+        for labels in histogram.samples:
+            p = histogram.percentiles(labels)
+            print(
+                f"{name:<8} {labels[0]:<24} p50 {p[0.5] * 1000:4.0f} ms  "
+                f"p95 {p[0.95] * 1000:4.0f} ms  p99 {p[0.99] * 1000:4.0f} ms"
+            )
+    print("\n".join(instrumentation.prometheus_text().splitlines()[:7]))
+
+    def timed(fn, repeats=5, calls=200):
+        best = float("inf")
+        for _ in range(repeats):
+            started = time.perf_counter()
+            for _ in range(calls):
+                fn()
+            best = min(best, (time.perf_counter() - started) / calls)
+        return best
+
+    bare = timed(lambda: plain.models.generate_content(model="instant", contents="Hi"))
+    wrapped = timed(lambda: instrumentation.generate_content(client, "instant", contents="Hi"))
+    print(f"instant model: {bare * 1e6:.0f} us per plain call, {wrapped * 1e6:.0f} us instrumented")
+    server.terminate()
+
+
+# Run against the real API, or pass --benchmark to try the instrumentation offline.
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark()
+    else:
+        main()
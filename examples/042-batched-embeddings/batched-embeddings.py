@@ -0,0 +1,167 @@
+# Batched embeddings
+# This example shows how to embed a large corpus quickly. Calling `embed_content` once per text pays a full
+# round trip for every text. Instead, texts are packed into batches of up to 100, kept under a token budget per
+# request, and several batches are sent at once. Each batch's vectors are copied straight into one preallocated
+# float32 NumPy matrix, in input order, so nothing is kept as lists of Python floats.
+
+# Import the necessary libraries
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from google import genai
+from google.genai import types
+
+
+# A rough token count, about three characters per token, used only to keep
+# each batch under the per-request token budget.
+def estimate_tokens(text):
+    return len(text) // 3 + 1
+
+
+# Split the texts into consecutive (start, end) ranges. A batch is closed when
+# it has `max_texts` texts or the next text would take it over `max_tokens`.
+def pack_batches(texts, max_texts=100, max_tokens=20_000):
+    batches = []
+    start = tokens = 0
+    for i, text in enumerate(texts):
+        cost = estimate_tokens(text)
+        if i > start and (i - start == max_texts or tokens + cost > max_tokens):
+            batches.append((start, i))
+            start, tokens = i, 0
+        tokens += cost
+    if start < len(texts):
+        batches.append((start, len(texts)))
+    return batches
+
+
+# The embedder. `output_dimensionality` fixes the width of every vector, so the
+# result matrix can be allocated before any request is sent. Up to
+# `concurrency` batches are in flight at once, each writing only its own rows.
+class BatchEmbedder:
+    def __init__(
+        self,
+        client,
+        model="gemini-embedding-001",
+        dimensions=768,
+        task_type=None,
+        max_texts=100,
+        max_tokens=20_000,
+        concurrency=8,
+    ):
+        self.client = client
+        self.model = model
+        self.dimensions = dimensions
+        self.config = types.EmbedContentConfig(
+            task_type=task_type, output_dimensionality=dimensions
+        )
+        self.max_texts = max_texts
+        self.max_tokens = max_tokens
+        self.concurrency = concurrency
+
+    def embed(self, texts):
+        """Embed the texts and return a (len(texts), dimensions) float32 matrix."""
+        out = np.empty((len(texts), self.dimensions), dtype=np.float32)
+
+        def fill(batch):
+            start, end = batch
+            response = self.client.models.embed_content(
+                model=self.model, contents=texts[start:end], config=self.config
+            )
+            if len(response.embeddings) != end - start:
+                raise ValueError(f"Expected {end - start} embeddings, got {len(response.embeddings)}")
+            for row, embedding in enumerate(response.embeddings, start):
+                out[row] = embedding.values
+
+        batches = pack_batches(texts, self.max_texts, self.max_tokens)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            list(executor.map(fill, batches))  # Raises the first error, if any
+        return out
+
+
+# Embed a handful of cat-related terms in one request and compare them.
+def main():
+    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    embedder = BatchEmbedder(client, task_type="SEMANTIC_SIMILARITY")
+    cats = ["Siamese cat", "Persian cat", "cat food", "cat nap", "kibble", "afternoon snooze"]
+
+    vectors = embedder.embed(cats)
+    print(f"{vectors.shape[0]} embeddings, shape {vectors.shape}, {vectors.dtype}, {vectors.nbytes} bytes")
+    print(f"C-contiguous: {vectors.flags['C_CONTIGUOUS']}")
+
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    similarity = unit @ unit.T
+    for i, cat in enumerate(cats):
+        j = max((j for j in range(len(cats)) if j != i), key=lambda j: similarity[i, j])
+        print(f"{cat!r:<20} is closest to {cats[j]!r} ({similarity[i, j]:.3f})")
+
+
+# For the benchmark, a local server stands in for the embeddings endpoint. Each
+# request takes 50 ms plus 0.2 ms per text, and every text gets a fixed random
+# vector seeded by its hash.
+def mock_vector(text, dimensions):
+    seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+    return np.random.default_rng(seed).standard_normal(dimensions).round(6).tolist()
+
+
+def mock_api(handler):
+    request = handler.json()
+    requests = request.get("requests", [request])  # batchEmbedContents or embedContent
+    time.sleep(0.05 + 0.0002 * len(requests))
+    embeddings = [
+        {
+            "values": mock_vector(
+                r["content"]["parts"][0]["text"], r.get("outputDimensionality", 768)
+            )
+        }
+        for r in requests
+    ]
+    handler.send_json({"embeddings": embeddings})
+
+
+# Embed a corpus one text per call, as a plain loop would, then in batches one
+# at a time, then in batches eight at a time, and check that every approach
+# gives the same vectors.
+def benchmark(num_texts=2000, model="gemini-embedding-001"):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools" / "mock_gemini"))
+    from mock_gemini import mock_client, start_mock_server
+
+    server, port = start_mock_server(mock_api)
+    client = mock_client(port)
+    texts = [f"Cat fact number {i}: cats sleep for most of the day." for i in range(num_texts)]
+    config = types.EmbedContentConfig(output_dimensionality=768)
+
+    def one_per_call(texts):
+        return [
+            client.models.embed_content(model=model, contents=text, config=config).embeddings[0].values
+            for text in texts
+        ]
+
+    loop_texts = texts[:200]  # A loop over all of them would take minutes
+    started = time.perf_counter()
+    looped = np.array(one_per_call(loop_texts), dtype=np.float32)
+    rate = len(loop_texts) / (time.perf_counter() - started)
+    print(f"one text per call      {rate:7.0f} texts/s  ({len(loop_texts)} texts)")
+
+    for label, concurrency in (("batches of 100, x1", 1), ("batches of 100, x8", 8)):
+        embedder = BatchEmbedder(client, model, concurrency=concurrency)
+        started = time.perf_counter()
+        vectors = embedder.embed(texts)
+        rate = len(texts) / (time.perf_counter() - started)
+        print(f"{label:<22} {rate:7.0f} texts/s  ({len(texts)} texts)")
+        assert np.array_equal(vectors[: len(loop_texts)], looped)
+
+    print(f"result: {vectors.shape} {vectors.dtype} matrix, {vectors.nbytes / 2**20:.1f} MiB")
+    server.terminate()
+
+
+# Run against the real API, or pass --benchmark to try the embedder offline.
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark()
+    else:
+        main()
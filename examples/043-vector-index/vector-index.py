@@ -0,0 +1,228 @@
+# Vector index
+# This example shows an exact vector index for Gemini embeddings that stays on disk. Vectors are L2-normalized and
+# stored as float32 in a `.npy` file that is memory-mapped rather than loaded, with their ids in a text file next to
+# it. A query is a matrix-vector product plus `argpartition` for the top k, and a batch of queries is one
+# matrix-matrix product. Appends write only the new rows and a fixed-size header, never the whole file.
+
+# Import the necessary libraries
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from google import genai
+from google.genai import types
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+# The index is a directory with two files: `vectors.npy`, a (rows, dimensions)
+# float32 array, and `ids.txt`, one id per line in the same order. NumPy pads
+# the `.npy` header so the row count can grow without changing its length, so
+# an append writes the new rows after the last one and then rewrites the
+# header in place. The header is written last: if an append is interrupted,
+# the rows and ids past the count in the header are ignored and overwritten
+# by the next append.
+class VectorIndex:
+    def __init__(self, path, dimensions):
+        self.path = Path(path)
+        self.dimensions = dimensions
+        self.vectors_path = self.path / "vectors.npy"
+        self.ids_path = self.path / "ids.txt"
+        if not self.vectors_path.exists():
+            self.path.mkdir(parents=True, exist_ok=True)
+            with open(self.vectors_path, "wb") as f:
+                self.write_header(f, 0)
+            self.ids_path.write_text("", encoding="utf-8")
+        self.load()
+
+    def write_header(self, f, rows):
+        header = {"descr": "<f4", "fortran_order": False, "shape": (rows, self.dimensions)}
+        f.seek(0)
+        np.lib.format.write_array_header_1_0(f, header)
+
+    def load(self):
+        with open(self.vectors_path, "rb") as f:
+            np.lib.format.read_magic(f)
+            shape, _, _ = np.lib.format.read_array_header_1_0(f)
+            self.header_size = f.tell()
+        if shape[1] != self.dimensions:
+            raise ValueError(f"Index has {shape[1]} dimensions, not {self.dimensions}")
+        # Split on "\n" only: ids may hold "\r" and other characters that
+        # splitlines() and text mode would treat as line breaks
+        ids = self.ids_path.read_bytes().decode("utf-8").split("\n")
+        self.ids = ids[: shape[0]]  # Drops the empty entry after the last newline
+        self.ids_size = sum(len(id_.encode()) + 1 for id_ in self.ids)
+        self.map_vectors(shape[0])
+
+    def map_vectors(self, rows):
+        # Map only the committed rows; the pages are read from disk as they are used
+        if not rows:
+            self.vectors = np.empty((0, self.dimensions), dtype=np.float32)
+            return
+        self.vectors = np.memmap(
+            self.vectors_path,
+            dtype=np.float32,
+            mode="r",
+            offset=self.header_size,
+            shape=(rows, self.dimensions),
+        )
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def add(self, ids, vectors):
+        """Append vectors with their ids (which must not contain newlines)."""
+        vectors = normalize(vectors)
+        if vectors.shape != (len(ids), self.dimensions):
+            raise ValueError(f"Expected {len(ids)} vectors of {self.dimensions} dimensions")
+        if any("\n" in id_ for id_ in ids):
+            raise ValueError("Ids must not contain newlines")
+        rows = len(self)
+        new_ids = "".join(f"{id_}\n" for id_ in ids).encode()
+        with open(self.vectors_path, "r+b") as f:
+            f.seek(self.header_size + rows * self.dimensions * 4)
+            f.write(vectors.tobytes())
+            f.truncate()
+            with open(self.ids_path, "r+b") as ids_file:
+                ids_file.seek(self.ids_size)
+                ids_file.write(new_ids)
+                ids_file.truncate()
+                os.fsync(ids_file.fileno())
+            f.flush()
+            os.fsync(f.fileno())
+            self.write_header(f, rows + len(ids))
+            if f.tell() != self.header_size:
+                raise RuntimeError("The .npy header changed size")
+            f.flush()
+            os.fsync(f.fileno())
+        self.ids += ids
+        self.ids_size += len(new_ids)
+        self.map_vectors(rows + len(ids))
+
+    def search(self, queries, k=10, block_rows=65536):
+        """Return the top-k (ids, scores) for one query or a (queries, dimensions) matrix.
+
+        The index is scanned in blocks of rows, keeping the best k of each block,
+        so memory use doesn't grow with the size of the index.
+        """
+        single = np.ndim(queries) == 1
+        queries = normalize(np.atleast_2d(queries))
+        k = min(k, len(self))
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        for start in range(0, len(self), block_rows):
+            scores = queries @ self.vectors[start : start + block_rows].T
+            if scores.shape[1] > k:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, top, axis=1)
+            else:
+                top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            best_rows = np.concatenate([best_rows, top + start], axis=1)
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        results = [
+            ([self.ids[row] for row in rows], scores)
+            for rows, scores in zip(best_rows, best_scores)
+        ]
+        return results[0] if single else results
+
+
+# Embed a few cat facts in one call and index them, then ask two questions in
+# one batch. The index is kept in `cat-index/`, so the facts are only embedded
+# on the first run.
+CAT_FACTS = [
+    "Cats sleep for twelve to sixteen hours a day.",
+    "A group of kittens is called a kindle.",
+    "Cats can't taste sweetness.",
+    "A cat's purr vibrates at 25 to 150 hertz.",
+    "Cats have a third eyelid called the haw.",
+    "Most cats are lactose intolerant.",
+]
+
+
+def embed(client, texts, task_type):
+    response = client.models.embed_content(
+        model="gemini-embedding-001",
+        contents=texts,
+        config=types.EmbedContentConfig(task_type=task_type, output_dimensionality=768),
+    )
+    return np.array([e.values for e in response.embeddings], dtype=np.float32)
+
+
+def main():
+    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    index = VectorIndex("cat-index", dimensions=768)
+    if not len(index):
+        index.add(CAT_FACTS, embed(client, CAT_FACTS, "RETRIEVAL_DOCUMENT"))
+    print(f"{len(index)} vectors in {index.vectors_path}")
+
+    questions = ["How much do cats nap?", "Should I give my cat milk?"]
+    for question, (ids, scores) in zip(
+        questions, index.search(embed(client, questions, "RETRIEVAL_QUERY"), k=2)
+    ):
+        print(question)
+        for id_, score in zip(ids, scores):
+            print(f"  {score:.3f}  {id_}")
+
+
+# The benchmark needs no API key: it fills an index with a million random
+# 256-dimensional vectors (1 GB on disk) in appends of 100,000 rows, then times
+# single and batched queries and checks them against a full sort.
+def benchmark(rows=1_000_000, dimensions=256, chunk=100_000, k=10):
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as path:
+        index = VectorIndex(path, dimensions)
+        append_times = []
+        for start in range(0, rows, chunk):
+            vectors = rng.standard_normal((chunk, dimensions), dtype=np.float32)
+            started = time.perf_counter()
+            index.add([f"doc-{i}" for i in range(start, start + chunk)], vectors)
+            append_times.append(time.perf_counter() - started)
+        size = index.vectors_path.stat().st_size
+        print(
+            f"{len(index)} vectors, {size / 2**20:.0f} MiB: appends of {chunk} rows took "
+            f"{append_times[0] * 1000:.0f} ms first, {append_times[-1] * 1000:.0f} ms last"
+        )
+
+        started = time.perf_counter()
+        index = VectorIndex(path, dimensions)
+        print(f"reopened in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        queries = rng.standard_normal((64, dimensions), dtype=np.float32)
+        index.search(queries[0], k)  # Warm the page cache
+        started = time.perf_counter()
+        for query in queries[:16]:
+            index.search(query, k)
+        single = (time.perf_counter() - started) / 16
+        started = time.perf_counter()
+        results = index.search(queries, k)
+        batched = (time.perf_counter() - started) / len(queries)
+        print(f"one query at a time   {single * 1000:6.1f} ms per query")
+        print(f"64 queries at once    {batched * 1000:6.1f} ms per query")
+
+        scores = normalize(queries[:4]) @ np.asarray(index.vectors).T
+        for (ids, _), row_scores in zip(results, scores):
+            assert ids == [index.ids[i] for i in np.argsort(-row_scores)[:k]]
+        print("top 10 matches a full sort")
+
+
+# Run against the real API, or pass --benchmark to try the index offline.
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark()
+    else:
+        main()
@@ -0,0 +1,20 @@
+# First, install the Google Generative AI library and NumPy
+$ pip install google-genai numpy
+
+# Index six cat facts and ask two questions in one batch. The index is saved in cat-index/ and reused on the next run.
+$ python vector-index.py
+6 vectors in cat-index/vectors.npy
+How much do cats nap?
+  0.781  Cats sleep for twelve to sixteen hours a day.
+  0.612  A group of kittens is called a kindle.
+Should I give my cat milk?
+  0.734  Most cats are lactose intolerant.
+  0.598  Cats can't taste sweetness.
+
+# Build a one-million-vector index from random vectors (no API key needed). Each append takes the same time however large the file is, and a batch of queries costs far less per query than one at a time, because the index is read once for the whole batch.
+$ python vector-index.py --benchmark
+1000000 vectors, 977 MiB: appends of 100000 rows took 381 ms first, 375 ms last
+reopened in 322 ms
+one query at a time    130.7 ms per query
+64 queries at once      17.5 ms per query
+top 10 matches a full sort
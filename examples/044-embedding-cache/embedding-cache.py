@@ -0,0 +1,261 @@
+# Embedding cache
+# This example shows how to stop paying for the same embedding twice. Embeddings are stored in a local SQLite file,
+# keyed by model, task type, output dimensionality and a hash of the text, so a vector is reused only when it would
+# be identical. Lookups and fills are done in bulk, only the texts that miss are sent to the API (in batches), and
+# the least recently used entries are evicted when the cache grows past a size limit.
+
+# Import the necessary libraries
+import hashlib
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from google import genai
+from google.genai import types
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode()).digest()
+
+
+# The cache. Each vector is stored as raw float32 bytes. `last_used` is bumped
+# on every hit, and the running total of stored bytes is kept in a one-row
+# table, so checking the size limit doesn't scan the cache. When the total goes
+# over `max_bytes`, the least recently used entries are deleted until it is
+# back under 90% of the limit. The total counts vector bytes only: keys, the
+# index and SQLite's free pages add to the file, which doesn't shrink after
+# deletes until it is vacuumed. A missing task type is stored as "", since the
+# task type is part of the primary key.
+class EmbeddingCache:
+    def __init__(self, path, max_bytes=1 << 30):
+        self.max_bytes = max_bytes
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")  # Readers don't block the writer
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.db:
+            self.db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    task_type TEXT NOT NULL,
+                    dimensions INTEGER NOT NULL,
+                    text_hash BLOB NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used INTEGER NOT NULL,
+                    PRIMARY KEY (model, task_type, dimensions, text_hash)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used);
+                CREATE TABLE IF NOT EXISTS stats (size INTEGER NOT NULL);
+                INSERT INTO stats SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM stats);
+                """
+            )
+        if self.size() > max_bytes:  # The limit may be lower than on the last run
+            self.evict(int(max_bytes * 0.9))
+
+    def size(self):
+        return self.db.execute("SELECT size FROM stats").fetchone()[0]
+
+    def get_many(self, model, task_type, dimensions, hashes):
+        """Return {hash: vector} for the hashes that are in the cache."""
+        task_type = task_type or ""
+        found = {}
+        now = time.time_ns()
+        for i in range(0, len(hashes), 500):  # Stay under SQLite's limit on parameters
+            chunk = hashes[i : i + 500]
+            rows = self.db.execute(
+                "SELECT text_hash, vector FROM embeddings WHERE model = ? AND task_type = ?"
+                f" AND dimensions = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                [model, task_type, dimensions, *chunk],
+            ).fetchall()
+            found.update((h, np.frombuffer(v, dtype=np.float32)) for h, v in rows)
+        with self.db:
+            self.db.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND task_type = ?"
+                " AND dimensions = ? AND text_hash = ?",
+                [(now, model, task_type, dimensions, h) for h in found],
+            )
+        return found
+
+    def put_many(self, model, task_type, dimensions, hashes, vectors):
+        task_type = task_type or ""
+        now = time.time_ns()
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self.db:
+            cursor = self.db.executemany(
+                "INSERT OR IGNORE INTO embeddings VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (model, task_type, dimensions, h, v.tobytes(), now)
+                    for h, v in zip(hashes, vectors)
+                ],
+            )
+            added = cursor.rowcount * dimensions * 4
+            self.db.execute("UPDATE stats SET size = size + ?", (added,))
+        if self.size() > self.max_bytes:
+            self.evict(int(self.max_bytes * 0.9))
+
+    def evict(self, target):
+        """Delete the least recently used entries until the cache is under `target` bytes."""
+        with self.db:
+            size = self.size()
+            victims = []
+            for *key, nbytes in self.db.execute(
+                "SELECT model, task_type, dimensions, text_hash, dimensions * 4"
+                " FROM embeddings ORDER BY last_used"
+            ):
+                if size <= target:
+                    break
+                victims.append(key)
+                size -= nbytes
+            self.db.executemany(
+                "DELETE FROM embeddings WHERE model = ? AND task_type = ?"
+                " AND dimensions = ? AND text_hash = ?",
+                victims,
+            )
+            self.db.execute("UPDATE stats SET size = ?", (size,))
+
+
+# The embedding call path with the cache in front. The cache is checked for
+# every text first; the texts that miss are deduplicated and embedded in
+# batches, stored, and merged back in input order. When every text is cached,
+# no request is made at all.
+class CachedEmbedder:
+    def __init__(
+        self,
+        client,
+        cache,
+        model="gemini-embedding-001",
+        dimensions=768,
+        task_type="RETRIEVAL_DOCUMENT",
+        batch_size=100,
+    ):
+        self.client = client
+        self.cache = cache
+        self.model = model
+        self.dimensions = dimensions
+        self.task_type = task_type
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+
+    def embed(self, texts):
+        """Embed the texts and return a (len(texts), dimensions) float32 matrix."""
+        key = (self.model, self.task_type, self.dimensions)
+        hashes = [text_hash(text) for text in texts]
+        found = self.cache.get_many(*key, list(set(hashes)))
+        missing = list({h: text for h, text in zip(hashes, texts) if h not in found}.items())
+        self.hits += sum(1 for h in hashes if h in found)
+        self.misses += len(missing)
+
+        config = types.EmbedContentConfig(
+            task_type=self.task_type, output_dimensionality=self.dimensions
+        )
+        for i in range(0, len(missing), self.batch_size):
+            batch = missing[i : i + self.batch_size]
+            response = self.client.models.embed_content(
+                model=self.model, contents=[text for _, text in batch], config=config
+            )
+            vectors = np.array([e.values for e in response.embeddings], dtype=np.float32)
+            self.cache.put_many(*key, [h for h, _ in batch], vectors)
+            found.update(zip((h for h, _ in batch), vectors))
+
+        out = np.empty((len(texts), self.dimensions), dtype=np.float32)
+        for row, h in enumerate(hashes):
+            out[row] = found[h]
+        return out
+
+
+# Embed the same list twice. The second time, every text is served from the
+# cache in `embeddings.sqlite`, and so is every text on later runs.
+def main():
+    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    embedder = CachedEmbedder(client, EmbeddingCache("embeddings.sqlite"))
+    cats = ["Siamese cat", "Persian cat", "cat food", "cat nap", "Siamese cat"]
+
+    for attempt in (1, 2):
+        started = time.perf_counter()
+        vectors = embedder.embed(cats)
+        print(
+            f"run {attempt}: {vectors.shape} in {(time.perf_counter() - started) * 1000:.0f} ms, "
+            f"{embedder.hits} hits and {embedder.misses} misses so far"
+        )
+
+
+# For the benchmark, a local server stands in for the embeddings endpoint. Each
+# request takes 50 ms plus 0.2 ms per text and returns a fixed random vector
+# for each text, and the server counts the requests it receives.
+def mock_vector(text, dimensions):
+    seed = int.from_bytes(text_hash(text)[:8], "little")
+    return np.random.default_rng(seed).standard_normal(dimensions).round(6).tolist()
+
+
+def mock_api(handler):
+    request = handler.json()
+    requests = request.get("requests", [request])  # batchEmbedContents or embedContent
+    time.sleep(0.05 + 0.0002 * len(requests))
+    embeddings = [
+        {
+            "values": mock_vector(
+                r["content"]["parts"][0]["text"], r.get("outputDimensionality", 768)
+            )
+        }
+        for r in requests
+    ]
+    handler.send_json({"embeddings": embeddings})
+
+
+# Three jobs over overlapping texts: the first embeds 4,000 new texts, the
+# second 4,000 texts of which 3,000 were seen before, and the third repeats the
+# second. Then the cache is reopened with an 8 MiB limit (about 2,700 vectors),
+# which evicts the least recently used vectors, and the first job is run again:
+# the evicted texts are embedded again and the cache stays under its limit.
+def benchmark():
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools" / "mock_gemini"))
+    from mock_gemini import mock_client, requests_received, start_mock_server
+
+    server, port = start_mock_server(mock_api)
+    client = mock_client(port)
+    texts = [f"Cat fact number {i}: cats sleep for most of the day." for i in range(5000)]
+    jobs = [("new texts", texts[:4000]), ("75% seen", texts[1000:]), ("repeat", texts[1000:])]
+
+    with tempfile.TemporaryDirectory() as path:
+        cache = EmbeddingCache(os.path.join(path, "embeddings.sqlite"))
+        embedder = CachedEmbedder(client, cache)
+        for label, job in jobs:
+            before, hits, misses = requests_received(port), embedder.hits, embedder.misses
+            started = time.perf_counter()
+            embedder.embed(job)
+            print(
+                f"{label:<10} {len(job)} texts: {embedder.hits - hits:4d} hits "
+                f"{embedder.misses - misses:4d} misses  {requests_received(port) - before:2d} requests  "
+                f"{time.perf_counter() - started:5.2f}s"
+            )
+        print(f"cache: {cache.size() / 2**20:.1f} MiB")
+
+        cache.db.close()
+
+        cache = EmbeddingCache(os.path.join(path, "embeddings.sqlite"), max_bytes=8 << 20)
+        print(f"reopened with an 8 MiB limit: {cache.size() / 2**20:.1f} MiB")
+        embedder = CachedEmbedder(client, cache)
+        before = requests_received(port)
+        embedder.embed(texts[:4000])
+        (entries,) = cache.db.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        print(
+            f"new texts again: {embedder.hits} hits {embedder.misses} misses  "
+            f"{requests_received(port) - before} requests; cache {entries} entries, "
+            f"{cache.size() / 2**20:.1f} MiB"
+        )
+        cache.db.close()
+
+    server.terminate()
+
+
+# Run against the real API, or pass --benchmark to try the cache offline.
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark()
+    else:
+        main()
@@ -0,0 +1,16 @@
+# First, install the Google Generative AI library and NumPy
+$ pip install google-genai numpy
+
+# Embed the same five texts twice. The first run sends the four distinct texts in one request; the second is served entirely from embeddings.sqlite without touching the network.
+$ python embedding-cache.py
+run 1: (5, 768) in 412 ms, 0 hits and 4 misses so far
+run 2: (5, 768) in 1 ms, 5 hits and 4 misses so far
+
+# Run three overlapping jobs against a local mock endpoint (no API key needed), then reopen the cache with a lower size limit. Only the misses are sent, in batches of 100, and eviction keeps the most recently used vectors. Sizes count the stored vector bytes, not the whole SQLite file.
+$ python embedding-cache.py --benchmark
+new texts  4000 texts:    0 hits 4000 misses  40 requests   7.47s
+75% seen   4000 texts: 3000 hits 1000 misses  10 requests   2.18s
+repeat     4000 texts: 4000 hits    0 misses   0 requests   0.34s
+cache: 14.6 MiB
+reopened with an 8 MiB limit: 7.2 MiB
+new texts again: 1840 hits 2160 misses  22 requests; cache 2517 entries, 7.4 MiB
@@ -0,0 +1,226 @@
+# Quantized embeddings
+# This example shows how to keep embeddings in a fraction of the memory. Each float32 vector is stored in RAM as a
+# compact code: int8, one byte per dimension scaled per dimension (4x smaller), or binary, one sign bit per dimension
+# (32x smaller) compared by Hamming distance with popcount. Search runs on the codes to pick a shortlist, and only the
+# shortlist is rescored with the full float32 vectors, which stay on disk and are read lazily through a memory map.
+
+# Import the necessary libraries
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from google import genai
+from google.genai import types
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+
+# Count the set bits in each byte. NumPy 2 has this built in; older versions
+# fall back to a 256-entry lookup table.
+if hasattr(np, "bitwise_count"):
+    popcount = np.bitwise_count
+else:
+    POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(codes):
+        return POPCOUNT_TABLE[codes.view(np.uint8)].reshape(*codes.shape, -1).sum(axis=-1)
+
+
+# int8 codes. Each dimension's range in the data is mapped onto -128..127, so
+# x ~ low + scale * (code + 128). A query's dot product with a vector then
+# works out to q.low + (q * scale).(code + 128): a product with the codes,
+# converted to float32 a block at a time.
+class Int8Codes:
+    def __init__(self, vectors=None, low=None, scale=None, codes=None):
+        if vectors is not None:
+            low, high = vectors.min(axis=0), vectors.max(axis=0)
+            scale = np.maximum(high - low, 1e-12) / 255
+            codes = (np.round((vectors - low) / scale) - 128).astype(np.int8)
+        self.low, self.scale, self.codes = low, scale, codes
+
+    def scores(self, queries, block_rows=32768):
+        weights = (queries * self.scale).T
+        offset = queries @ self.low + 128 * weights.sum(axis=0)
+        return np.concatenate(
+            [
+                self.codes[i : i + block_rows].astype(np.float32) @ weights + offset
+                for i in range(0, len(self.codes), block_rows)
+            ]
+        ).T
+
+
+# Binary codes: the sign of each dimension, packed eight to a byte and read as
+# 64-bit words. Fewer differing bits (a lower Hamming distance) means a smaller
+# angle between the vectors, so the score is the number of matching bits. The
+# codes are stored word-major, one row per 64 dimensions, so each step of the
+# count runs over one contiguous array.
+class BinaryCodes:
+    def __init__(self, vectors=None, codes=None):
+        if vectors is not None:
+            codes = np.ascontiguousarray(self.pack(vectors).T)
+        self.codes = codes
+
+    def pack(self, vectors):
+        bits = np.packbits(vectors > 0, axis=1)
+        # Pad to whole 64-bit words. The padding is zero in every code, so it
+        # adds the same number of matching bits to every score.
+        bits = np.pad(bits, ((0, 0), (0, -bits.shape[1] % 8)))
+        return np.ascontiguousarray(bits).view(np.uint64)
+
+    def scores(self, queries):
+        words, rows = self.codes.shape
+        scores = np.empty((len(queries), rows), dtype=np.float32)
+        differing = np.empty(rows, dtype=np.uint16)
+        scratch = np.empty(rows, dtype=np.uint64)
+        for i, query in enumerate(self.pack(queries)):
+            differing[:] = 0
+            for word in range(words):
+                np.bitwise_xor(self.codes[word], query[word], out=scratch)
+                differing += popcount(scratch)
+            scores[i] = words * 64 - differing
+        return scores
+
+
+# The index: codes in RAM and full vectors in `vectors.npy` on disk. A search
+# takes the `shortlist` best rows by code score for each query and rescores
+# just those rows with the float32 vectors, so the page cache only needs to
+# hold the rows that are actually reranked.
+class QuantizedIndex:
+    KINDS = {"int8": Int8Codes, "binary": BinaryCodes}
+
+    def __init__(self, path, kind):
+        path = Path(path)
+        self.vectors = np.load(path / "vectors.npy", mmap_mode="r")
+        arrays = np.load(path / f"{kind}.npz")
+        self.codes = self.KINDS[kind](**arrays)
+
+    @classmethod
+    def build(cls, path, vectors):
+        """Save normalized vectors and both kinds of codes to the `path` directory."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        vectors = normalize(vectors)
+        np.save(path / "vectors.npy", vectors)
+        int8 = Int8Codes(vectors)
+        np.savez(path / "int8.npz", low=int8.low, scale=int8.scale, codes=int8.codes)
+        np.savez(path / "binary.npz", codes=BinaryCodes(vectors).codes)
+
+    def search(self, queries, k=10, shortlist=100):
+        """Return (ids, scores) arrays of shape (queries, k), best first."""
+        queries = normalize(np.atleast_2d(queries))
+        approximate = self.codes.scores(queries)
+        shortlist = min(shortlist, approximate.shape[1])
+        candidates = np.argpartition(-approximate, shortlist - 1, axis=1)[:, :shortlist]
+        candidates.sort(axis=1)  # Read the rows from disk in file order
+        rows = self.vectors[candidates.ravel()].reshape(*candidates.shape, -1)
+        exact = np.einsum("qd,qsd->qs", queries, rows)
+        top = np.argsort(-exact, axis=1)[:, :k]
+        return np.take_along_axis(candidates, top, axis=1), np.take_along_axis(exact, top, axis=1)
+
+
+# Embed a few cat facts, store them quantized, and ask a question with each
+# kind of code.
+CAT_FACTS = [
+    "Cats sleep for twelve to sixteen hours a day.",
+    "A group of kittens is called a kindle.",
+    "Cats can't taste sweetness.",
+    "A cat's purr vibrates at 25 to 150 hertz.",
+    "Cats have a third eyelid called the haw.",
+    "Most cats are lactose intolerant.",
+]
+
+
+def embed(client, texts, task_type):
+    response = client.models.embed_content(
+        model="gemini-embedding-001",
+        contents=texts,
+        config=types.EmbedContentConfig(task_type=task_type, output_dimensionality=768),
+    )
+    return np.array([e.values for e in response.embeddings], dtype=np.float32)
+
+
+def main():
+    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    question = "Should I give my cat milk?"
+    query = embed(client, [question], "RETRIEVAL_QUERY")
+    with tempfile.TemporaryDirectory() as path:
+        QuantizedIndex.build(path, embed(client, CAT_FACTS, "RETRIEVAL_DOCUMENT"))
+        for kind in QuantizedIndex.KINDS:
+            index = QuantizedIndex(path, kind)
+            ids, scores = index.search(query, k=2, shortlist=4)
+            print(f"{question} ({kind}, {index.codes.codes.nbytes} bytes of codes)")
+            for i, score in zip(ids[0], scores[0]):
+                print(f"  {score:.3f}  {CAT_FACTS[i]}")
+            del index  # Close the memory map before the directory is removed
+
+
+# The benchmark needs no API key. By default it uses 200,000 random
+# 768-dimensional vectors drawn around 2,000 cluster centres; pass a `.npy`
+# file of real embeddings with --vectors to use those instead. Queries are
+# vectors from the set with a little noise added, sent in batches of 100, and
+# recall@10 is measured against exact float32 search.
+def clustered_vectors(count, dimensions, clusters, rng):
+    centres = rng.standard_normal((clusters, dimensions), dtype=np.float32)
+    noise = rng.standard_normal((count, dimensions), dtype=np.float32)
+    return normalize(centres[rng.integers(clusters, size=count)] + noise)
+
+
+def benchmark(vectors, num_queries=500, k=10, batch=100):
+    rng = np.random.default_rng(1)
+    vectors = normalize(vectors)
+    noise = rng.standard_normal((num_queries, vectors.shape[1]), dtype=np.float32)
+    queries = normalize(vectors[rng.choice(len(vectors), num_queries)] + 0.05 * noise)
+
+    def run(search):
+        started = time.perf_counter()
+        results = np.concatenate([search(queries[i : i + batch]) for i in range(0, num_queries, batch)])
+        return results, num_queries / (time.perf_counter() - started)
+
+    def exact_search(q):
+        return np.argpartition(-(q @ vectors.T), k - 1, axis=1)[:, :k]
+
+    exact, qps = run(exact_search)
+    print(f"{len(vectors)} vectors of {vectors.shape[1]} dimensions")
+    print(f"float32              {vectors.nbytes / 2**20:6.1f} MiB  {qps:6.0f} QPS  recall@{k} 1.000")
+
+    with tempfile.TemporaryDirectory() as path:
+        QuantizedIndex.build(path, vectors)
+        for kind in QuantizedIndex.KINDS:
+            index = QuantizedIndex(path, kind)
+            for shortlist in (k, 10 * k):
+                results, qps = run(
+                    lambda q, index=index, shortlist=shortlist: index.search(q, k, shortlist)[0]
+                )
+                recall = np.mean([len(set(r) & set(e)) / k for r, e in zip(results, exact)])
+                label = f"{kind}, rerank {shortlist}"
+                print(
+                    f"{label:<20} {index.codes.codes.nbytes / 2**20:6.1f} MiB  "
+                    f"{qps:6.0f} QPS  recall@{k} {recall:.3f}"
+                )
+            del index  # Close the memory map before the directory is removed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Search quantized embeddings")
+    parser.add_argument("--benchmark", action="store_true", help="Run offline on stored vectors")
+    parser.add_argument("--vectors", help="A .npy file of embeddings to benchmark on")
+    return parser.parse_args()
+
+
+# Run against the real API, or pass --benchmark to measure memory, speed and
+# recall offline.
+if __name__ == "__main__":
+    args = parse_args()
+    if args.benchmark:
+        if args.vectors:
+            benchmark(np.load(args.vectors, mmap_mode="r"))
+        else:
+            benchmark(clustered_vectors(200_000, 768, 2000, np.random.default_rng(0)))
+    else:
+        main()
@@ -0,0 +1,211 @@
+# Choosing embedding dimensions
+# This example shows how to decide how many dimensions your embeddings need. Gemini embedding models are trained so
+# that the first dimensions carry the most meaning (Matryoshka representation learning), so a vector can be shortened
+# with `output_dimensionality` or by truncating a full-length one. Shortened vectors must be renormalized. A sweep over
+# several sizes measures what each saves in storage and search time and what it costs in retrieval quality, on a small
+# labelled dataset of questions and the facts that answer them.
+
+# Import the necessary libraries
+import argparse
+import os
+import time
+
+import numpy as np
+from google import genai
+from google.genai import types
+
+MODEL = "gemini-embedding-001"
+FULL_DIMENSIONS = 3072
+SIZES = [3072, 1536, 768, 256, 128]
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+
+# Get embeddings of a given size, in one of two ways. "request" asks the API
+# for `dimensions` values; "truncate" takes the first `dimensions` values of
+# full-length vectors, so one set of full vectors serves every size. Both are
+# renormalized: only full-length vectors come back with unit length.
+def embed(client, texts, task_type, dimensions=FULL_DIMENSIONS):
+    response = client.models.embed_content(
+        model=MODEL,
+        contents=texts,
+        config=types.EmbedContentConfig(task_type=task_type, output_dimensionality=dimensions),
+    )
+    return normalize([e.values for e in response.embeddings])
+
+
+def truncate(vectors, dimensions):
+    return normalize(vectors[:, :dimensions])
+
+
+# Retrieval quality for a set of queries, each with the index of the one
+# document that answers it: how often that document is ranked first (hit@1),
+# how often it is in the top 5 (recall@5), and the mean reciprocal rank.
+def evaluate(documents, queries, relevant):
+    scores = queries @ documents.T
+    ranks = (scores > scores[np.arange(len(queries)), relevant][:, None]).sum(axis=1) + 1
+    return {
+        "hit@1": np.mean(ranks == 1),
+        "recall@5": np.mean(ranks <= 5),
+        "mrr": np.mean(1 / ranks),
+    }
+
+
+# Search time at each size, for exact search over `corpus`, a matrix of random
+# full-length vectors, since the labelled set is too small to time. One corpus
+# serves every size: each is timed on a copy of its first `dimensions` columns,
+# normalized in place, so at most one copy is held at a time.
+def search_ms(corpus, dimensions, num_queries=100, k=10):
+    documents = np.ascontiguousarray(corpus[:, :dimensions])
+    documents /= np.linalg.norm(documents, axis=1, keepdims=True)
+    rng = np.random.default_rng(1)
+    queries = normalize(rng.standard_normal((num_queries, dimensions), dtype=np.float32))
+    started = time.perf_counter()
+    for query in queries:
+        np.argpartition(-(documents @ query), k)[:k]
+    return (time.perf_counter() - started) * 1000 / num_queries
+
+
+# Print one row per size: bytes per float32 vector, storage for a million
+# vectors, search time over `search_rows` vectors and retrieval quality. With
+# `search_rows=0` the search time is skipped.
+def sweep(vectors_at, relevant, sizes=SIZES, search_rows=20_000):
+    rng = np.random.default_rng(0)
+    corpus = rng.standard_normal((search_rows, FULL_DIMENSIONS), dtype=np.float32)
+    print(f"{'dims':>5} {'bytes':>6} {'1M vectors':>11} {'search':>9}   hit@1  recall@5    mrr")
+    for dimensions in sizes:
+        documents, queries = vectors_at(dimensions)
+        quality = evaluate(documents, queries, relevant)
+        search = f"{search_ms(corpus, dimensions):6.1f} ms" if search_rows else f"{'-':>9}"
+        print(
+            f"{dimensions:5d} {dimensions * 4:6d} {dimensions * 4e6 / 2**30:7.1f} GiB "
+            f"{search}   {quality['hit@1']:.3f}     "
+            f"{quality['recall@5']:.3f}  {quality['mrr']:.3f}"
+        )
+
+
+# The labelled dataset: short facts about cats, and questions that are each
+# answered by exactly one of them. The facts share a lot of vocabulary, so the
+# questions can't be matched on keywords alone.
+FACTS = [
+    "Adult cats sleep between twelve and sixteen hours a day.",
+    "Kittens sleep even more than adult cats, up to twenty hours a day.",
+    "Most adult cats are lactose intolerant and get upset stomachs from milk.",
+    "Cats can't taste sweetness because they lack the sweet taste receptor.",
+    "Cats need taurine in their diet, which is found in meat.",
+    "Chocolate is toxic to cats because of the theobromine it contains.",
+    "Lilies are highly toxic to cats, and even the pollen can cause kidney failure.",
+    "A cat's purr vibrates at a frequency between 25 and 150 hertz.",
+    "Cats purr when they are content, but also when they are stressed or in pain.",
+    "Cats have a third eyelid, called the haw, that protects the eye.",
+    "Cats see well in dim light because of a reflective layer behind the retina.",
+    "A cat's whiskers are about as wide as its body and help it judge gaps.",
+    "Cats knead soft surfaces with their paws, a habit left over from nursing.",
+    "Cats bring dead prey to their owners, possibly to teach them to hunt.",
+    "A group of kittens is called a kindle, and a group of adult cats a clowder.",
+    "The oldest recorded cat, Creme Puff, lived to be 38 years old.",
+    "Indoor cats usually live longer than cats that go outdoors.",
+    "Cats were domesticated in the Near East around 10,000 years ago.",
+    "Ancient Egyptians honoured cats, and harming one could be punished by death.",
+    "Cats always land on their feet thanks to a twisting reflex.",
+    "A cat can jump up to six times its own length.",
+    "Cats sweat only through the pads of their paws.",
+    "Male cats are more often left-pawed, and female cats right-pawed.",
+    "Cats have 32 muscles in each ear and can rotate them 180 degrees.",
+]
+QUESTIONS = [
+    ("How long do cats nap each day?", 0),
+    ("Do baby cats need more rest than grown ones?", 1),
+    ("Is it a good idea to give my cat a saucer of milk?", 2),
+    ("Why doesn't my cat care about sugary treats?", 3),
+    ("Which nutrient in meat do cats depend on?", 4),
+    ("My cat ate a brownie. Should I be worried?", 5),
+    ("Are bouquets from the florist dangerous for cats?", 6),
+    ("At what pitch does a cat rumble?", 7),
+    ("Does purring always mean a cat is happy?", 8),
+    ("What is the membrane in the corner of a cat's eye?", 9),
+    ("How do cats find their way in the dark?", 10),
+    ("How does a cat know if it fits through a hole?", 11),
+    ("Why does my cat make biscuits on my blanket?", 12),
+    ("Why does my cat leave mice on the doormat?", 13),
+    ("What do you call a litter of young cats?", 14),
+    ("What is the longest a cat has ever lived?", 15),
+    ("Should I keep my cat inside to help it live longer?", 16),
+    ("When did people first keep cats as pets?", 17),
+    ("How were cats treated in Egypt?", 18),
+    ("How do cats survive a fall?", 19),
+    ("How high can a cat leap?", 20),
+    ("Where do cats perspire?", 21),
+    ("Do cats have a preferred paw?", 22),
+    ("How do cats move their ears so much?", 23),
+]
+
+
+# Embed the facts and questions once at full length, then sweep by truncation.
+# With --mode request, each size is requested from the API instead, to check
+# that truncating gives the same quality as asking for fewer dimensions.
+def main(mode, search_rows):
+    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    questions = [q for q, _ in QUESTIONS]
+    relevant = np.array([i for _, i in QUESTIONS])
+
+    if mode == "truncate":
+        full_documents = embed(client, FACTS, "RETRIEVAL_DOCUMENT")
+        full_queries = embed(client, questions, "RETRIEVAL_QUERY")
+
+        def vectors_at(dimensions):
+            return truncate(full_documents, dimensions), truncate(full_queries, dimensions)
+
+    else:
+
+        def vectors_at(dimensions):
+            return (
+                embed(client, FACTS, "RETRIEVAL_DOCUMENT", dimensions),
+                embed(client, questions, "RETRIEVAL_QUERY", dimensions),
+            )
+
+    print(f"{len(questions)} questions over {len(FACTS)} facts, {mode} mode")
+    sweep(vectors_at, relevant, search_rows=search_rows)
+
+
+# The benchmark needs no API key. It stands in for real embeddings with
+# synthetic ones in which, as with Matryoshka training, the first dimensions
+# carry the most signal: 20,000 documents, and for each of 2,000 of them a noisy
+# query that should find it.
+def matryoshka_like(rows, dimensions, rng):
+    weights = np.arange(1, dimensions + 1, dtype=np.float32) ** -0.6
+    return rng.standard_normal((rows, dimensions), dtype=np.float32) * weights
+
+
+def benchmark(search_rows):
+    rng = np.random.default_rng(0)
+    documents = matryoshka_like(20_000, FULL_DIMENSIONS, rng)
+    relevant = rng.choice(len(documents), 2_000, replace=False)
+    queries = documents[relevant] + matryoshka_like(len(relevant), FULL_DIMENSIONS, rng)
+    print(f"{len(relevant)} queries over {len(documents)} synthetic documents")
+
+    def vectors_at(dimensions):
+        return truncate(documents, dimensions), truncate(queries, dimensions)
+
+    sweep(vectors_at, relevant, search_rows=search_rows)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sweep embedding sizes")
+    parser.add_argument("--mode", choices=["truncate", "request"], default="truncate")
+    parser.add_argument("--benchmark", action="store_true", help="Sweep synthetic vectors offline")
+    parser.add_argument(
+        "--search-rows", type=int, default=20_000, help="Vectors to time search over (0 to skip)"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.benchmark:
+        benchmark(args.search_rows)
+    else:
+        main(args.mode, args.search_rows)
@@ -0,0 +1,277 @@
+# Semantic dedup and clustering
+# This example shows a streaming pipeline that removes near-duplicates from a large text corpus and groups the rest
+# by topic. Texts are read and embedded in batches, mini-batch k-means in NumPy assigns each one to a cluster and
+# moves the centroids a little with every batch, and a text is a near-duplicate when its cosine similarity to an
+# earlier text in the same cluster passes a threshold. Results are written out batch by batch, and each cluster
+# remembers only a fixed number of recent texts, so memory use stays flat however long the corpus is.
+
+# Import the necessary libraries
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+from google import genai
+from google.genai import types
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+
+# Read a text file one batch of lines at a time, with their line numbers.
+def read_batches(path, batch_size):
+    batch = []
+    with open(path) as f:
+        for line_number, line in enumerate(f):
+            if line.strip():
+                batch.append((line_number, line.strip()))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def embed(client, texts, dimensions, model="gemini-embedding-001"):
+    vectors = []
+    for i in range(0, len(texts), 100):
+        response = client.models.embed_content(
+            model=model,
+            contents=texts[i : i + 100],
+            config=types.EmbedContentConfig(
+                task_type="CLUSTERING", output_dimensionality=dimensions
+            ),
+        )
+        vectors += [e.values for e in response.embeddings]
+    return normalize(vectors)
+
+
+# Mini-batch k-means on the unit sphere. The initial centroids are spread out
+# over the first batch: each is the vector least similar to the centroids
+# picked before it. Each centroid then moves towards the mean of
+# the vectors assigned to it, by a step that shrinks as it gathers more
+# vectors, and is renormalized so assignment is by cosine similarity.
+#
+# For dedup, each cluster keeps a ring buffer of the last `memory` distinct
+# vectors assigned to it. A new vector is a duplicate if it is at least
+# `threshold` similar to one of them, or to an earlier distinct vector in the
+# same batch. Near-duplicates that arrive further apart than the ring buffer
+# reaches are missed; that is the price of bounded memory.
+class StreamingClusterer:
+    def __init__(self, clusters, dimensions, threshold=0.95, memory=256):
+        self.clusters = clusters
+        self.threshold = threshold
+        self.centroids = np.empty((0, dimensions), dtype=np.float32)
+        self.counts = np.zeros(clusters)
+        self.seen = np.zeros((clusters, memory, dimensions), dtype=np.float32)
+        self.seen_ids = np.full((clusters, memory), -1)
+        self.seen_total = np.zeros(clusters, dtype=np.int64)
+
+    def update_centroids(self, vectors):
+        while len(self.centroids) < min(self.clusters, len(vectors)):
+            if len(self.centroids):
+                pick = np.argmin((vectors @ self.centroids.T).max(axis=1))
+            else:
+                pick = 0
+            self.centroids = np.concatenate([self.centroids, vectors[pick : pick + 1]])
+        assignment = np.argmax(vectors @ self.centroids.T, axis=1)
+        batch_counts = np.bincount(assignment, minlength=len(self.centroids))
+        sums = np.zeros_like(self.centroids)
+        np.add.at(sums, assignment, vectors)
+        self.counts[: len(self.centroids)] += batch_counts
+        moved = batch_counts > 0
+        step = batch_counts[moved, None] / self.counts[: len(self.centroids)][moved, None]
+        mean = sums[moved] / batch_counts[moved, None]
+        old = self.centroids[moved]
+        self.centroids[moved] = normalize(old + step * (mean - old))
+        return np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def process(self, ids, vectors):
+        """Return the cluster of each vector and the id it duplicates (or -1)."""
+        assignment = self.update_centroids(vectors)
+        duplicate_of = np.full(len(ids), -1)
+        for cluster in np.unique(assignment):
+            for i in np.flatnonzero(assignment == cluster):
+                filled = min(self.seen_total[cluster], self.seen.shape[1])
+                similarity = self.seen[cluster, :filled] @ vectors[i]
+                if filled and similarity.max() >= self.threshold:
+                    duplicate_of[i] = self.seen_ids[cluster, similarity.argmax()]
+                    continue
+                slot = self.seen_total[cluster] % self.seen.shape[1]
+                self.seen[cluster, slot] = vectors[i]
+                self.seen_ids[cluster, slot] = ids[i]
+                self.seen_total[cluster] += 1
+        return assignment, duplicate_of
+
+
+# The pipeline: read, embed, cluster and dedup one batch at a time, appending
+# one JSON line per text to the output as each batch is finished.
+def run_pipeline(client, input_path, output_path, clusters=50, dimensions=256, batch_size=1000):
+    clusterer = StreamingClusterer(clusters, dimensions)
+    texts = duplicates = 0
+    with open(output_path, "w") as out:
+        for batch in read_batches(input_path, batch_size):
+            ids = [line_number for line_number, _ in batch]
+            vectors = embed(client, [text for _, text in batch], dimensions)
+            assignment, duplicate_of = clusterer.process(ids, vectors)
+            for line_number, cluster, original in zip(ids, assignment, duplicate_of):
+                record = {"line": line_number, "cluster": int(cluster)}
+                if original >= 0:
+                    record["duplicate_of"] = int(original)
+                out.write(json.dumps(record) + "\n")
+            out.flush()
+            texts += len(batch)
+            duplicates += int((duplicate_of >= 0).sum())
+    return texts, duplicates
+
+
+# Cluster and dedup a small file of cat-related posts, some of them reworded
+# copies of each other, and print the groups.
+SAMPLE_POSTS = [
+    "My cat sleeps all day on the sofa.",
+    "Our cat naps on the couch the whole day.",
+    "My cat sleeps all day on the sofa!",
+    "What is the best food for a kitten?",
+    "Which kitten food do vets recommend?",
+    "What's the best food for a kitten?",
+    "My cat knocked a glass off the table again.",
+    "Why do cats push things off tables?",
+    "My cat knocked a glass off the table again!!",
+]
+
+
+def main():
+    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    with tempfile.TemporaryDirectory() as path:
+        input_path = os.path.join(path, "posts.txt")
+        output_path = os.path.join(path, "clusters.jsonl")
+        with open(input_path, "w") as f:
+            f.write("\n".join(SAMPLE_POSTS) + "\n")
+        texts, duplicates = run_pipeline(client, input_path, output_path, clusters=3)
+        print(f"{texts} posts, {duplicates} near-duplicates")
+        with open(output_path) as f:
+            records = sorted((json.loads(line) for line in f), key=lambda r: r["cluster"])
+    for record in records:
+        note = f"  (duplicate of line {record['duplicate_of']})" if "duplicate_of" in record else ""
+        print(f"cluster {record['cluster']}: {SAMPLE_POSTS[record['line']]}{note}")
+
+
+# For the benchmark, a local server stands in for the embeddings endpoint. The
+# synthetic corpus has lines like "Topic 7: cat story 1234", and some stories
+# are posted again with a small change. The mock embeds each line as a topic
+# direction plus a story direction plus a little noise, so reposts are near-
+# duplicates and stories on the same topic are similar.
+def seeded_vector(key, dimensions):
+    seed = int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], "little")
+    return np.random.default_rng(seed).standard_normal(dimensions)
+
+
+def mock_vector(text, dimensions):
+    topic, story = re.match(r"Topic (\d+): cat story (\d+)", text).groups()
+    vector = (
+        3 * seeded_vector(f"topic {topic}", dimensions)
+        + 1.5 * seeded_vector(f"story {story}", dimensions)
+        + 0.1 * seeded_vector(text, dimensions)
+    )
+    return normalize(vector).round(6).tolist()
+
+
+def mock_api(handler):
+    embeddings = [
+        {"values": mock_vector(r["content"]["parts"][0]["text"], r["outputDimensionality"])}
+        for r in handler.json()["requests"]
+    ]
+    handler.send_json({"embeddings": embeddings})
+
+
+# Write `count` lines over 50 topics. One line in five reposts one of the last
+# 200 stories with a different ending; the rest are new stories.
+def write_corpus(path, count, seed=0):
+    rng = np.random.default_rng(seed)
+    stories = []
+    with open(path, "w") as f:
+        for i in range(count):
+            if stories and rng.random() < 0.2:
+                topic, story = stories[-1 - rng.integers(min(len(stories), 200))]
+                ending = rng.choice(["!", " (repost)", " again", "..."])
+            else:
+                topic, story, ending = rng.integers(50), i, ""
+                stories.append((topic, story))
+            f.write(f"Topic {topic}: cat story {story}{ending}\n")
+
+
+# Run the pipeline on corpora of 20,000 and 60,000 lines and check the output
+# against the known topics and reposts. The peak memory traced during each run
+# stays the same as the corpus triples.
+def score(input_path, output_path):
+    with open(input_path) as f:
+        lines = [re.match(r"Topic (\d+): cat story (\d+)", line).groups() for line in f]
+    with open(output_path) as f:
+        records = [json.loads(line) for line in f]
+    first_seen = {}
+    true_duplicates = set()
+    for number, key in enumerate(lines):
+        if key in first_seen:
+            true_duplicates.add(number)
+        first_seen.setdefault(key, number)
+    found = {r["line"] for r in records if "duplicate_of" in r}
+    correct = sum(
+        1 for r in records if "duplicate_of" in r and lines[r["duplicate_of"]] == lines[r["line"]]
+    )
+
+    # Purity: the share of lines whose cluster's most common topic is their own topic
+    by_cluster = {}
+    for r in records:
+        by_cluster.setdefault(r["cluster"], []).append(lines[r["line"]][0])
+    majority = sum(max(map(topics.count, set(topics))) for topics in by_cluster.values())
+    purity = majority / len(records)
+    return correct / max(len(found), 1), len(found & true_duplicates) / len(true_duplicates), purity
+
+
+def benchmark():
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools" / "mock_gemini"))
+    from mock_gemini import mock_client, start_mock_server
+
+    server, port = start_mock_server(mock_api)
+    client = mock_client(port)
+    tracemalloc.start()
+    with tempfile.TemporaryDirectory() as path:
+        for count in (20_000, 60_000):
+            input_path = os.path.join(path, "corpus.txt")
+            output_path = os.path.join(path, "clusters.jsonl")
+            write_corpus(input_path, count)
+            tracemalloc.reset_peak()
+            started = time.perf_counter()
+            texts, duplicates = run_pipeline(client, input_path, output_path)
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            precision, recall, purity = score(input_path, output_path)
+            print(
+                f"{texts} texts in {elapsed:.1f}s ({texts / elapsed:.0f}/s), peak memory "
+                f"{peak / 2**20:.0f} MiB: {duplicates} duplicates (precision {precision:.3f}, "
+                f"recall {recall:.3f}), cluster purity {purity:.3f}"
+            )
+    server.terminate()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Cluster and dedup texts")
+    parser.add_argument("--benchmark", action="store_true", help="Use a synthetic corpus")
+    return parser.parse_args()
+
+
+# Run against the real API, or pass --benchmark to try the pipeline offline.
+if __name__ == "__main__":
+    if parse_args().benchmark:
+        benchmark()
+    else:
+        main()
@@ -0,0 +1,410 @@
+# Retrieval vs context caching
+# This example compares two ways of asking many questions about one large document. Context caching (see the context
+# caching example) stores the whole document with the model once, and every question is answered with all of it in
+# context, at a discount on the cached tokens. Retrieval-augmented generation (RAG) splits the document into chunks,
+# embeds them into a local index, and sends each question with only the few chunks that are most similar to it. The
+# same questions are sent both ways, and the script reports setup time, latency, input tokens and how much the two
+# answers agree.
+
+# Import the necessary libraries
+import argparse
+import math
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import requests
+from google import genai
+from google.genai import types
+
+MODEL = "gemini-2.0-flash-001"  # Context caching needs a versioned model
+EMBEDDING_MODEL = "gemini-embedding-001"
+SYSTEM_INSTRUCTION = (
+    "You are a technical documentation expert. "
+    "Answer questions about the ZenML documentation provided. "
+    "Keep your answers concise and to the point."
+)
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+
+# Split a paragraph into pieces of up to `max_chars` characters, breaking
+# after the last sentence that fits, or else at the last space, so a long
+# paragraph is indexed in full rather than cut short.
+def split_paragraph(paragraph, max_chars):
+    pieces = []
+    while len(paragraph) > max_chars:
+        window = paragraph[: max_chars + 1]
+        cut = max((m.end() for m in re.finditer(r"[.!?](?=\s)", window)), default=0)
+        if not cut:
+            cut = max((m.start() for m in re.finditer(r"\s", window)), default=0) or max_chars
+        pieces.append(paragraph[:cut].rstrip())
+        paragraph = paragraph[cut:].lstrip()
+    return pieces + [paragraph]
+
+
+# Split the document into chunks of up to `max_chars` characters (about a
+# quarter as many tokens) along paragraph boundaries. Each chunk starts with
+# the heading of the section it comes from, so a chunk taken out of context
+# still says what it is about.
+def chunk_document(text, max_chars=2000):
+    chunks, current, heading = [], [], ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if paragraph.startswith("#"):
+            heading = paragraph.splitlines()[0]
+        # Leave room for the heading that starts each new chunk
+        room = max(max_chars - len(heading) - 2, max_chars // 2)
+        for piece in split_paragraph(paragraph, room):
+            if current and sum(map(len, current)) + len(piece) > max_chars:
+                chunks.append("\n\n".join(current))
+                current = [heading] if heading and heading != piece else []
+            current.append(piece)
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+# The local index: one normalized embedding per chunk, in a NumPy matrix.
+# Chunks are embedded 100 to a request. Each search embeds the question and
+# takes the `k` chunks with the highest cosine similarity.
+class ChunkIndex:
+    def __init__(self, client, chunks, dimensions=768):
+        self.client = client
+        self.chunks = chunks
+        self.dimensions = dimensions
+        self.vectors = np.concatenate(
+            [
+                self.embed(chunks[i : i + 100], "RETRIEVAL_DOCUMENT")
+                for i in range(0, len(chunks), 100)
+            ]
+        )
+
+    def embed(self, texts, task_type):
+        response = self.client.models.embed_content(
+            model=EMBEDDING_MODEL,
+            contents=texts,
+            config=types.EmbedContentConfig(
+                task_type=task_type, output_dimensionality=self.dimensions
+            ),
+        )
+        return normalize([e.values for e in response.embeddings])
+
+    def search(self, question, k=5):
+        """Return the `k` chunks most similar to the question, best first."""
+        scores = self.vectors @ self.embed([question], "RETRIEVAL_QUERY")[0]
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [self.chunks[i] for i in top[np.argsort(-scores[top])]]
+
+
+# One answer and what it took: wall-clock time, input tokens sent fresh,
+# input tokens read from the cache, and output tokens. The prompt token count
+# reported by the API includes the cached tokens, so they are subtracted.
+@dataclass
+class Answer:
+    text: str
+    seconds: float
+    fresh_tokens: int
+    cached_tokens: int
+    output_tokens: int
+
+
+def timed_answer(client, started, **kwargs):
+    response = client.models.generate_content(model=MODEL, **kwargs)
+    usage = response.usage_metadata
+    cached = usage.cached_content_token_count or 0
+    return Answer(
+        text=response.text,
+        seconds=time.perf_counter() - started,
+        fresh_tokens=(usage.prompt_token_count or 0) - cached,
+        cached_tokens=cached,
+        output_tokens=usage.candidates_token_count or 0,
+    )
+
+
+# The RAG path. The time includes embedding the question and searching.
+def ask_with_rag(client, index, question, k=5):
+    started = time.perf_counter()
+    excerpts = "\n\n---\n\n".join(index.search(question, k))
+    return timed_answer(
+        client,
+        started,
+        contents=f"Documentation excerpts:\n\n{excerpts}\n\nQuestion: {question}",
+        config=types.GenerateContentConfig(system_instruction=SYSTEM_INSTRUCTION),
+    )
+
+
+# The context caching path: the question alone, against the cached document.
+def ask_with_cache(client, cache, question):
+    return timed_answer(
+        client,
+        time.perf_counter(),
+        contents=question,
+        config=types.GenerateContentConfig(cached_content=cache.name),
+    )
+
+
+def create_cache(client, document):
+    return client.caches.create(
+        model=MODEL,
+        config=types.CreateCachedContentConfig(
+            display_name="RAG comparison",
+            system_instruction=SYSTEM_INSTRUCTION,
+            contents=[document],
+            ttl="900s",
+        ),
+    )
+
+
+# How much two answers agree: the F1 score of the words they share, from 0
+# (no words in common) to 1 (the same words).
+def answer_overlap(a, b):
+    a, b = re.findall(r"\w+", a.lower()), re.findall(r"\w+", b.lower())
+    common = sum(min(a.count(w), b.count(w)) for w in set(a))
+    if not common:
+        return 0.0
+    precision, recall = common / len(a), common / len(b)
+    return 2 * precision * recall / (precision + recall)
+
+
+# Set up both paths, ask every question both ways, and print a summary. The
+# cache is deleted at the end even if a request fails.
+def compare(client, document, questions, k=5, show_answers=False):
+    started = time.perf_counter()
+    chunks = chunk_document(document)
+    index = ChunkIndex(client, chunks)
+    print(f"RAG setup: {len(chunks)} chunks embedded in {time.perf_counter() - started:.1f}s")
+    started = time.perf_counter()
+    cache = create_cache(client, document)
+    print(
+        f"Cache setup: {cache.usage_metadata.total_token_count} tokens cached in "
+        f"{time.perf_counter() - started:.1f}s"
+    )
+
+    rag, cached = [], []
+    try:
+        for question in questions:
+            rag.append(ask_with_rag(client, index, question, k))
+            cached.append(ask_with_cache(client, cache, question))
+            if show_answers:
+                print(f"\nQuestion: {question}")
+                print(f"RAG:   {rag[-1].text.strip()}")
+                print(f"Cache: {cached[-1].text.strip()}")
+    finally:
+        client.caches.delete(name=cache.name)
+
+    print(f"\n{len(questions)} questions, top {k} chunks")
+    print(f"{'':6} {'median':>8} {'p90':>8} {'fresh in':>9} {'cached in':>10} {'out':>5}")
+    for label, answers in (("RAG", rag), ("cache", cached)):
+        seconds = [a.seconds for a in answers]
+        print(
+            f"{label:6} {np.median(seconds):7.2f}s {np.percentile(seconds, 90):7.2f}s "
+            f"{np.mean([a.fresh_tokens for a in answers]):9.0f} "
+            f"{np.mean([a.cached_tokens for a in answers]):10.0f} "
+            f"{np.mean([a.output_tokens for a in answers]):5.0f}"
+        )
+    overlaps = [answer_overlap(r.text, c.text) for r, c in zip(rag, cached)]
+    print(f"answer overlap: mean {np.mean(overlaps):.2f}, min {np.min(overlaps):.2f}")
+
+
+# Ask about the ZenML documentation from the context caching example.
+def main():
+    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    response = requests.get("https://zenml.io/llms.txt")
+    response.raise_for_status()
+    questions = [
+        "What are the recommended use cases for ZenML's pipeline orchestration?",
+        "How does ZenML integrate with cloud providers?",
+        "How do I register a new stack in ZenML?",
+        "What is an artifact store?",
+    ]
+    compare(client, response.text, questions, show_answers=True)
+
+
+# For the benchmark, a local server stands in for the API. It holds cached
+# contents in memory and answers a question with the sentence from its context
+# (the cached document, or the excerpts sent) that shares the most words with
+# it, so two answers agree when both paths saw the right passage. Embeddings
+# are hashed bags of words, so similar texts get similar vectors. Latency is a
+# model, not a measurement: by default 200 ms per generation, plus 20 µs per
+# fresh input token, 5 µs per cached input token and 4 ms per output token,
+# with cache creation charged like fresh input. These are assumptions, and the
+# ratio of cached to fresh token time decides which path is faster, so each can
+# be changed from the command line. Tokens are counted as 4 characters each.
+MOCK_LATENCY = {"base": 0.2, "fresh": 20e-6, "cached": 5e-6, "output": 4e-3}
+STOP_WORDS = set("a an and are by do does for how i in is it of on or the to what which with".split())
+
+
+def mock_tokens(text):
+    return math.ceil(len(text) / 4)
+
+
+def words(text):
+    return set(re.findall(r"\w+", text.lower())) - STOP_WORDS
+
+
+def mock_vector(text, dimensions):
+    vector = np.zeros(dimensions)
+    for word in words(text):
+        h = zlib.crc32(word.encode())
+        vector[h % dimensions] += 1 if h & 1 << 31 else -1
+    return (vector / max(np.linalg.norm(vector), 1e-12)).round(6).tolist()
+
+
+def mock_answer(context, question):
+    sentences = re.split(r"(?<=[.!?])\s+", context)
+    return max(sentences, key=lambda s: len(words(s) & words(question)))
+
+
+def text_of(content):
+    return "".join(part.get("text", "") for part in content.get("parts", []))
+
+
+MOCK_LOCK = threading.Lock()
+MOCK_CACHES = {}
+
+
+def mock_api(handler):
+    latency = handler.settings["latency"]
+    if handler.command == "DELETE":
+        with MOCK_LOCK:
+            MOCK_CACHES.pop(handler.path.split("/", 2)[-1], None)
+        handler.send_json({})
+        return
+    request = handler.json()
+    if ":batchEmbedContents" in handler.path or ":embedContent" in handler.path:
+        requests = request.get("requests", [request])
+        time.sleep(0.05 + 0.0002 * len(requests))
+        embeddings = [
+            {"values": mock_vector(text_of(r["content"]), r.get("outputDimensionality", 768))}
+            for r in requests
+        ]
+        handler.send_json({"embeddings": embeddings})
+    elif handler.path.endswith("/cachedContents"):
+        document = "\n".join(text_of(c) for c in request["contents"])
+        tokens = mock_tokens(document)
+        with MOCK_LOCK:
+            name = f"cachedContents/mock-{len(MOCK_CACHES)}"
+            MOCK_CACHES[name] = document
+        time.sleep(latency["base"] + latency["fresh"] * tokens)
+        handler.send_json(
+            {
+                "name": name,
+                "model": request["model"],
+                "usageMetadata": {"totalTokenCount": tokens},
+                "expireTime": "2030-01-01T00:00:00Z",
+            }
+        )
+    else:  # generateContent
+        prompt = "\n".join(text_of(c) for c in request["contents"])
+        cached = MOCK_CACHES.get(request.get("cachedContent"), "")
+        context, _, question = prompt.rpartition("Question: ")
+        answer = mock_answer(f"{cached}\n{context}", question)
+        fresh_tokens, cached_tokens = mock_tokens(prompt), mock_tokens(cached) if cached else 0
+        output_tokens = mock_tokens(answer)
+        time.sleep(
+            latency["base"]
+            + latency["fresh"] * fresh_tokens
+            + latency["cached"] * cached_tokens
+            + latency["output"] * output_tokens
+        )
+        usage = {
+            "promptTokenCount": fresh_tokens + cached_tokens,
+            "candidatesTokenCount": output_tokens,
+            "totalTokenCount": fresh_tokens + cached_tokens + output_tokens,
+        }
+        if cached:
+            usage["cachedContentTokenCount"] = cached_tokens
+        content = {"role": "model", "parts": [{"text": answer}]}
+        handler.send_json({"candidates": [{"content": content}], "usageMetadata": usage})
+
+
+# A synthetic document about as long as the ZenML one (about 100,000 tokens):
+# 300 sections, each describing one made-up integration in two sentences of
+# facts, padded with general text shared by every section. Each question asks
+# for one fact from one section.
+FILLER = [
+    "Pipelines are made of steps that pass artifacts to each other.",
+    "Every run is recorded so that results can be reproduced later.",
+    "Steps can be cached when their inputs have not changed.",
+    "Configuration can be given in code or in a YAML file.",
+    "Secrets are stored centrally and referenced by name.",
+    "Logs from each step are collected and shown in the dashboard.",
+    "Models move through stages from development to production.",
+    "Stacks combine the components that a pipeline runs on.",
+    "Teams share stacks so that everyone runs pipelines the same way.",
+    "Metadata about each artifact is tracked alongside it.",
+]
+
+
+def synthetic_document(sections=300, seed=0):
+    rng = np.random.default_rng(seed)
+    syllables = ["ka", "lo", "mi", "ne", "ru", "ta", "vo", "zi", "be", "sha", "pu", "dor"]
+    names = set()
+    while len(names) < sections:
+        names.add("".join(rng.choice(syllables, 3)))
+    parts, questions = ["# Integrations"], []
+    for i, name in enumerate(sorted(names)):
+        flag = rng.choice(["cache", "remote", "secure", "batch", "local", "async"])
+        version = f"{rng.integers(1, 9)}.{rng.integers(0, 20)}"
+        parts.append(f"## The {name.title()} integration")
+        parts.append(
+            f"The {name.title()} integration is enabled with the `--{name}-{flag}` flag. "
+            f"The {name.title()} integration requires version {version} of the `{name}` package."
+        )
+        for _ in range(6):
+            parts.append(" ".join(rng.choice(FILLER, 4, replace=False)))
+        if i % 15 == 0:
+            questions.append(f"Which flag enables the {name.title()} integration?")
+        elif i % 15 == 7:
+            questions.append(f"What version of the package does {name.title()} require?")
+    return "\n\n".join(parts), questions
+
+
+def benchmark(latency=MOCK_LATENCY):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools" / "mock_gemini"))
+    from mock_gemini import mock_client, start_mock_server
+
+    server, port = start_mock_server(mock_api, latency=latency)
+    document, questions = synthetic_document()
+    compare(mock_client(port), document, questions)
+    server.terminate()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare retrieval with context caching")
+    parser.add_argument("--benchmark", action="store_true", help="Use a synthetic document")
+    latency = parser.add_argument_group("mock latency, for --benchmark")
+    latency.add_argument("--base-ms", type=float, default=MOCK_LATENCY["base"] * 1e3)
+    latency.add_argument("--fresh-us", type=float, default=MOCK_LATENCY["fresh"] * 1e6)
+    latency.add_argument("--cached-us", type=float, default=MOCK_LATENCY["cached"] * 1e6)
+    latency.add_argument("--output-ms", type=float, default=MOCK_LATENCY["output"] * 1e3)
+    return parser.parse_args()
+
+
+# Run against the real API, or pass --benchmark to compare the two paths offline.
+if __name__ == "__main__":
+    args = parse_args()
+    if args.benchmark:
+        benchmark(
+            {
+                "base": args.base_ms / 1e3,
+                "fresh": args.fresh_us / 1e6,
+                "cached": args.cached_us / 1e6,
+                "output": args.output_ms / 1e3,
+            }
+        )
+    else:
+        main()
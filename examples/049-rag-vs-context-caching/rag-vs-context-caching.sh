@@ -0,0 +1,44 @@
+# First, install the Google Generative AI library, NumPy and Requests
+$ pip install google-genai numpy requests
+
+# Ask four questions about the ZenML documentation both ways. Retrieval sends about 2,500 input tokens per question instead of reading 107,000 from the cache, answers faster, and gives the same facts in different words (so the word overlap is moderate), though it can miss details spread across the whole document.
+$ python rag-vs-context-caching.py
+RAG setup: 248 chunks embedded in 6.8s
+Cache setup: 107203 tokens cached in 9.4s
+Question: What are the recommended use cases for ZenML's pipeline orchestration?
+RAG:   ZenML pipelines suit ML workflows such as data preprocessing, model training, evaluation, deployment and batch inference, and can run locally or on orchestrators like Kubernetes, Airflow and Kubeflow.
+Cache: ZenML's pipeline orchestration is recommended for ML workflows including data preprocessing, model training, model evaluation, deployment, monitoring and hyperparameter tuning, on local or remote orchestrators.
+Question: How does ZenML integrate with cloud providers?
+RAG:   Through stack components for each provider: artifact stores (S3, GCS, Azure Blob), orchestrators, container registries (ECR, GCR, ACR) and service connectors for authentication.
+Cache: ZenML integrates with cloud providers through provider-specific stack components such as artifact stores (S3, GCS, Azure Blob Storage), orchestrators and container registries (ECR, GCR, ACR).
+Question: How do I register a new stack in ZenML?
+RAG:   Register the components first, then run `zenml stack register <name> -o <orchestrator> -a <artifact-store>` and activate it with `zenml stack set <name>`.
+Cache: Use `zenml stack register <name> -o <orchestrator> -a <artifact-store>` and then `zenml stack set <name>` to make it active.
+Question: What is an artifact store?
+RAG:   The artifact store is the stack component where ZenML stores the outputs of pipeline steps, such as datasets and models, for example in S3 or GCS.
+Cache: An artifact store is a stack component that persists the artifacts produced by pipeline steps, for example on a local filesystem, S3, GCS or Azure Blob Storage.
+4 questions, top 5 chunks
+         median      p90  fresh in  cached in   out
+RAG       1.62s    1.95s      2489          0    48
+cache     2.71s    3.40s        13     107203    52
+answer overlap: mean 0.41, min 0.32
+
+# Compare the two paths on a synthetic document of about 118,000 tokens and 40 questions, against a local mock endpoint (no API key needed). The mock's latency is an assumption, not a measurement: 200 ms per call, 20 µs per fresh input token, 5 µs per cached input token and 4 ms per output token. The ratio of cached to fresh token time decides which path wins. Both paths give the same answer for all but one question, where retrieval missed the right section.
+$ python rag-vs-context-caching.py --benchmark
+RAG setup: 257 chunks embedded in 0.5s
+Cache setup: 118134 tokens cached in 2.6s
+40 questions, top 5 chunks
+         median      p90  fresh in  cached in   out
+RAG       0.48s    0.49s      2363          0    21
+cache     1.01s    1.04s        12     118134    21
+answer overlap: mean 0.96, min 0.28
+
+# Each latency assumption can be set with --base-ms, --fresh-us, --cached-us and --output-ms. If reading a cached token is assumed to take 0.25 µs instead of 5 µs, the cache is faster than retrieval.
+$ python rag-vs-context-caching.py --benchmark --cached-us 0.25
+RAG setup: 257 chunks embedded in 0.5s
+Cache setup: 118134 tokens cached in 2.6s
+40 questions, top 5 chunks
+         median      p90  fresh in  cached in   out
+RAG       0.48s    0.49s      2363          0    21
+cache     0.44s    0.48s        12     118134    21
+answer overlap: mean 0.96, min 0.28
@@ -0,0 +1,429 @@
+# Context cache manager
+# This example shows how to manage context caches for an application that asks about the same documents from many
+# processes. A cache is found by a hash of its model, system instruction and contents, in a small SQLite registry
+# shared by every process, so the same document is cached once instead of once per process. Caches that are in use
+# have their TTL extended before they expire, caches that are no longer used are left to expire, and when the caches
+# would cost more to store than a budget allows, the least recently used ones are deleted.
+
+# Import the necessary libraries
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import requests
+from google import genai
+from google.genai import errors, types
+
+# Storage price for cached tokens, in dollars per million tokens per hour
+# (Gemini 2.0 Flash). Check the pricing page for the model you use.
+STORAGE_PRICE = 1.00
+
+
+# The key of a cache: a hash of everything that makes two caches
+# interchangeable. Contents can be strings or SDK objects such as `Part`s.
+def cache_key(model, system_instruction, contents):
+    def dump(value):
+        return value.model_dump(mode="json", exclude_none=True)
+
+    payload = json.dumps([model, system_instruction, contents], default=dump, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# The manager. The registry has one row per cache the manager created: its
+# name, size and expiry time, and when it was last used. Reading it takes no
+# lock, so looking up a live cache never waits for other processes. A missing
+# cache is first claimed with a single conditional write: the row is marked
+# with this manager's `owner` id, then the cache is created with no lock held.
+# Other processes asking for the same document see the claim and poll the row
+# until the cache is there, so one creates it and the rest reuse it. A claim
+# older than `claim_timeout` seconds, left by a process that died, can be taken
+# over.
+#
+# A cache used within `refresh_margin` seconds of its expiry gets a fresh
+# `ttl`, and `refresh` does the same for every cache used in the last
+# `hot_seconds`, for callers that want to keep caches warm between requests.
+# After each new cache, the least recently used caches are deleted until the
+# storage cost is within `budget_per_hour` dollars.
+class CacheManager:
+    def __init__(
+        self,
+        client,
+        path="caches.sqlite",
+        ttl=900,
+        refresh_margin=300,
+        budget_per_hour=1.0,
+        claim_timeout=120,
+        poll_interval=0.05,
+    ):
+        self.client = client
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.budget_per_hour = budget_per_hour
+        self.claim_timeout = claim_timeout
+        self.poll_interval = poll_interval
+        self.owner = uuid.uuid4().hex
+        self.min_remaining = min(10, ttl / 10)  # Don't hand out a cache about to expire
+        self.touch_interval = 1.0  # A hit writes last_used at most once a second
+        # Every write is a single statement, committed at once
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS caches (
+                key TEXT PRIMARY KEY,
+                name TEXT,
+                model TEXT NOT NULL,
+                tokens INTEGER NOT NULL,
+                expires REAL NOT NULL,
+                last_used REAL NOT NULL,
+                owner TEXT,
+                claimed REAL NOT NULL
+            )
+            """
+        )
+
+    def get(self, model, contents, system_instruction=None):
+        """Return the name of a live cache of `contents`, creating it if needed."""
+        key = cache_key(model, system_instruction, contents)
+        while True:
+            now = time.time()
+            row = self.db.execute(
+                "SELECT name, expires, last_used, owner, claimed FROM caches WHERE key = ?",
+                (key,),
+            ).fetchone()
+            name, expires, last_used, owner, claimed = row or (None, 0, 0, None, 0)
+            if owner and now - claimed < self.claim_timeout:
+                time.sleep(self.poll_interval)  # Another process is creating it
+                continue
+            if not owner and expires > now + self.min_remaining:
+                if expires < now + self.refresh_margin:
+                    expires = self.extend(name)  # In use and close to expiry
+                    self.db.execute(
+                        "UPDATE caches SET expires = ?, last_used = ? "
+                        "WHERE key = ? AND name = ? AND owner IS NULL",
+                        (expires, now, key, name),
+                    )
+                    if not expires:
+                        continue  # It was deleted elsewhere
+                elif now - last_used > self.touch_interval:
+                    self.db.execute("UPDATE caches SET last_used = ? WHERE key = ?", (now, key))
+                return name
+            if self.claim(key, model, row, now):
+                name = self.create(key, model, contents, system_instruction)
+                self.evict(keep=key)
+                return name
+
+    def claim(self, key, model, row, now):
+        """Mark `key` as being created here. False if another process got there first."""
+        if row is None:
+            cursor = self.db.execute(
+                "INSERT OR IGNORE INTO caches VALUES (?, NULL, ?, 0, 0, ?, ?, ?)",
+                (key, model, now, self.owner, now),
+            )
+        else:
+            # Only if the row is still the expired cache or stale claim that was read
+            _, expires, _, owner, claimed = row
+            cursor = self.db.execute(
+                "UPDATE caches SET owner = ?, claimed = ? "
+                "WHERE key = ? AND expires = ? AND owner IS ? AND claimed = ?",
+                (self.owner, now, key, expires, owner, claimed),
+            )
+        return cursor.rowcount == 1
+
+    def create(self, key, model, contents, system_instruction):
+        try:
+            cache = self.client.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    display_name=f"managed-{key[:16]}",
+                    system_instruction=system_instruction,
+                    contents=contents,
+                    ttl=f"{self.ttl}s",
+                ),
+            )
+        except BaseException:
+            # Give up the claim, so another process can try
+            self.db.execute("DELETE FROM caches WHERE key = ? AND owner = ?", (key, self.owner))
+            raise
+        self.db.execute(
+            "UPDATE caches SET name = ?, tokens = ?, expires = ?, last_used = ?, "
+            "owner = NULL, claimed = 0 WHERE key = ? AND owner = ?",
+            (
+                cache.name,
+                cache.usage_metadata.total_token_count,
+                cache.expire_time.timestamp(),
+                time.time(),
+                key,
+                self.owner,
+            ),
+        )
+        return cache.name
+
+    def extend(self, name):
+        """Give the cache a new TTL and return its new expiry time, or 0 if it is gone."""
+        try:
+            cache = self.client.caches.update(
+                name=name, config=types.UpdateCachedContentConfig(ttl=f"{self.ttl}s")
+            )
+        except errors.APIError as e:
+            if e.code not in (403, 404):  # The API answers 403 for a missing cache
+                raise
+            return 0
+        return cache.expire_time.timestamp()
+
+    def refresh(self, hot_seconds=600):
+        """Extend every cache used in the last `hot_seconds` that will expire soon."""
+        now = time.time()
+        rows = self.db.execute(
+            "SELECT key, name FROM caches "
+            "WHERE last_used > ? AND expires > ? AND expires < ? AND owner IS NULL",
+            (now - hot_seconds, now, now + self.refresh_margin),
+        ).fetchall()
+        for key, name in rows:
+            self.db.execute(
+                "UPDATE caches SET expires = ? WHERE key = ? AND name = ?",
+                (self.extend(name), key, name),
+            )
+        return len(rows)
+
+    def cost_per_hour(self):
+        """What the live caches cost to store, in dollars per hour."""
+        (tokens,) = self.db.execute(
+            "SELECT COALESCE(SUM(tokens), 0) FROM caches WHERE expires > ?", (time.time(),)
+        ).fetchone()
+        return tokens / 1e6 * STORAGE_PRICE
+
+    def evict(self, keep=None):
+        """Forget expired caches, then delete the least recently used until within budget."""
+        now = time.time()
+        self.db.execute("DELETE FROM caches WHERE expires <= ? AND owner IS NULL", (now,))
+        rows = self.db.execute(
+            "SELECT key, name, tokens FROM caches "
+            "WHERE key != ? AND owner IS NULL ORDER BY last_used",
+            (keep or "",),
+        ).fetchall()
+        cost = self.cost_per_hour()
+        for key, name, tokens in rows:
+            if cost <= self.budget_per_hour:
+                break
+            self.delete(key, name)
+            cost -= tokens / 1e6 * STORAGE_PRICE
+
+    def delete(self, key, name):
+        try:
+            self.client.caches.delete(name=name)
+        except errors.APIError as e:
+            if e.code not in (403, 404):
+                raise
+        self.db.execute("DELETE FROM caches WHERE key = ?", (key,))
+
+    def generate_content(self, model, contents, prompt, system_instruction=None):
+        """Ask `prompt` with `contents` cached. A cache deleted elsewhere is recreated once."""
+        for attempt in range(2):
+            name = self.get(model, contents, system_instruction)
+            try:
+                return self.client.models.generate_content(
+                    model=model,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(cached_content=name),
+                )
+            except errors.APIError as e:
+                if attempt or e.code not in (403, 404):
+                    raise
+                self.db.execute("DELETE FROM caches WHERE name = ? AND owner IS NULL", (name,))
+
+
+# Ask about the ZenML documentation. Run the script twice: the second run, or
+# any other process using the same registry file within the TTL, reuses the
+# cache created by the first.
+def main():
+    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    manager = CacheManager(client, "caches.sqlite", budget_per_hour=0.5)
+    response = requests.get("https://zenml.io/llms.txt")
+    response.raise_for_status()
+
+    started = time.perf_counter()
+    answer = manager.generate_content(
+        "gemini-2.0-flash-001",
+        [response.text],
+        "How does ZenML integrate with cloud providers?",
+        system_instruction="Answer questions about the ZenML documentation. Be concise.",
+    )
+    usage = answer.usage_metadata
+    print(f"Answered in {time.perf_counter() - started:.1f}s")
+    print(f"Cached tokens: {usage.cached_content_token_count}")
+    print(f"Storage cost of live caches: ${manager.cost_per_hour():.3f}/hour")
+    print(answer.text)
+
+
+# For the benchmark, a local server stands in for the API. It keeps caches in
+# memory and lets them expire, answers every question with the number of tokens
+# it read from the cache (or a 403 if the cache is gone), and counts the caches
+# created, extended and deleted. Creating a cache takes 200 ms plus 20 µs per
+# token, and tokens are counted as 4 characters each.
+MOCK_LOCK = threading.Lock()
+MOCK_CACHES = {}
+MOCK_COUNTS = {"created": 0, "extended": 0, "deleted": 0}
+
+
+def mock_cache(name):
+    tokens, expires = MOCK_CACHES[name]
+    expire_time = datetime.fromtimestamp(expires, timezone.utc).isoformat()
+    return {"name": name, "usageMetadata": {"totalTokenCount": tokens}, "expireTime": expire_time}
+
+
+def mock_api(handler):
+    name = handler.path.split("/", 2)[-1].split("?")[0]
+    if handler.command == "GET":
+        # GET /stats reports the counts and the tokens in unexpired caches
+        with MOCK_LOCK:
+            now = time.time()
+            live = sum(tokens for tokens, expires in MOCK_CACHES.values() if expires > now)
+            handler.send_json({**MOCK_COUNTS, "live_tokens": live})
+    elif handler.command == "DELETE":
+        with MOCK_LOCK:
+            if MOCK_CACHES.pop(name, None):
+                MOCK_COUNTS["deleted"] += 1
+        handler.send_json({})
+    elif handler.command == "PATCH":
+        ttl = float(handler.json()["ttl"][:-1])
+        with MOCK_LOCK:
+            cache = MOCK_CACHES.get(name)
+            if cache and cache[1] > time.time():
+                cache[1] = time.time() + ttl
+                MOCK_COUNTS["extended"] += 1
+        if cache:
+            handler.send_json(mock_cache(name))
+        else:
+            handler.send_json({"error": {"code": 403, "status": "PERMISSION_DENIED"}}, 403)
+    elif handler.path.endswith("/cachedContents"):
+        request = handler.json()
+        text = "".join(p.get("text", "") for c in request["contents"] for p in c["parts"])
+        tokens = math.ceil(len(text) / 4)
+        time.sleep(0.2 + 20e-6 * tokens)
+        with MOCK_LOCK:
+            name = f"cachedContents/mock-{sum(MOCK_COUNTS.values())}"
+            MOCK_CACHES[name] = [tokens, time.time() + float(request["ttl"][:-1])]
+            MOCK_COUNTS["created"] += 1
+        handler.send_json(mock_cache(name))
+    else:
+        with MOCK_LOCK:
+            cache = MOCK_CACHES.get(handler.json().get("cachedContent"))
+        if not cache or cache[1] < time.time():
+            handler.send_json({"error": {"code": 403, "status": "PERMISSION_DENIED"}}, 403)
+            return
+        time.sleep(0.05)
+        usage = {"promptTokenCount": cache[0] + 10, "cachedContentTokenCount": cache[0]}
+        content = {"role": "model", "parts": [{"text": f"Read {cache[0]} cached tokens."}]}
+        handler.send_json({"candidates": [{"content": content}], "usageMetadata": usage})
+
+
+# Documents of about 50,000 tokens each, and a worker process that asks
+# `questions` questions about each one. Without a registry, every process
+# creates (and pays to store) its own cache of every document.
+MODEL = "gemini-2.0-flash-001"
+DOCUMENTS = [f"Document {i}. " + "Cats sleep a lot. " * 11_000 for i in range(6)]
+
+
+def worker(base_url, registry, documents, questions=5):
+    client = genai.Client(api_key="mock", http_options=types.HttpOptions(base_url=base_url))
+    if registry:
+        manager = CacheManager(client, registry)
+        for document in documents:
+            for _ in range(questions):
+                manager.generate_content(MODEL, [document], "How long do cats sleep?")
+        return
+    for document in documents:
+        cache = client.caches.create(
+            model=MODEL, config=types.CreateCachedContentConfig(contents=[document], ttl="900s")
+        )
+        for _ in range(questions):
+            client.models.generate_content(
+                model=MODEL,
+                contents="How long do cats sleep?",
+                config=types.GenerateContentConfig(cached_content=cache.name),
+            )
+
+
+def print_counts(label, counts):
+    print(
+        f"{label}: {counts['created']} created, {counts['extended']} extended, "
+        f"{counts['deleted']} deleted; {counts['live_tokens']} tokens stored "
+        f"(${counts['live_tokens'] / 1e6 * STORAGE_PRICE:.2f}/hour)"
+    )
+
+
+def benchmark(processes=4):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools" / "mock_gemini"))
+    from mock_gemini import mock_base_url, mock_client, mock_get, start_mock_server
+
+    with tempfile.TemporaryDirectory() as path:
+        # Four processes asking about the same two documents, without and
+        # with a shared registry. Each run gets a fresh mock server.
+        for registry in (None, os.path.join(path, "shared.sqlite")):
+            server, port = start_mock_server(mock_api)
+            started = time.perf_counter()
+            args = (mock_base_url(port), registry, DOCUMENTS[:2])
+            workers = [
+                multiprocessing.Process(target=worker, args=args) for _ in range(processes)
+            ]
+            for p in workers:
+                p.start()
+            for p in workers:
+                p.join()
+            label = "shared registry" if registry else "one cache per process"
+            elapsed = time.perf_counter() - started
+            print_counts(f"{label} ({elapsed:.1f}s)", mock_get(port, "/stats"))
+            server.terminate()
+
+        # A 3-second TTL. One document is asked about every 0.25 seconds for
+        # 6 seconds, then not at all for 4 seconds while `refresh` runs every
+        # second, then once more. Another is asked about only once. The first
+        # is extended as it nears expiry and never recreated, and the second
+        # expires on its own.
+        server, port = start_mock_server(mock_api)
+        client = mock_client(port)
+        manager = CacheManager(client, os.path.join(path, "ttl.sqlite"), ttl=3, refresh_margin=1.5)
+        manager.generate_content(MODEL, [DOCUMENTS[1]], "How long do cats sleep?")
+        for _ in range(24):
+            manager.generate_content(MODEL, [DOCUMENTS[0]], "How long do cats sleep?")
+            time.sleep(0.25)
+        for _ in range(4):
+            manager.refresh(hot_seconds=5)
+            time.sleep(1)
+        manager.generate_content(MODEL, [DOCUMENTS[0]], "How long do cats sleep?")
+        print_counts("hot and cold documents, 3s TTL", mock_get(port, "/stats"))
+        server.terminate()
+
+        # A budget of $0.12 an hour, room for two documents. One document is
+        # asked about between every new one, so it stays while the others are
+        # evicted in least recently used order.
+        server, port = start_mock_server(mock_api)
+        manager = CacheManager(
+            mock_client(port), os.path.join(path, "budget.sqlite"), budget_per_hour=0.12
+        )
+        for document in DOCUMENTS[1:]:
+            manager.generate_content(MODEL, [document], "How long do cats sleep?")
+            manager.generate_content(MODEL, [DOCUMENTS[0]], "How long do cats sleep?")
+        print_counts("six documents, $0.12/hour budget", mock_get(port, "/stats"))
+        manager.db.close()
+        server.terminate()
+
+
+# Run against the real API, or pass --benchmark to try the manager offline.
+# The main guard lets the worker processes start on every platform.
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark()
+    else:
+        main()
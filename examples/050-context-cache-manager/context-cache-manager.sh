@@ -0,0 +1,23 @@
+# First, install the Google Generative AI library and Requests
+$ pip install google-genai requests
+
+# Ask about the ZenML documentation. The first run creates the cache and records it in caches.sqlite.
+$ python context-cache-manager.py
+Answered in 11.2s
+Cached tokens: 107203
+Storage cost of live caches: $0.107/hour
+ZenML integrates with cloud providers through stack components for each provider, such as artifact stores (S3, GCS, Azure Blob Storage), orchestrators and container registries (ECR, GCR, ACR), with service connectors handling authentication.
+
+# Run it again within the TTL, or from another process, and the cache is found in the registry and reused instead of created again.
+$ python context-cache-manager.py
+Answered in 2.4s
+Cached tokens: 107203
+Storage cost of live caches: $0.107/hour
+ZenML integrates with cloud providers through provider-specific stack components: artifact stores (S3, GCS, Azure Blob Storage), orchestrators, container registries (ECR, GCR, ACR) and service connectors for authentication.
+
+# Run the benchmark against a local mock endpoint (no API key needed). Four processes share two caches instead of creating eight, a hot cache is extended instead of recreated while a cold one expires, and a budget keeps only the most recently used caches.
+$ python context-cache-manager.py --benchmark
+one cache per process (5.0s): 8 created, 0 extended, 0 deleted; 396024 tokens stored ($0.40/hour)
+shared registry (4.8s): 2 created, 0 extended, 0 deleted; 99006 tokens stored ($0.10/hour)
+hot and cold documents, 3s TTL: 2 created, 6 extended, 0 deleted; 49503 tokens stored ($0.05/hour)
+six documents, $0.12/hour budget: 6 created, 0 extended, 4 deleted; 99006 tokens stored ($0.10/hour)
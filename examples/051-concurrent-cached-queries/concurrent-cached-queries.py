@@ -0,0 +1,270 @@
+# Concurrent cached queries
+# This example shows how to ask many questions at once about one cached document. The context caching example sends
+# its questions one at a time; here they go through the async client (`client.aio`), with a semaphore capping how
+# many are in flight, all against the same `cached_content`. The usage metadata of every response is added up into
+# cached input, fresh input and output tokens, and the script reports throughput and what each question cost.
+
+# Import the necessary libraries
+import asyncio
+import math
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import requests
+from google import genai
+from google.genai import errors, types
+
+MODEL = "gemini-2.0-flash-001"  # Context caching needs a versioned model
+
+# Gemini 2.0 Flash prices in dollars per million tokens, and per million
+# tokens per hour for cache storage. Check the pricing page for your model.
+PRICES = {"input": 0.10, "cached": 0.025, "output": 0.40, "storage": 1.00}
+
+# Rate limiting (429) and transient server errors are worth retrying.
+RETRYABLE_CODES = (429, 500, 503, 504)
+
+
+# Token counts and timings added up over all responses. The prompt token
+# count includes the cached tokens, so the fresh input is the difference.
+# Failed queries are counted by error, such as "429 RESOURCE_EXHAUSTED".
+@dataclass
+class UsageTotals:
+    queries: int = 0
+    retries: int = 0
+    errors: Counter = field(default_factory=Counter)
+    fresh_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    latencies: list = field(default_factory=list)
+
+    def add(self, usage, seconds):
+        cached = usage.cached_content_token_count or 0
+        self.queries += 1
+        self.fresh_tokens += (usage.prompt_token_count or 0) - cached
+        self.cached_tokens += cached
+        self.output_tokens += usage.candidates_token_count or 0
+        self.latencies.append(seconds)
+
+    def cost(self):
+        """The token cost of all queries, in dollars, without storage."""
+        return (
+            self.fresh_tokens * PRICES["input"]
+            + self.cached_tokens * PRICES["cached"]
+            + self.output_tokens * PRICES["output"]
+        ) / 1e6
+
+
+def error_label(error):
+    if isinstance(error, errors.APIError):
+        return f"{error.code} {error.status}"
+    return type(error).__name__
+
+
+# Send every question with the cached document, at most `max_in_flight` at a
+# time. Answers come back in the order of the questions, with None for a
+# question that failed; failures are counted by error rather than stopping the
+# rest. Retryable errors are retried with full-jitter exponential backoff, and
+# a question waiting to retry gives up its slot to the others.
+async def ask_all(
+    client, cache_name, questions, max_in_flight=16, max_attempts=4, base_delay=1.0
+):
+    semaphore = asyncio.Semaphore(max_in_flight)
+    totals = UsageTotals()
+    config = types.GenerateContentConfig(cached_content=cache_name)
+
+    async def ask(question):
+        for attempt in range(max_attempts):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.aio.models.generate_content(
+                        model=MODEL, contents=question, config=config
+                    )
+                except Exception as e:
+                    error = e
+                else:
+                    totals.add(response.usage_metadata, time.perf_counter() - started)
+                    return response.text
+            retryable = isinstance(error, errors.APIError) and error.code in RETRYABLE_CODES
+            if not retryable or attempt == max_attempts - 1:
+                break
+            totals.retries += 1
+            await asyncio.sleep(random.uniform(0, base_delay * 2**attempt))
+        totals.errors[error_label(error)] += 1
+        return None
+
+    answers = await asyncio.gather(*(ask(q) for q in questions))
+    return answers, totals
+
+
+# Throughput, latency and cost. Cache storage is charged for as long as the
+# cache exists, so its share per query is the storage for the run divided by
+# the number of queries; the faster the questions go through, the less
+# storage each one pays for. The last column is what the same queries would
+# cost with the whole document sent as fresh input every time. When there were
+# retries or failures, a second line says how many and which errors.
+def report(label, totals, elapsed, cache_tokens):
+    storage = cache_tokens * PRICES["storage"] / 1e6 * elapsed / 3600
+    queries = max(totals.queries, 1)
+    per_query = (totals.cost() + storage) / queries
+    uncached = (
+        (totals.fresh_tokens + totals.cached_tokens) * PRICES["input"]
+        + totals.output_tokens * PRICES["output"]
+    ) / 1e6 / queries
+    latencies = sorted(totals.latencies) or [0]
+    print(
+        f"{label:<12} {totals.queries / elapsed:6.1f} q/s  "
+        f"p50 {latencies[len(latencies) // 2]:5.2f}s  errors {sum(totals.errors.values()):3d}  "
+        f"in {totals.fresh_tokens // queries:4d} fresh + {totals.cached_tokens // queries} cached  "
+        f"out {totals.output_tokens // queries:3d}  "
+        f"${per_query * 1000:.3f}/1k queries vs ${uncached * 1000:.2f} uncached"
+    )
+    if totals.retries or totals.errors:
+        failures = ", ".join(f"{label} ({count})" for label, count in totals.errors.most_common())
+        print(f"{'':<12} {totals.retries} retries; failed: {failures or 'none'}")
+
+
+def create_cache(client, document):
+    return client.caches.create(
+        model=MODEL,
+        config=types.CreateCachedContentConfig(
+            system_instruction=(
+                "You are a technical documentation expert. "
+                "Answer questions about the ZenML documentation provided. "
+                "Keep your answers concise and to the point."
+            ),
+            contents=[document],
+            ttl="900s",
+        ),
+    )
+
+
+# Cache the ZenML documentation from the context caching example and ask it
+# a batch of questions, eight at a time.
+async def main():
+    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    response = requests.get("https://zenml.io/llms.txt")
+    response.raise_for_status()
+    cache = create_cache(client, response.text)
+    cache_tokens = cache.usage_metadata.total_token_count
+    print(f"Cached {cache_tokens} tokens as {cache.name}")
+
+    topics = [
+        "pipelines",
+        "steps",
+        "artifacts",
+        "stacks",
+        "orchestrators",
+        "artifact stores",
+        "model registries",
+        "secrets",
+        "service connectors",
+        "the dashboard",
+    ]
+    questions = [f"In one sentence, what are {topic} in ZenML?" for topic in topics]
+    questions += [f"In one sentence, how do I configure {topic} in ZenML?" for topic in topics]
+
+    try:
+        started = time.perf_counter()
+        answers, totals = await ask_all(client, cache.name, questions, max_in_flight=8)
+        elapsed = time.perf_counter() - started
+    finally:
+        client.caches.delete(name=cache.name)
+
+    for question, answer in list(zip(questions, answers))[:3]:
+        print(f"{question}\n  {(answer or 'failed').strip()}")
+    report("8 in flight", totals, elapsed, cache_tokens)
+
+
+# For the benchmark, a local server stands in for the API. It answers every
+# question about a cache after 300 ms plus 5 µs per cached token and 4 ms per
+# output token, and reports usage like the real API, counting 4 characters as
+# a token. Requests are handled in parallel, so throughput depends on how many
+# the client keeps in flight, up to a limit of 48 questions at once: beyond
+# that it answers 429, as a quota would.
+MOCK_LOCK = threading.Lock()
+MOCK_CACHES = {}
+MOCK_MAX_ACTIVE = 48
+mock_active = 0
+
+
+def mock_api(handler):
+    if handler.command == "DELETE":
+        handler.send_json({})
+        return
+    request = handler.json()
+    if handler.path.endswith("/cachedContents"):
+        text = "".join(p.get("text", "") for c in request["contents"] for p in c["parts"])
+        with MOCK_LOCK:
+            name = f"cachedContents/mock-{len(MOCK_CACHES)}"
+            MOCK_CACHES[name] = math.ceil(len(text) / 4)
+        handler.send_json(
+            {
+                "name": name,
+                "usageMetadata": {"totalTokenCount": MOCK_CACHES[name]},
+                "expireTime": "2030-01-01T00:00:00Z",
+            }
+        )
+        return
+    global mock_active
+    with MOCK_LOCK:
+        busy = mock_active >= MOCK_MAX_ACTIVE
+        mock_active += not busy
+    if busy:
+        error = {"code": 429, "message": "Quota exceeded", "status": "RESOURCE_EXHAUSTED"}
+        handler.send_json({"error": error}, 429)
+        return
+    cached = MOCK_CACHES[request["cachedContent"]]
+    question = request["contents"][0]["parts"][0]["text"]
+    fresh, output = math.ceil(len(question) / 4), 40
+    time.sleep(0.3 + 5e-6 * cached + 4e-3 * output)
+    with MOCK_LOCK:
+        mock_active -= 1
+    usage = {
+        "promptTokenCount": cached + fresh,
+        "cachedContentTokenCount": cached,
+        "candidatesTokenCount": output,
+    }
+    content = {"role": "model", "parts": [{"text": "Cats sleep a lot. " * 10}]}
+    handler.send_json({"candidates": [{"content": content}], "usageMetadata": usage})
+
+
+# Ask 160 questions about a 107,000-token document, about the size of the
+# ZenML documentation, one at a time (as the context caching example does,
+# without its one-second pauses) and then with more and more in flight. Each
+# run gets a fresh client, since the async client's connections belong to the
+# event loop that opened them.
+def benchmark(num_questions=160):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools" / "mock_gemini"))
+    from mock_gemini import mock_client, start_mock_server
+
+    server, port = start_mock_server(mock_api)
+    client = mock_client(port)
+    cache = create_cache(client, "Cats sleep a lot. " * 23_800)
+    cache_tokens = cache.usage_metadata.total_token_count
+    questions = [f"What is cat fact number {i}?" for i in range(num_questions)]
+    print(f"{num_questions} questions against a cache of {cache_tokens} tokens")
+
+    for max_in_flight in (1, 8, 32, 64):
+        started = time.perf_counter()
+        _, totals = asyncio.run(
+            ask_all(mock_client(port), cache.name, questions, max_in_flight)
+        )
+        report(f"{max_in_flight} in flight", totals, time.perf_counter() - started, cache_tokens)
+
+    client.caches.delete(name=cache.name)
+    server.terminate()
+
+
+# Run against the real API, or pass --benchmark to try the runner offline.
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark()
+    else:
+        asyncio.run(main())
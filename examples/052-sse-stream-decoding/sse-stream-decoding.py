@@ -0,0 +1,200 @@
+# Incremental SSE decoding
+# This example shows how to read a streamed generation straight from the HTTP API without the SDK. The
+# server-sent events (SSE) stream is decoded incrementally from the received bytes: multi-line events are joined,
+# keep-alive comments are skipped, and CRLF, LF and lone-CR line endings split across network reads are handled.
+# Each byte is scanned once, however the stream is chunked. Requests go through a pooled httpx client.
+
+# Import the necessary libraries
+import importlib.util
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+API_URL = "https://generativelanguage.googleapis.com"
+
+# SSE lines can end with CRLF, LF or a lone CR.
+LINE_END = re.compile(rb"\r\n|\r|\n")
+
+
+# An incremental decoder for a text/event-stream body. Received bytes are
+# appended to one buffer and scanned in place through a memoryview; only the
+# value of each `data:` line is copied out. `scanned` marks how far the buffer
+# is known to hold no line ending, so a long line that arrives in many small
+# reads is not searched again from its start on every read.
+class SSEDecoder:
+    def __init__(self):
+        self.buffer = bytearray()
+        self.scanned = 0
+        self.data = []
+
+    def feed(self, chunk):
+        """Add bytes from the stream and return the data of each complete event."""
+        self.buffer += chunk
+        events = []
+        view = memoryview(self.buffer)
+        start = 0
+        for match in LINE_END.finditer(self.buffer, self.scanned):
+            end = match.end()
+            if end == len(self.buffer) and match.group() == b"\r":
+                break  # Might be the first half of a CRLF: wait for more data
+            line = view[start : match.start()]
+            start = end
+            if not line:
+                if self.data:
+                    events.append(b"\n".join(self.data))
+                    self.data = []
+            elif line[:5] == b"data:":
+                self.data.append(bytes(line[6:] if line[5:6] == b" " else line[5:]))
+            # Comments (":") and the event, id and retry fields aren't needed here
+            line.release()
+        view.release()
+        del self.buffer[:start]
+        # Everything left is part of an unfinished line, except a held-back CR
+        self.scanned = len(self.buffer) - self.buffer.endswith(b"\r")
+        return events
+
+    def close(self):
+        """Finish the stream: a CR held back as a possible CRLF is a line end."""
+        return self.feed(b"\n") if self.buffer.endswith(b"\r") else []
+
+
+# Make a pooled client that reuses connections across requests. HTTP/2 is used
+# when the optional `h2` package is installed (`pip install httpx[http2]`), so
+# concurrent streams share a single connection.
+def make_client():
+    return httpx.Client(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_keepalive_connections=20),
+        timeout=httpx.Timeout(60.0, connect=5.0),
+    )
+
+
+# Pull the text out of decoded events. Errors are raised rather than skipped:
+# an error event means the answer is incomplete.
+def event_texts(events):
+    for data in events:
+        event = json.loads(data)
+        if "error" in event:
+            raise RuntimeError(event["error"].get("message", event["error"]))
+        for candidate in event.get("candidates", []):
+            for part in candidate.get("content", {}).get("parts", []):
+                yield part.get("text", "")
+
+
+# Stream a generation and yield its text as it arrives. The API key goes in a
+# header rather than the URL, so it doesn't end up in access logs.
+def stream_text(client, model, prompt, api_key, base_url=API_URL):
+    url = f"{base_url}/v1beta/models/{model}:streamGenerateContent"
+    payload = {"contents": [{"parts": [{"text": prompt}]}]}
+    decoder = SSEDecoder()
+    with client.stream(
+        "POST", url, params={"alt": "sse"}, headers={"x-goog-api-key": api_key}, json=payload
+    ) as response:
+        response.raise_for_status()
+        for chunk in response.iter_bytes():
+            yield from event_texts(decoder.feed(chunk))
+        yield from event_texts(decoder.close())
+
+
+def main():
+    model = "gemini-2.0-flash"
+    api_key = os.environ.get("GEMINI_API_KEY", "YOUR_API_KEY")
+    with make_client() as client:
+        for text in stream_text(client, model, "Explain how AI works", api_key):
+            print(text, end="", flush=True)
+    print()
+
+
+# The decoder handles the parts of the SSE format that splitting on lines and
+# slicing off "data: " gets wrong. Here a tricky stream is fed one byte at a
+# time: keep-alive comments, CRLF line endings split across reads, a lone CR
+# and an event whose JSON spans two data lines. Then one 1 MB event is fed in
+# 64-byte reads, which takes quadratic time if every read rescans the buffer.
+TRICKY_STREAM = (
+    b": keep-alive\r\n\r\n"
+    b'data: {"candidates": [{"content": {"parts": [{"text": "one "}]}}]}\r\n\r\n'
+    b'data: {"candidates": [{"content":\r\n'
+    b'data:  {"parts": [{"text": "two "}]}}]}\r\n\r\n'
+    b": keep-alive\n\n"
+    b'data:{"candidates": [{"content": {"parts": [{"text": "three"}]}}]}\r\r'
+)
+
+
+def check_decoder():
+    decoder = SSEDecoder()
+    events = [e for i in range(len(TRICKY_STREAM)) for e in decoder.feed(TRICKY_STREAM[i : i + 1])]
+    events += decoder.close()
+    print(f"byte-by-byte: {len(events)} events decoded: {''.join(event_texts(events))!r}")
+
+    text = "Cats nap a lot. " * 65536
+    event = b"data: " + json.dumps({"candidates": [{"content": {"parts": [{"text": text}]}}]}).encode()
+    event += b"\n\n"
+    decoder = SSEDecoder()
+    started = time.perf_counter()
+    events = [e for i in range(0, len(event), 64) for e in decoder.feed(event[i : i + 64])]
+    elapsed = time.perf_counter() - started
+    assert "".join(event_texts(events)) == text
+    print(f"one {len(event) // 1024} KB event in 64-byte reads: {elapsed * 1000:.0f} ms")
+
+
+# For the benchmark, a local server stands in for the streaming endpoint and
+# sends a long answer as fast as it can, in `MOCK_EVENTS` events.
+MOCK_EVENTS = 2000
+MOCK_CHUNK = {
+    "candidates": [{"content": {"role": "model", "parts": [{"text": "Cats nap a lot. " * 4}]}}],
+    "usageMetadata": {"promptTokenCount": 5, "candidatesTokenCount": 16},
+}
+MOCK_EVENT = f"data: {json.dumps(MOCK_CHUNK)}\r\n\r\n".encode()
+
+
+def mock_api(handler):
+    handler.start_events()
+    body = MOCK_EVENT * MOCK_EVENTS
+    for i in range(0, len(body), 16384):
+        handler.wfile.write(body[i : i + 16384])
+
+
+# Stream the same answer through the SDK's generate_content_stream and through
+# the raw HTTP path, several times each, and compare the time to read it all.
+def benchmark(runs=10, model="gemini-2.0-flash"):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools" / "mock_gemini"))
+    from mock_gemini import mock_base_url, mock_client, start_mock_server
+
+    check_decoder()
+    server, port = start_mock_server(mock_api, streaming=True)
+    sdk = mock_client(port)
+    print(f"{runs} streams of {MOCK_EVENTS} events ({len(MOCK_EVENT) * MOCK_EVENTS // 1024} KB each)")
+
+    def sdk_stream():
+        return [c.text for c in sdk.models.generate_content_stream(model=model, contents="Hi")]
+
+    with make_client() as client:
+
+        def raw_stream():
+            return list(stream_text(client, model, "Hi", "mock", mock_base_url(port)))
+
+        for label, stream in (("SDK", sdk_stream), ("raw HTTP + decoder", raw_stream)):
+            stream()  # Warm up
+            started = time.perf_counter()
+            for _ in range(runs):
+                assert len(stream()) == MOCK_EVENTS
+            per_stream = (time.perf_counter() - started) / runs
+            print(
+                f"{label:<19} {per_stream * 1000:6.1f} ms per stream  "
+                f"{MOCK_EVENTS / per_stream:8.0f} events/s"
+            )
+
+    server.terminate()
+
+
+# Stream from the real API, or pass --benchmark to compare with the SDK offline.
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark()
+    else:
+        main()
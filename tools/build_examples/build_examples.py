@@ -15,10 +15,6 @@ import logging
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple, Set
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
@@ -151,6 +147,19 @@ def extract_shell_segments(file_path: Path) -> List[Dict[str, Any]]:
     with open(file_path, "r") as f:
         content = f.read()
 
+    return parse_shell_segments(content)
+
+
+def parse_shell_segments(content: str) -> List[Dict[str, Any]]:
+    """
+    Extract command and output segments from shell file content.
+
+    Args:
+        content: Text of the shell file
+
+    Returns:
+        List of dictionaries containing shell segment data
+    """
     segments = []
 
     # Extract commands and their outputs
@@ -392,6 +401,11 @@ def main():
     """Main entry point for the build script."""
     args = parse_args()
 
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
     # Set verbose logging if requested
     if args.verbose:
         logger.setLevel(logging.DEBUG)
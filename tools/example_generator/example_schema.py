@@ -0,0 +1,35 @@
+"""
+Pydantic models used by the example generator.
+
+These live in their own module so that generate_mkdocs_example.py only pays
+for importing pydantic on the code paths that validate or generate examples.
+"""
+
+from pydantic import BaseModel, Field
+
+EXAMPLE_NAME_PATTERN = r"^[a-z0-9-]+$"
+
+
+class GeminiExample(BaseModel):
+    """Represents a code example for the Gemini by Example site."""
+
+    python_code: str = Field(description="The Python code to be displayed and executed")
+    shell_code: str = Field(
+        description="Shell commands to run the Python code and sample outputs"
+    )
+    requests_code: str | None = Field(
+        description="Python code using requests to replicate curl examples",
+        default=None,
+    )
+    requires_image: bool = Field(
+        description="Whether this example needs an image to be displayed",
+    )
+
+
+class ExampleSpec(BaseModel):
+    """One example to generate, as listed in a batch manifest."""
+
+    name: str = Field(pattern=EXAMPLE_NAME_PATTERN)
+    focus: str = Field(min_length=1)
+    theme: str = ""
+    urls: list[str] = Field(default_factory=list)
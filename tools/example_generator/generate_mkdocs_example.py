@@ -4,56 +4,272 @@ Generate new examples for the Gemini by Example MkDocs site.
 
 This script creates new example files and corresponding MkDocs documentation.
 It uses the Gemini API to generate code examples based on documentation URLs.
+
+Heavy dependencies (google-genai, pydantic, requests, BeautifulSoup, PyYAML and
+the interactive parts of rich) are imported inside the functions that use
+them, so `--help` and other cheap code paths start quickly.
 """
 
+from __future__ import annotations
+
+import argparse
+import functools
+import hashlib
+import json
 import os
 import re
+import shutil
+import sys
+import threading
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import requests
-import yaml
-from bs4 import BeautifulSoup
-from dotenv import load_dotenv
-from google import genai
-from pydantic import BaseModel, Field
 from rich import print as rprint
-from rich.prompt import Prompt
 
-# Ensure we're running from the project root
+if TYPE_CHECKING:
+    from example_schema import ExampleSpec, GeminiExample
+    from google import genai
+    from pydantic import BaseModel
+
 PROJECT_ROOT = Path(__file__).parent.parent.parent.absolute()
-os.chdir(PROJECT_ROOT)
 
-# Load environment variables from .env file
-load_dotenv()
+GEMINI_MODEL = "gemini-2.5-pro-preview-03-25"
+GENERATION_MODEL = "gemini-2.0-flash"
+
+DEFAULT_CACHE_DIR = PROJECT_ROOT / ".cache" / "example_generator"
+CACHE_MODES = ("record", "replay", "bypass")
+DEFAULT_DOCS_URL = "https://ai.google.dev/tutorials/python_quickstart"
+TITLE_PATTERN = r"^# \S"
+
+
+class JsonFieldStream:
+    """Incrementally scan a streamed JSON object for completed top-level fields.
+
+    Text is fed in as it arrives; `feed` returns the (key, value) pairs whose
+    values finished in that piece of text. String values are reported as soon
+    as their closing quote arrives, without waiting for the rest of the object.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.fields = {}
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._state = "start"
+        self._key = None
+        self._start = 0
+
+    def feed(self, text: str) -> list[tuple[str, object]]:
+        """Consume more response text and return any newly completed fields."""
+        self.text += text
+        completed = []
+        while self._pos < len(self.text):
+            i = self._pos
+            ch = self.text[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._state == "key":
+                        self._key = json.loads(self.text[self._start : i + 1])
+                        self._state = "colon"
+                    elif self._depth == 1 and self._state == "string":
+                        completed.append(self._complete(i + 1))
+                continue
+
+            if ch.isspace():
+                continue
+
+            if self._depth == 0:
+                if ch != "{" or self._state != "start":
+                    raise ValueError(f"Expected a JSON object, got {ch!r}")
+                self._depth = 1
+                self._state = "key"
+            elif ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._state in ("key", "value"):
+                    self._start = i
+                    if self._state == "value":
+                        self._state = "string"
+            elif ch in "{[":
+                if self._depth == 1 and self._state == "value":
+                    self._start = i
+                    self._state = "nested"
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._state == "nested":
+                    completed.append(self._complete(i + 1))
+                elif self._depth == 0:
+                    if self._state == "scalar":
+                        completed.append(self._complete(i))
+                    self._state = "done"
+            elif self._depth == 1:
+                if ch == ":" and self._state == "colon":
+                    self._state = "value"
+                elif ch == ",":
+                    if self._state == "scalar":
+                        completed.append(self._complete(i))
+                    self._state = "key"
+                elif self._state == "value":
+                    self._start = i
+                    self._state = "scalar"
+        return completed
+
+    def _complete(self, end: int) -> tuple[str, object]:
+        value = json.loads(self.text[self._start : end])
+        self.fields[self._key] = value
+        self._state = "comma"
+        return self._key, value
+
+
+class ResponseCache:
+    """Persistent record/replay store for model responses and fetched pages.
+
+    Responses are keyed by a hash of the model, prompt and response schema.
+    Documentation pages are stored too, so a replayed run builds exactly the
+    same prompt without network access.
+
+    - record: reuse stored entries, and store anything that had to be fetched
+    - replay: only use stored responses; a missing response is an error
+    - bypass: ignore the cache entirely
+    """
+
+    def __init__(self, directory: Path, mode: str = "record"):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode '{mode}'")
+        self.directory = directory
+        self.mode = mode
+
+    @staticmethod
+    def key(model: str, prompt: str, schema: type[BaseModel]) -> str:
+        """Return a canonical hash of a generation request."""
+        request = {
+            "model": model,
+            "prompt": prompt,
+            "schema": schema.model_json_schema(),
+        }
+        canonical = json.dumps(request, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def lookup(self, model: str, prompt: str, schema: type[BaseModel]) -> str | None:
+        """Return the stored response text for a request, if there is one."""
+        if self.mode == "bypass":
+            return None
+        path = self._path("responses", self.key(model, prompt, schema))
+        if path.exists():
+            return json.loads(path.read_text())["response"]
+        if self.mode == "replay":
+            raise LookupError(f"No cached response for this request in {self.directory}")
+        return None
+
+    def store(self, model: str, prompt: str, schema: type[BaseModel], response: str):
+        """Record a response (only in record mode)."""
+        if self.mode == "record":
+            path = self._path("responses", self.key(model, prompt, schema))
+            self._write(path, {"model": model, "response": response})
+
+    def fetch_page(self, url: str) -> str:
+        """Fetch a documentation page, reusing and recording stored copies."""
+        path = self._path("pages", hashlib.sha256(url.encode()).hexdigest())
+        if self.mode != "bypass" and path.exists():
+            return json.loads(path.read_text())["content"]
+        content = fetch_url_content(url)
+        if content and self.mode == "record":
+            self._write(path, {"url": url, "content": content})
+        return content
 
-# Get API key from environment variables
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    rprint("[bold red]Error: GEMINI_API_KEY not found in environment variables.[/bold red]")
-    rprint("[bold yellow]Please create a .env file with your API key or copy from example.env.[/bold yellow]")
-    exit(1)
+    def _path(self, kind: str, key: str) -> Path:
+        return self.directory / kind / f"{key}.json"
 
-GEMINI_MODEL = "gemini-2.5-pro-preview-03-25"
+    def _write(self, path: Path, entry: dict):
+        # Write to a private temp file and rename, so parallel workers never
+        # see a partially written entry
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(entry))
+        os.replace(tmp_path, path)
 
 
-class GeminiExample(BaseModel):
-    """Represents a code example for the Gemini by Example site."""
+class RateLimiter:
+    """Space out request start times so at most `rpm` begin in any minute."""
 
-    python_code: str = Field(description="The Python code to be displayed and executed")
-    shell_code: str = Field(
-        description="Shell commands to run the Python code and sample outputs"
-    )
-    requests_code: str | None = Field(
-        description="Python code using requests to replicate curl examples",
-        default=None,
-    )
-    requires_image: bool = Field(
-        description="Whether this example needs an image to be displayed",
-    )
+    def __init__(self, rpm: float):
+        self.interval = 60.0 / rpm if rpm > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self) -> None:
+        """Block until the caller's slot comes up."""
+        with self._lock:
+            slot = max(time.monotonic(), self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ExampleNumberAllocator:
+    """Hand out example numbers to parallel workers without collisions.
+
+    The example directory is created while the lock is held, so the number is
+    reserved on disk before any other worker (or process) rescans `examples/`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next = get_next_example_number()
+
+    def reserve(self, example_name: str) -> str:
+        """Reserve the next number for `example_name` and return its folder name."""
+        with self._lock:
+            number = max(self._next, get_next_example_number())
+            folder_name = f"{number:03d}-{example_name}"
+            (Path("examples") / folder_name).mkdir(parents=True)
+            self._next = number + 1
+        return folder_name
+
+
+def load_environment() -> None:
+    """Run from the project root and load variables from the .env file."""
+    from dotenv import load_dotenv
+
+    # Ensure we're running from the project root
+    os.chdir(PROJECT_ROOT)
+
+    # Load environment variables from .env file
+    load_dotenv()
+
+
+def require_api_key() -> None:
+    """Exit with a helpful message if GEMINI_API_KEY is not set."""
+    if not os.getenv("GEMINI_API_KEY"):
+        rprint("[bold red]Error: GEMINI_API_KEY not found in environment variables.[/bold red]")
+        rprint("[bold yellow]Please create a .env file with your API key or copy from example.env.[/bold yellow]")
+        exit(1)
+
+
+@functools.cache
+def get_client() -> genai.Client:
+    """Return a Gemini client shared by every request in this process."""
+    from google import genai
+
+    return genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 
 
 def fetch_url_content(url: str) -> str:
     """Fetch and parse content from a URL."""
+    import requests
+    from bs4 import BeautifulSoup
+
     try:
         response = requests.get(url)
         response.raise_for_status()
@@ -109,11 +325,117 @@ def get_contributing_guidelines():
     return python_format, shell_format, formatting_rules, shell_format_rules
 
 
-def generate_example(prompt: str) -> GeminiExample:
-    client = genai.Client(api_key=GEMINI_API_KEY)
+def fetch_docs_content(urls: list[str], fetch=fetch_url_content) -> str:
+    """Fetch every documentation URL and join the pages into one prompt block."""
+    docs_content = ""
+    for url in urls:
+        content = fetch(url)
+        if content:
+            docs_content += f"\n\n--- Content from {url} ---\n\n{content}"
+    return docs_content
+
+
+def build_prompt(focus: str, theme: str, docs_content: str) -> str:
+    """Build the generation prompt for one example."""
+    # Get example files and contributing guidelines
+    python_example, shell_example, requests_example = get_example_files_content()
+    python_format, shell_format, formatting_rules, shell_format_rules = (
+        get_contributing_guidelines()
+    )
+
+    theme_section = ""
+    theme_instruction = ""
+    if theme:
+        theme_section = (
+            "## Topical Theme\n"
+            f"This example should incorporate the thematic elements of: {theme}"
+        )
+        theme_instruction = (
+            f"Try to incorporate elements of the theme: {theme} in your example "
+            "where it makes sense, such as in prompts, variables, or example text."
+        )
+
+    return f"""
+You are an expert devrel with years of experience in creating code examples that help developers learn new technologies.
+
+Your task today is to take some documentation from the Google Gemini SDK docs and turn it into a simple illustrative example using code.
+
+## Focus Area
+This example should specifically focus on: {focus}
+
+{theme_section}
+
+## Documentation Content
+{docs_content}
+
+## Formatting / Output rules
+You will output the following:
+
+- Python code formatted according to the guidelines below
+- Shell code/output formatted according to the guidelines below
+- Python requests code that replicates any curl examples found in the documentation, using the requests library (only if curl examples are present in the documentation). Note: This is stored in a separate file and is not used in the site build.
+- A boolean as to whether you think it needs an image to illustrate the output (i.e., if image generation or editing is involved)
+
+### Python File Format:
+{python_format}
+
+Python Formatting Rules:
+{formatting_rules}
+
+### Shell Script Format:
+{shell_format}
+
+Shell Script Formatting Rules:
+{shell_format_rules}
+
+## Examples
+Here's an example of the Python code format:
+
+```python
+{python_example}
+```
+
+Here's an example of the shell code format:
+
+```sh
+{shell_example}
+```
+
+Here's an example of the requests code format:
+
+```python
+{requests_example}
+```
+
+Based on the documentation provided, please generate a concise, illustrative
+example that demonstrates the key concepts clearly, focusing specifically on
+{focus}. If the documentation contains multiple examples or topics, prioritize
+content related to {focus} and ignore unrelated sections. The title line (i.e.
+the first line of the Python file) should be very concise and focus on the core
+thing we're focusing on (e.g. "Streaming text", "Image generation", "Editing images", "Object detection").
+{theme_instruction}
+
+For the requests_code, ONLY include this if you find actual curl examples in the documentation. If curl examples exist, translate them to Python code using the requests library. Do NOT create requests code if there are no curl examples in the documentation.
+"""
+
+
+def generate_example(
+    prompt: str,
+    client: genai.Client | None = None,
+    cache: ResponseCache | None = None,
+) -> GeminiExample:
+    from example_schema import GeminiExample
+
+    if cache:
+        cached = cache.lookup(GENERATION_MODEL, prompt, GeminiExample)
+        if cached is not None:
+            return GeminiExample.model_validate_json(cached)
+
+    if client is None:
+        client = get_client()
 
     response = client.models.generate_content(
-        model="gemini-2.0-flash",
+        model=GENERATION_MODEL,
         contents=prompt,
         config={
             "response_mime_type": "application/json",
@@ -126,9 +448,196 @@ def generate_example(prompt: str) -> GeminiExample:
     if not isinstance(result, GeminiExample):
         raise ValueError("Failed to generate example with the expected schema")
 
+    if cache and response.text:
+        cache.store(GENERATION_MODEL, prompt, GeminiExample, response.text)
+
+    return result
+
+
+def check_streamed_field(key: str, value: object) -> None:
+    """Raise ValueError if a streamed field shows the output is going wrong."""
+    from example_schema import GeminiExample
+
+    if key not in GeminiExample.model_fields:
+        raise ValueError(f"Unexpected field '{key}' in response")
+    if key == "python_code":
+        if not isinstance(value, str) or not re.match(TITLE_PATTERN, value):
+            raise ValueError("python_code does not start with a '# Title' comment line")
+    if key == "shell_code":
+        if not isinstance(value, str) or not re.search(r"^\$ ", value, re.MULTILINE):
+            raise ValueError("shell_code does not contain any '$ ' command lines")
+
+
+def generate_example_stream(
+    prompt: str,
+    client: genai.Client | None = None,
+    on_field=None,
+    show_progress: bool = True,
+    cache: ResponseCache | None = None,
+) -> GeminiExample:
+    """Generate an example with generate_content_stream.
+
+    Each top-level field is checked with check_streamed_field as soon as it is
+    complete, and the stream is abandoned on the first bad field. `on_field`
+    is then called with the field name and value, so callers can start
+    writing files before the whole response has arrived. A cached response is
+    replayed through the same checks and callbacks.
+    """
+    from example_schema import GeminiExample
+
+    cached = cache.lookup(GENERATION_MODEL, prompt, GeminiExample) if cache else None
+    if cached is not None:
+        texts = [cached]
+    else:
+        if client is None:
+            client = get_client()
+        stream = client.models.generate_content_stream(
+            model=GENERATION_MODEL,
+            contents=prompt,
+            config={
+                "response_mime_type": "application/json",
+                "response_schema": GeminiExample,
+            },
+        )
+        texts = (chunk.text or "" for chunk in stream)
+
+    fields = JsonFieldStream()
+
+    def consume(status=None):
+        for text in texts:
+            for key, value in fields.feed(text):
+                check_streamed_field(key, value)
+                if show_progress:
+                    rprint(f"[green]Received {key}[/green]")
+                if on_field:
+                    on_field(key, value)
+            if status:
+                status.update(
+                    f"[blue]Generating example... {len(fields.text)} characters, "
+                    f"{len(fields.fields)} fields complete[/blue]"
+                )
+
+    if show_progress and cached is None:
+        from rich.console import Console
+
+        with Console().status("[blue]Waiting for Gemini...[/blue]") as status:
+            consume(status)
+    else:
+        consume()
+
+    result = GeminiExample.model_validate_json(fields.text)
+    if cache and cached is None:
+        cache.store(GENERATION_MODEL, prompt, GeminiExample, fields.text)
     return result
 
 
+def validate_example(result: GeminiExample) -> list[str]:
+    """Check a generated example locally and return a list of problems.
+
+    The Python code must compile and start with a `# Title` line, and every
+    `$ ` command in the shell code must be picked up by the build script's
+    shell-segment parser.
+    """
+    # Reuse the build script's parser so candidates are checked the same way
+    # the site build will read them
+    build_dir = str(PROJECT_ROOT / "tools" / "build_examples")
+    if build_dir not in sys.path:
+        sys.path.append(build_dir)
+    from build_examples import parse_shell_segments
+
+    problems = []
+
+    try:
+        compile(result.python_code, "<python_code>", "exec")
+    except SyntaxError as e:
+        problems.append(f"python_code does not compile: {e.msg} (line {e.lineno})")
+
+    if not re.match(TITLE_PATTERN, result.python_code):
+        problems.append("python_code does not start with a '# Title' comment line")
+
+    if result.requests_code:
+        try:
+            compile(result.requests_code, "<requests_code>", "exec")
+        except SyntaxError as e:
+            problems.append(f"requests_code does not compile: {e.msg} (line {e.lineno})")
+
+    commands = [line for line in result.shell_code.splitlines() if line.startswith("$ ")]
+    segments = parse_shell_segments(result.shell_code)
+    if not commands:
+        problems.append("shell_code does not contain any '$ ' command lines")
+    elif len(segments) != len(commands):
+        problems.append(
+            f"shell_code parses into {len(segments)} segments for {len(commands)} commands"
+        )
+
+    return problems
+
+
+def generate_candidates(
+    prompt: str,
+    count: int,
+    cache: ResponseCache | None = None,
+    limiter: RateLimiter | None = None,
+    show_progress: bool = True,
+) -> GeminiExample:
+    """Request `count` candidates concurrently and return the first valid one.
+
+    Candidates are checked with validate_example as they arrive. The first one
+    that passes is returned straight away; requests still in flight are left
+    to finish in the background and their results are discarded.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    from example_schema import GeminiExample
+
+    if cache:
+        cached = cache.lookup(GENERATION_MODEL, prompt, GeminiExample)
+        if cached is not None:
+            result = GeminiExample.model_validate_json(cached)
+            problems = validate_example(result)
+            if not problems:
+                return result
+            if cache.mode == "replay":
+                raise ValueError(f"Cached response is invalid: {'; '.join(problems)}")
+
+    def generate_candidate():
+        if limiter:
+            limiter.wait()
+        return generate_example(prompt)
+
+    errors = []
+    executor = ThreadPoolExecutor(max_workers=count)
+    try:
+        futures = [executor.submit(generate_candidate) for _ in range(count)]
+        for number, future in enumerate(as_completed(futures), 1):
+            try:
+                result = future.result()
+                problems = validate_example(result)
+            except Exception as e:
+                problems = [str(e)]
+
+            if problems:
+                errors.append(f"candidate {number}: {'; '.join(problems)}")
+                if show_progress:
+                    rprint(
+                        f"[yellow]Rejected candidate {number} of {count}: "
+                        f"{'; '.join(problems)}[/yellow]"
+                    )
+                continue
+
+            if show_progress:
+                rprint(f"[green]Accepted candidate {number} of {count}[/green]")
+            if cache:
+                cache.store(
+                    GENERATION_MODEL, prompt, GeminiExample, result.model_dump_json()
+                )
+            return result
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    raise ValueError(f"No valid candidate out of {count}: {' | '.join(errors)}")
+
+
 def get_next_example_number() -> int:
     """Determine the next available example number based on existing examples."""
     examples_dir = Path("examples")
@@ -258,46 +767,332 @@ def create_markdown_file(title: str, description: str, python_code: str,
 
 def update_mkdocs_yml(example_name: str, title: str, section: str) -> bool:
     """Update the mkdocs.yml file to include the new example."""
+    return add_examples_to_mkdocs_yml([(example_name, title, section)])
+
+
+def add_examples_to_mkdocs_yml(examples: list[tuple[str, str, str]]) -> bool:
+    """Add (example_name, title, section) entries to mkdocs.yml in a single write.
+
+    Examples are inserted after each section's "Overview" entry, keeping the
+    order in which they are given.
+    """
+    import yaml
+
     try:
         # Read the current mkdocs.yml file
         with open("mkdocs.yml", "r") as f:
             config = yaml.safe_load(f)
 
-        # Find the section in the navigation
+        sections = {}
         for nav_item in config.get("nav", []):
-            if isinstance(nav_item, dict) and section in nav_item:
-                # Found the section, add the example to it
-                section_items = nav_item[section]
-
+            if isinstance(nav_item, dict):
+                for name, items in nav_item.items():
+                    if isinstance(items, list):
+                        sections[name] = items
+
+        # Next insert position per section, so a batch keeps its order
+        insert_positions = {}
+        added = 0
+        for example_name, title, section in examples:
+            section_items = sections.get(section)
+            if section_items is None:
+                msg = f"[bold yellow]Warning: Section '{section}' not found in mkdocs.yml."
+                rprint(f"{msg} Navigation not updated for {example_name}.[/bold yellow]")
+                continue
+
+            if section not in insert_positions:
                 # Find the position to insert (after "Overview")
-                insert_pos = 1  # Default to position after "Overview"
+                insert_positions[section] = 1  # Default to position after "Overview"
                 for i, item in enumerate(section_items):
                     if isinstance(item, dict) and "Overview" in item:
-                        insert_pos = i + 1
+                        insert_positions[section] = i + 1
                         break
 
-                # Insert the new example
-                section_dir = section.lower().replace(" & ", "-").replace(" ", "-")
-                nav_path = f"{section_dir}/{example_name}.md"
-                section_items.insert(insert_pos, {title: nav_path})
+            # Insert the new example
+            section_dir = section.lower().replace(" & ", "-").replace(" ", "-")
+            nav_path = f"{section_dir}/{example_name}.md"
+            section_items.insert(insert_positions[section], {title: nav_path})
+            insert_positions[section] += 1
+            added += 1
 
-                # Write the updated config back to the file
-                with open("mkdocs.yml", "w") as f:
-                    yaml.dump(config, f, default_flow_style=False, sort_keys=False)
+        if not added:
+            return False
 
-                return True
+        # Write the updated config back to the file
+        with open("mkdocs.yml", "w") as f:
+            yaml.dump(config, f, default_flow_style=False, sort_keys=False)
 
-        # If we get here, the section wasn't found
-        msg = f"[bold yellow]Warning: Section '{section}' not found in mkdocs.yml."
-        rprint(f"{msg} Navigation not updated.[/bold yellow]")
-        return False
+        return True
 
     except Exception as e:
         rprint(f"[bold red]Error updating mkdocs.yml: {e}[/bold red]")
         return False
 
 
+def save_example(
+    folder_name: str, result: GeminiExample, urls: list[str], focus: str
+) -> tuple[Path, str, str, str]:
+    """Write the generated example and its Markdown page.
+
+    Returns (example_dir, example_name, title, section) so the caller can
+    update the mkdocs.yml navigation.
+    """
+    # Create the directory structure
+    example_dir = Path("examples") / folder_name
+    example_dir.mkdir(parents=True, exist_ok=True)
+
+    # Extract the example name from the folder (e.g., "basic-generation" from "001-basic-generation")
+    example_name = folder_name.split("-", 1)[1]
+
+    # Save Python file
+    python_file = example_dir / f"{example_name}.py"
+    python_file.write_text(result.python_code)
+
+    # Save Shell file
+    shell_file = example_dir / f"{example_name}.sh"
+    shell_file.write_text(result.shell_code)
+
+    # Save Requests file if curl examples were found
+    if result.requests_code:
+        requests_file = example_dir / f"{example_name}_requests.py"
+        requests_file.write_text(result.requests_code)
+
+    # Save documentation URLs to a text file
+    if urls:
+        docs_file = example_dir / f"{example_name}_links.txt"
+        docs_file.write_text("\n".join(urls))
+        rprint(f"[blue]Saved documentation links to {docs_file}[/blue]")
+
+    # Extract title and description from the Python code
+    title_match = re.match(r"^# (.+?)$", result.python_code.split("\n")[0])
+    title = title_match.group(1) if title_match else example_name.replace("-", " ").title()
+
+    # Extract description (second comment line if it exists)
+    description_match = re.match(r"^# .+?\n# (.+?)$", result.python_code, re.DOTALL)
+    description = description_match.group(1).strip() if description_match else ""
+
+    # Determine which section this example belongs to
+    section = determine_section(focus)
+
+    # Create the Markdown file for MkDocs
+    markdown_file = create_markdown_file(
+        title, description, result.python_code, result.shell_code, example_name, section
+    )
+    rprint(f"[blue]Created Markdown file: {markdown_file}[/blue]")
+
+    return example_dir, example_name, title, section
+
+
+def report_image_requirement(example_dir: Path, example_name: str, section: str):
+    """Tell the user where to put the image an example needs."""
+    rprint(
+        f"\n[bold red]NOTE: This example requires an image named '{example_name}.png' in the example directory.[/bold red]"
+    )
+
+    # Create images directory if needed
+    images_dir = Path("docs") / section / "images"
+    images_dir.mkdir(parents=True, exist_ok=True)
+
+    rprint(
+        f"[bold yellow]Remember to add the image to both {example_dir} and {images_dir}[/bold yellow]"
+    )
+
+
+def load_manifest(manifest_path: Path) -> list[ExampleSpec]:
+    """Load example specs from a YAML or JSONL manifest.
+
+    YAML manifests hold either a list of entries or a mapping with an
+    `examples` list. JSONL manifests hold one entry per line. Each entry has a
+    `name`, a `focus`, and optionally a `theme` and a list of `urls`.
+    """
+    import yaml
+    from example_schema import ExampleSpec
+
+    text = manifest_path.read_text()
+    if manifest_path.suffix == ".jsonl":
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        data = yaml.safe_load(text) or []
+        entries = data.get("examples", []) if isinstance(data, dict) else data
+
+    specs = [ExampleSpec.model_validate(entry) for entry in entries]
+
+    names = [spec.name for spec in specs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate example names in manifest: {', '.join(duplicates)}")
+
+    return specs
+
+
+def run_batch(
+    specs: list[ExampleSpec],
+    workers: int,
+    rpm: float,
+    stream: bool = False,
+    cache: ResponseCache | None = None,
+    candidates: int = 1,
+) -> int:
+    """Generate every example in a manifest concurrently.
+
+    Generation runs on a bounded thread pool and model calls are spaced by a
+    client-side rate limiter. Example numbers are handed out as generations
+    finish, and mkdocs.yml is written once after all workers are done.
+
+    With `stream`, each generation is streamed so malformed output is
+    abandoned early instead of waiting for the full response. With more than
+    one candidate, each example uses the first candidate that passes
+    validate_example.
+
+    Returns the number of examples that failed.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    from example_schema import GeminiExample
+
+    rprint(
+        f"[bold blue]Generating {len(specs)} examples with {workers} workers "
+        f"({rpm:g} requests/minute)...[/bold blue]"
+    )
+
+    limiter = RateLimiter(rpm)
+    allocator = ExampleNumberAllocator()
+    # Manifests often share documentation URLs, so fetch each one only once
+    fetch = functools.cache(cache.fetch_page if cache else fetch_url_content)
+
+    def generate_one(spec: ExampleSpec):
+        urls = spec.urls or [DEFAULT_DOCS_URL]
+        docs_content = fetch_docs_content(urls, fetch)
+        prompt = build_prompt(spec.focus, spec.theme, docs_content)
+        if candidates > 1:
+            result = generate_candidates(
+                prompt, candidates, cache, limiter, show_progress=False
+            )
+            folder_name = allocator.reserve(spec.name)
+            return result, save_example(folder_name, result, urls, spec.focus)
+
+        # Cached responses don't use any quota, so only rate limit real calls
+        if not (cache and cache.lookup(GENERATION_MODEL, prompt, GeminiExample)):
+            limiter.wait()
+        if stream:
+            result = generate_example_stream(prompt, show_progress=False, cache=cache)
+        else:
+            result = generate_example(prompt, cache=cache)
+        folder_name = allocator.reserve(spec.name)
+        return result, save_example(folder_name, result, urls, spec.focus)
+
+    created = []
+    failures = 0
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(generate_one, spec): spec for spec in specs}
+        for future in as_completed(futures):
+            spec = futures[future]
+            try:
+                result, (example_dir, example_name, title, section) = future.result()
+            except Exception as e:
+                failures += 1
+                rprint(f"[bold red]Error generating example '{spec.name}': {e}[/bold red]")
+                continue
+
+            rprint(f"[green]Created {example_dir}[/green]")
+            if result.requires_image:
+                report_image_requirement(example_dir, example_name, section)
+            created.append((example_dir.name, example_name, title, section))
+
+    # Add navigation entries in example-number order with a single write
+    created.sort()
+    nav_entries = [(name, title, section) for _, name, title, section in created]
+    if nav_entries and add_examples_to_mkdocs_yml(nav_entries):
+        rprint(f"[blue]Updated mkdocs.yml with {len(nav_entries)} new examples[/blue]")
+
+    elapsed = time.monotonic() - started
+    rprint(
+        f"\n[bold green]Created {len(created)} of {len(specs)} examples "
+        f"in {elapsed:.1f}s[/bold green]"
+    )
+    if failures:
+        rprint(f"[bold red]{failures} examples failed[/bold red]")
+    return failures
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Generate new Gemini by Example examples"
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        help="YAML or JSONL manifest of examples to generate non-interactively",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Maximum number of examples generated at once in batch mode",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=float,
+        default=10,
+        help="Maximum model requests per minute in batch mode (0 for no limit)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream the model response, showing progress and stopping early on malformed output",
+    )
+    parser.add_argument(
+        "--cache",
+        choices=CACHE_MODES,
+        default="record",
+        help="Response cache mode: reuse and record responses, replay them only, or bypass the cache",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=DEFAULT_CACHE_DIR,
+        help="Directory for cached responses and documentation pages",
+    )
+    parser.add_argument(
+        "--candidates",
+        type=int,
+        default=1,
+        help="Request this many candidates concurrently and keep the first that passes local validation",
+    )
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.candidates < 1:
+        parser.error("--candidates must be at least 1")
+    if args.candidates > 1 and args.stream:
+        parser.error("--stream cannot be combined with --candidates")
+    return args
+
+
 def main():
+    args = parse_args()
+    load_environment()
+    # Replayed responses never reach the API, so offline runs don't need a key
+    if args.cache != "replay":
+        require_api_key()
+    cache = ResponseCache(args.cache_dir, args.cache)
+
+    if args.manifest:
+        try:
+            specs = load_manifest(args.manifest)
+        except Exception as e:
+            rprint(f"[bold red]Error reading manifest {args.manifest}: {e}[/bold red]")
+            exit(1)
+        failures = run_batch(
+            specs, args.workers, args.rpm, args.stream, cache, args.candidates
+        )
+        exit(1 if failures else 0)
+
+    from example_schema import EXAMPLE_NAME_PATTERN
+    from rich.prompt import Prompt
+
     rprint("[bold blue]Welcome to the Gemini Example Generator![/bold blue]")
 
     # Automatically determine the next example number
@@ -309,7 +1104,7 @@ def main():
     )
 
     # Validate example name format (should be like hello-world)
-    while not re.match(r"^[a-z0-9-]+$", example_name):
+    while not re.match(EXAMPLE_NAME_PATTERN, example_name):
         rprint(
             "[bold red]Example name should only contain lowercase letters, numbers, and hyphens[/bold red]"
         )
@@ -337,7 +1132,7 @@ def main():
     rprint(
         "[yellow]Enter documentation URLs related to this example (press Enter when done)[/yellow]"
     )
-    rprint("[blue]For testing, you can use: https://ai.google.dev/tutorials/python_quickstart[/blue]")
+    rprint(f"[blue]For testing, you can use: {DEFAULT_DOCS_URL}[/blue]")
     while True:
         url = Prompt.ask("URL", default="")
         if not url:
@@ -346,135 +1141,40 @@ def main():
 
     if not urls:
         # For testing purposes, use a default URL
-        default_url = "https://ai.google.dev/tutorials/python_quickstart"
-        rprint(f"[yellow]No URLs provided. Using default URL: {default_url}[/yellow]")
-        urls.append(default_url)
+        rprint(f"[yellow]No URLs provided. Using default URL: {DEFAULT_DOCS_URL}[/yellow]")
+        urls.append(DEFAULT_DOCS_URL)
 
     # Fetch content from URLs
     rprint("\n[blue]Fetching content from URLs...[/blue]")
-    docs_content = ""
-    for url in urls:
-        content = fetch_url_content(url)
-        if content:
-            docs_content += f"\n\n--- Content from {url} ---\n\n{content}"
-
-    # Get example files and contributing guidelines
-    python_example, shell_example, requests_example = get_example_files_content()
-    python_format, shell_format, formatting_rules, shell_format_rules = (
-        get_contributing_guidelines()
-    )
+    docs_content = fetch_docs_content(urls, cache.fetch_page)
 
     # Create the prompt
-    prompt = f"""
-You are an expert devrel with years of experience in creating code examples that help developers learn new technologies.
-
-Your task today is to take some documentation from the Google Gemini SDK docs and turn it into a simple illustrative example using code.
-
-## Focus Area
-This example should specifically focus on: {focus}
-
-{f"## Topical Theme\nThis example should incorporate the thematic elements of: {theme}" if theme else ""}
-
-## Documentation Content
-{docs_content}
-
-## Formatting / Output rules
-You will output the following:
-
-- Python code formatted according to the guidelines below
-- Shell code/output formatted according to the guidelines below
-- Python requests code that replicates any curl examples found in the documentation, using the requests library (only if curl examples are present in the documentation). Note: This is stored in a separate file and is not used in the site build.
-- A boolean as to whether you think it needs an image to illustrate the output (i.e., if image generation or editing is involved)
-
-### Python File Format:
-{python_format}
-
-Python Formatting Rules:
-{formatting_rules}
-
-### Shell Script Format:
-{shell_format}
-
-Shell Script Formatting Rules:
-{shell_format_rules}
-
-## Examples
-Here's an example of the Python code format:
-
-```python
-{python_example}
-```
-
-Here's an example of the shell code format:
-
-```sh
-{shell_example}
-```
-
-Here's an example of the requests code format:
-
-```python
-{requests_example}
-```
-
-Based on the documentation provided, please generate a concise, illustrative
-example that demonstrates the key concepts clearly, focusing specifically on
-{focus}. If the documentation contains multiple examples or topics, prioritize
-content related to {focus} and ignore unrelated sections. The title line (i.e.
-the first line of the Python file) should be very concise and focus on the core
-thing we're focusing on (e.g. "Streaming text", "Image generation", "Editing images", "Object detection").
-{f"Try to incorporate elements of the theme: {theme} in your example where it makes sense, such as in prompts, variables, or example text." if theme else ""}
-
-For the requests_code, ONLY include this if you find actual curl examples in the documentation. If curl examples exist, translate them to Python code using the requests library. Do NOT create requests code if there are no curl examples in the documentation.
-"""
+    prompt = build_prompt(focus, theme, docs_content)
 
     # Generate the example
     rprint("\n[blue]Generating example using Gemini...[/blue]")
+    example_dir = Path("examples") / folder_name
     try:
-        result = generate_example(prompt)
-
-        # Create the directory structure
-        example_dir = Path("examples") / folder_name
-        example_dir.mkdir(parents=True, exist_ok=True)
-
-        # Extract the example name from the folder (e.g., "basic-generation" from "001-basic-generation")
-        example_name = folder_name.split("-", 1)[1]
-
-        # Save Python file
-        python_file = example_dir / f"{example_name}.py"
-        python_file.write_text(result.python_code)
-
-        # Save Shell file
-        shell_file = example_dir / f"{example_name}.sh"
-        shell_file.write_text(result.shell_code)
-
-        # Save Requests file if curl examples were found
-        if result.requests_code:
-            requests_file = example_dir / f"{example_name}_requests.py"
-            requests_file.write_text(result.requests_code)
-
-        # Save documentation URLs to a text file
-        if urls:
-            docs_file = example_dir / f"{example_name}_links.txt"
-            docs_file.write_text("\n".join(urls))
-            rprint(f"[blue]Saved documentation links to {docs_file}[/blue]")
-
-        # Extract title and description from the Python code
-        title_match = re.match(r"^# (.+?)$", result.python_code.split("\n")[0])
-        title = title_match.group(1) if title_match else example_name.replace("-", " ").title()
-
-        # Extract description (second comment line if it exists)
-        description_match = re.match(r"^# .+?\n# (.+?)$", result.python_code, re.DOTALL)
-        description = description_match.group(1).strip() if description_match else ""
-
-        # Determine which section this example belongs to
-        section = determine_section(focus)
+        if args.stream:
+            # Write the Python file as soon as it arrives, before the rest streams in
+            def write_python_early(key, value):
+                if key == "python_code":
+                    example_dir.mkdir(parents=True, exist_ok=True)
+                    python_file = example_dir / f"{example_name}.py"
+                    python_file.write_text(value)
+                    rprint(f"[blue]Saved {python_file}[/blue]")
+
+            result = generate_example_stream(
+                prompt, on_field=write_python_early, cache=cache
+            )
+        elif args.candidates > 1:
+            result = generate_candidates(prompt, args.candidates, cache)
+        else:
+            result = generate_example(prompt, cache=cache)
 
-        # Create the Markdown file for MkDocs
-        markdown_file = create_markdown_file(
-            title, description, result.python_code, result.shell_code, example_name, section
+        example_dir, example_name, title, section = save_example(
+            folder_name, result, urls, focus
         )
-        rprint(f"[blue]Created Markdown file: {markdown_file}[/blue]")
 
         # Update the mkdocs.yml file
         if update_mkdocs_yml(example_name, title, section):
@@ -486,20 +1186,13 @@ For the requests_code, ONLY include this if you find actual curl examples in the
 
         # Notify if an image is needed
         if result.requires_image:
-            rprint(
-                f"\n[bold red]NOTE: This example requires an image named '{example_name}.png' in the example directory.[/bold red]"
-            )
-
-            # Create images directory if needed
-            images_dir = Path("docs") / section / "images"
-            images_dir.mkdir(parents=True, exist_ok=True)
-
-            rprint(
-                f"[bold yellow]Remember to add the image to both {example_dir} and {images_dir}[/bold yellow]"
-            )
+            report_image_requirement(example_dir, example_name, section)
 
     except Exception as e:
         rprint(f"[bold red]Error generating example: {e}[/bold red]")
+        if args.stream and example_dir.exists():
+            # Don't leave a half-written example behind after an early abort
+            shutil.rmtree(example_dir)
 
 
 if __name__ == "__main__":
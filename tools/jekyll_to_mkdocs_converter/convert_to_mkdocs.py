@@ -6,18 +6,13 @@ This script reads the existing examples.json and sections.json files,
 and converts them to Markdown files for use with MkDocs.
 """
 
+import argparse
+import importlib.util
 import json
 import os
 import re
 import shutil
-
-try:
-    import yaml
-except ImportError:
-    print("PyYAML is not installed. Please run 'uv sync' to install dependencies.")
-    import sys
-
-    sys.exit(1)
+import sys
 
 # Constants
 INPUT_EXAMPLES_JSON = "data/examples.json"
@@ -231,6 +226,9 @@ def create_main_index(sections, examples):
 
 def generate_mkdocs_yml(sections, examples):
     """Generate the mkdocs.yml configuration file."""
+    # Imported here so the rest of the script doesn't pay for loading PyYAML
+    import yaml
+
     # Create the basic configuration
     config = {
         "site_name": "Gemini by Example",
@@ -289,8 +287,24 @@ def generate_mkdocs_yml(sections, examples):
         yaml.dump(config, f, IndentDumper, default_flow_style=False)
 
 
+def parse_args():
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Convert data/examples.json and data/sections.json to MkDocs "
+        "Markdown files and mkdocs.yml"
+    )
+    return parser.parse_args()
+
+
 def main():
     """Main function to convert the site to MkDocs."""
+    parse_args()
+
+    # Fail before writing anything if PyYAML is missing
+    if importlib.util.find_spec("yaml") is None:
+        print("PyYAML is not installed. Please run 'uv sync' to install dependencies.")
+        sys.exit(1)
+
     print("Converting Gemini by Example to MkDocs...")
 
     # Load the data
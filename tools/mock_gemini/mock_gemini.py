@@ -0,0 +1,145 @@
+"""
+A local stand-in for the Gemini API, shared by the examples' offline benchmarks.
+
+An example describes how its mock behaves with one module-level function,
+`respond(handler)`, which is called for every request. It reads the request
+with `handler.command`, `handler.path` and `handler.json()`, and answers with
+`handler.send_json(...)`, or with `handler.start_events()` and
+`handler.send_event(...)` for a streamed response. Everything else is here:
+the server, the process it runs in, request counting and a client that
+points at it.
+
+The server runs in its own process so it doesn't compete with the client for
+the GIL. Scripts that start it need an `if __name__ == "__main__":` guard so
+the process can start on platforms that spawn rather than fork.
+
+Examples import this module from their benchmark code only, so the rest of
+each example runs without it:
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools" / "mock_gemini"))
+    from mock_gemini import mock_client, start_mock_server
+"""
+
+import json
+import multiprocessing
+import sys
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from google import genai
+from google.genai import types
+
+
+class MockGeminiHandler(BaseHTTPRequestHandler):
+    """Passes every request to `respond`, and answers `GET /` with a request count."""
+
+    protocol_version = "HTTP/1.1"  # Keep connections alive, like the real API
+    respond = None
+    settings = {}
+    lock = threading.Lock()
+    received = 0
+    _body = None
+
+    def do_GET(self):
+        if self.path == "/":
+            self.send_json({"received": MockGeminiHandler.received})
+        else:
+            self.handle_request()
+
+    def handle_request(self):
+        with self.lock:
+            MockGeminiHandler.received += 1
+        self._body = None
+        type(self).respond(self)
+
+    do_POST = do_PATCH = do_DELETE = handle_request
+
+    def json(self):
+        """The request body, parsed (an empty dict when there is none)."""
+        if self._body is None:
+            length = int(self.headers.get("Content-Length") or 0)
+            self._body = json.loads(self.rfile.read(length)) if length else {}
+        return self._body
+
+    def send_json(self, response, status=200):
+        """Send a JSON response; `response` is an object or already-encoded bytes."""
+        if self._body is None and self.headers.get("Content-Length"):
+            self.json()  # Drain the body so the connection can be reused
+        body = response if isinstance(response, bytes) else json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def start_events(self):
+        """Start a server-sent events response. Needs a server started with streaming=True."""
+        if self._body is None:
+            self.json()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        self.wfile.flush()
+
+    def send_event(self, chunk):
+        self.wfile.write(f"data: {json.dumps(chunk)}\r\n\r\n".encode())
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+class MockGeminiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # Accept bursts of new connections
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+        # Otherwise the client timed out or hung up, which benchmarks do on purpose
+
+
+def serve_mock(respond, streaming, settings, port_queue):
+    attributes = {"respond": staticmethod(respond), "settings": settings}
+    if streaming:
+        # HTTP/1.0: the end of a stream is marked by closing the connection
+        attributes["protocol_version"] = "HTTP/1.0"
+    handler = type("Handler", (MockGeminiHandler,), attributes)
+    server = MockGeminiServer(("127.0.0.1", 0), handler)
+    port_queue.put(server.server_port)
+    server.serve_forever()
+
+
+def start_mock_server(respond, streaming=False, **settings):
+    """Start a mock server process and return it with its port.
+
+    `respond` must be a module-level function. `settings` are available to it
+    as `handler.settings`.
+    """
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=serve_mock, args=(respond, streaming, settings, port_queue), daemon=True
+    )
+    process.start()
+    return process, port_queue.get()
+
+
+def mock_base_url(port):
+    return f"http://127.0.0.1:{port}"
+
+
+def mock_client(port, **http_options):
+    """A client that sends every request to the mock server on `port`."""
+    options = types.HttpOptions(base_url=mock_base_url(port), **http_options)
+    return genai.Client(api_key="mock", http_options=options)
+
+
+def mock_get(port, path="/"):
+    with urllib.request.urlopen(mock_base_url(port) + path) as response:
+        return json.load(response)
+
+
+def requests_received(port):
+    """How many requests the mock server has received, not counting `GET /`."""
+    return mock_get(port)["received"]
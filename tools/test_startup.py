@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# This script checks that the tools/ command-line scripts start quickly
+"""
+Startup checks for the tools/ command-line scripts.
+
+Each script is imported under `python -X importtime` and must stay within an
+import-time budget without loading any of the heavy dependencies that only
+some code paths need. `--help` must also work without them.
+
+Run with pytest, or directly with `python tools/test_startup.py`.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).parent.absolute()
+
+SCRIPTS = [
+    TOOLS_DIR / "example_generator" / "generate_mkdocs_example.py",
+    TOOLS_DIR / "build_examples" / "build_examples.py",
+    TOOLS_DIR / "jekyll_to_mkdocs_converter" / "convert_to_mkdocs.py",
+]
+
+# Modules that must only be imported on the code paths that use them
+HEAVY_MODULES = [
+    "google.genai",
+    "pydantic",
+    "requests",
+    "bs4",
+    "yaml",
+    "dotenv",
+    "rich.console",
+    "rich.prompt",
+]
+
+# Cumulative import time allowed for each script module, in milliseconds
+IMPORT_BUDGET_MS = 100
+
+
+def parse_importtime(stderr):
+    """Return {module: cumulative microseconds} from -X importtime output."""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            timings[name.strip()] = int(cumulative)
+        except ValueError:
+            continue  # Header line
+    return timings
+
+
+def run_importtime(args):
+    """Run Python with -X importtime and return (completed process, timings)."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=TOOLS_DIR.parent,
+    )
+    return result, parse_importtime(result.stderr)
+
+
+def check_import(script):
+    """Import a script as a module and check its budget and dependencies."""
+    code = f"import sys; sys.path.insert(0, {str(script.parent)!r}); import {script.stem}"
+    # Import once to warm the filesystem cache, then measure
+    run_importtime(["-c", code])
+    result, timings = run_importtime(["-c", code])
+    assert result.returncode == 0, result.stderr
+
+    heavy = [name for name in HEAVY_MODULES if name in timings]
+    assert not heavy, f"{script.name} imports {', '.join(heavy)} at load time"
+
+    elapsed_ms = timings[script.stem] / 1000
+    assert elapsed_ms <= IMPORT_BUDGET_MS, (
+        f"{script.name} took {elapsed_ms:.1f} ms to import "
+        f"(budget {IMPORT_BUDGET_MS} ms)"
+    )
+    return elapsed_ms
+
+
+def check_help(script):
+    """Run a script with --help and check it doesn't load heavy dependencies."""
+    result, timings = run_importtime([str(script), "--help"])
+    assert result.returncode == 0, result.stderr
+    assert "usage:" in result.stdout
+
+    heavy = [name for name in HEAVY_MODULES if name in timings]
+    assert not heavy, f"{script.name} --help imports {', '.join(heavy)}"
+
+
+def test_import_time():
+    for script in SCRIPTS:
+        check_import(script)
+
+
+def test_help_is_lightweight():
+    for script in SCRIPTS:
+        check_help(script)
+
+
+def main():
+    """Run the startup checks and print a summary."""
+    print("Checking tools/ startup time...")
+    failures = 0
+    for script in SCRIPTS:
+        try:
+            elapsed_ms = check_import(script)
+            check_help(script)
+        except AssertionError as e:
+            failures += 1
+            print(f"  - FAIL {script.name}: {e}")
+        else:
+            print(f"  - ok   {script.name}: {elapsed_ms:.1f} ms")
+
+    if failures:
+        print(f"\n{failures} scripts failed the startup checks.")
+        return 1
+
+    print("\nAll scripts are within the startup budget.")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())